@@ -0,0 +1,4 @@
+from .collection import MovieCollection
+from .server import ApiServer, serve, start_api_server
+
+__all__ = ["MovieCollection", "ApiServer", "serve", "start_api_server"]
\ No newline at end of file
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from storage.istorage import StorageListener
+from storage.locking import file_version
+from indexes import OrderedIndex, SearchIndex, StatsEngine
+
+
+class MovieCollection(StorageListener):
+    """
+    The collection served by the API, held in memory with its search, ordered and
+    statistics indexes.
+
+    The storage tells the collection about every change it makes. Changes are made
+    by a worker thread, so the events are only recorded there and applied by the
+    thread answering requests (apply_events), which then never sees a half-applied
+    change. Every applied change bumps the generation that versions the ETags and
+    empties the cache of rendered responses.
+    """
+    MAX_CACHED_RESPONSES = 1024
+
+    def __init__(self, storage, refresh_interval=1.0):
+        """
+        Args:
+            storage (IStorage): Storage holding the movie collection
+            refresh_interval (float): Seconds between checks whether another
+                program changed the storage file
+        """
+        self.storage = storage
+        self.refresh_interval = refresh_interval
+        self.movies = {}
+        self.search_index = SearchIndex()
+        self.ordered = OrderedIndex()
+        self.stats = StatsEngine()
+        self.generation = 0
+        self.responses = {}  # Request target -> rendered body, for the current generation
+        self._indexes = (self.search_index, self.ordered, self.stats)
+        self._token = os.urandom(4).hex()  # ETags of an earlier server run never match
+        self._titles = None
+        self._events = []
+        self._events_lock = threading.Lock()
+        self._signature = None
+        self._checked = float("-inf")
+        storage.add_listener(self, reset=False)
+
+    @property
+    def etag(self):
+        """str: Entity tag of the current generation, shared by every response."""
+        return f'"{self._token}-{self.generation}"'
+
+    def _file_signature(self):
+        """
+        Return the version of the storage file, None for storages without one.
+        """
+        path = getattr(self.storage, "file_path", None)
+        return file_version(path) if path else None
+
+    def reset(self, movies):
+        """Record that the storage reloaded the whole collection."""
+        self._record(("reset", movies))
+
+    def movie_added(self, title, details):
+        """Record an added movie."""
+        self._record(("movie_added", title, dict(details)))
+
+    def movie_deleted(self, title, details):
+        """Record a deleted movie."""
+        self._record(("movie_deleted", title, dict(details)))
+
+    def movie_updated(self, title, old_details, details):
+        """Record a changed movie."""
+        self._record(("movie_updated", title, dict(old_details), dict(details)))
+
+    def _record(self, event):
+        """
+        Queue a storage event for apply_events(); safe to call from any thread.
+        """
+        with self._events_lock:
+            self._events.append(event)
+
+    def load(self):
+        """
+        Read the whole collection from storage. Blocking; run it in a worker thread.
+        """
+        signature = self._file_signature()
+        self.reset(self.storage.list_movies())
+        self._signature = signature
+
+    def stored(self):
+        """
+        Remember the storage file's version after a change made through this
+        collection's storage. Blocking; run it in the worker thread that made the change.
+        """
+        self._signature = self._file_signature()
+
+    def is_stale(self):
+        """
+        Tell whether another program changed the storage file, checking at most
+        once per refresh_interval.
+
+        Returns:
+            bool: True if the collection must be loaded again
+        """
+        now = time.monotonic()
+        if now - self._checked < self.refresh_interval:
+            return False
+        self._checked = now
+        return self._file_signature() != self._signature
+
+    def apply_events(self):
+        """
+        Apply the recorded storage events to the collection and its indexes.
+
+        Returns:
+            bool: True if anything changed
+        """
+        with self._events_lock:
+            events, self._events = self._events, []
+        for event, *args in events:
+            if event == "reset":
+                self.movies = {title: dict(details) for title, details in args[0].items()}
+                for index in self._indexes:
+                    index.reset(self.movies)
+                continue
+            title, details = args[0], args[-1]
+            if event == "movie_deleted":
+                self.movies.pop(title, None)
+            else:
+                self.movies[title] = details
+            for index in self._indexes:
+                getattr(index, event)(*args)
+        if events:
+            self.generation += 1
+            self.responses.clear()
+            self._titles = None
+        return bool(events)
+
+    def find(self, title):
+        """
+        Return the stored spelling of a title, ignoring case.
+
+        Args:
+            title (str): The title to look up
+
+        Returns:
+            str: The stored title, or None if there is no such movie
+        """
+        return self.storage._find_title(self.movies, title)
+
+    def titles(self):
+        """
+        Return the titles in storage order, kept until the next change.
+
+        Returns:
+            list: Every title
+        """
+        if self._titles is None:
+            self._titles = list(self.movies)
+        return self._titles
+
+    def cache_response(self, key, body):
+        """
+        Keep a rendered response for the current generation.
+
+        Args:
+            key (str): Request target, e.g. "/top?n=10"
+            body (bytes): Rendered response body
+        """
+        if len(self.responses) >= self.MAX_CACHED_RESPONSES:
+            self.responses.clear()
+        self.responses[key] = body
@@ -0,0 +1,575 @@
+"""
+JSON HTTP API over any IStorage backend, served with asyncio.
+
+    python main.py movies.json --serve --port 8000
+
+    GET    /movies?page=1&size=20&by=rating   One page (by storage order, "rating" or "year")
+    GET    /movies                            The whole collection, streamed in chunks
+    GET    /movies/<title>                    One movie
+    POST   /movies                            Add {"title", "year", "rating", "poster"}
+    PUT    /movies/<title>                    Change the rating: {"rating"}
+    DELETE /movies/<title>                    Delete a movie
+    GET    /search?q=<text>&limit=20          Titles containing the text, or close matches
+    GET    /stats                             Rating statistics and movies per year
+    GET    /top?n=10                          The best rated movies
+
+Reads are answered from memory. Every response carries the ETag of the current
+collection; a request with a matching If-None-Match gets "304 Not Modified", and
+writes with a stale If-Match get "412 Precondition Failed".
+"""
+import asyncio
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+from storage.locking import StorageConflictError
+from .collection import MovieCollection
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 1000
+MAX_BODY_SIZE = 1 << 20  # Request bodies are single movies
+MAX_HEADERS = 100
+STREAM_CHUNK = 500  # Movies per chunk of a streamed listing
+
+REASONS = {
+    200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified", 400: "Bad Request",
+    404: "Not Found", 405: "Method Not Allowed", 409: "Conflict", 412: "Precondition Failed",
+    413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error"
+}
+
+
+class HttpError(Exception):
+    """An error answered with its status code and a JSON {"error": message} body."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    """
+    A parsed HTTP request.
+
+    Attributes:
+        method (str): Request method, e.g. "GET"
+        target (str): Path and query as sent, e.g. "/top?n=5"
+        path (str): Path without the query, still percent-encoded
+        query (dict): Query parameter -> first value
+        headers (dict): Lowercase header name -> value
+        body (bytes): Request body
+        keep_alive (bool): Whether the connection stays open after the response
+    """
+
+    def __init__(self, method, target, version, headers, body):
+        self.method = method
+        self.target = target
+        parts = urlsplit(target)
+        self.path = parts.path
+        self.query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        self.headers = headers
+        self.body = body
+        connection = headers.get("connection", "").lower()
+        self.keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        self.chunked = version == "HTTP/1.1"
+
+    def json(self):
+        """
+        Return the body parsed as a JSON object.
+
+        Raises:
+            HttpError: 400 if the body is not a JSON object
+        """
+        try:
+            record = json.loads(self.body or b"null")
+        except ValueError as e:
+            raise HttpError(400, f"Invalid JSON: {e}")
+        if not isinstance(record, dict):
+            raise HttpError(400, "Expected a JSON object")
+        return record
+
+    def int_param(self, name, default, low=1, high=MAX_PAGE_SIZE):
+        """
+        Return an integer query parameter, limited to low..high.
+
+        Raises:
+            HttpError: 400 if the parameter is not an integer
+        """
+        value = self.query.get(name)
+        if value is None:
+            return default
+        try:
+            return max(low, min(high, int(value)))
+        except ValueError:
+            raise HttpError(400, f"'{name}' must be an integer")
+
+
+def movie_record(title, details):
+    """
+    Convert a movie to the record returned by the API.
+
+    Args:
+        title (str): The title of the movie
+        details (dict): The movie's year, rating, poster and link
+
+    Returns:
+        dict: The title followed by the details
+    """
+    return {"title": title, **details}
+
+
+def _dumps(payload):
+    """Encode a JSON response body."""
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+async def _read_line(reader):
+    """
+    Read one line of the request line or headers.
+
+    Raises:
+        HttpError: 431 if the line is longer than the reader's buffer limit
+    """
+    try:
+        return await reader.readline()
+    except ValueError:  # StreamReader.readline() reports an over-long line this way
+        raise HttpError(431, "Request line or header too long")
+
+
+class ApiServer:
+    """
+    Asynchronous HTTP server answering API requests from a MovieCollection.
+
+    One event loop serves every connection. Reads never block it; writes go to the
+    storage in a single worker thread, one at a time, and the collection applies
+    the resulting events when the write is done.
+    """
+
+    def __init__(self, storage, host="127.0.0.1", port=8000, refresh_interval=1.0):
+        """
+        Args:
+            storage (IStorage): Storage holding the movie collection
+            host (str): Address to listen on
+            port (int): Port to listen on, 0 picks a free one
+            refresh_interval (float): Seconds between checks whether another
+                program changed the storage file
+        """
+        self.storage = storage
+        self.host = host
+        self.port = port
+        self.collection = MovieCollection(storage, refresh_interval)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-storage")
+        self._server = None
+        self._loop = None
+        self._write_lock = None
+        self._routes = {
+            ("GET", "movies"): self._list_movies,
+            ("POST", "movies"): self._add_movie,
+            ("GET", "movie"): self._get_movie,
+            ("PUT", "movie"): self._update_movie,
+            ("PATCH", "movie"): self._update_movie,
+            ("DELETE", "movie"): self._delete_movie,
+            ("GET", "search"): self._search,
+            ("GET", "stats"): self._stats,
+            ("GET", "top"): self._top
+        }
+
+    @property
+    def url(self):
+        """str: Base URL of the running server."""
+        return f"http://{self.host}:{self.port}/"
+
+    async def start(self):
+        """
+        Load the collection and start listening.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._write_lock = asyncio.Lock()
+        await self._run_blocking(self.collection.load)
+        self.collection.apply_events()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        Start the server if needed and answer requests until it is closed.
+        """
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stop listening and wait for the storage worker to finish.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+
+    def shutdown(self):
+        """
+        Stop a server started with start_api_server() from another thread.
+        """
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def _run_blocking(self, function, *args):
+        """
+        Run a blocking storage call in the storage worker thread.
+        """
+        return self._loop.run_in_executor(self._executor, function, *args)
+
+    async def _refresh(self):
+        """
+        Reload the collection if another program changed the storage file.
+        """
+        if self.collection.is_stale():
+            async with self._write_lock:
+                await self._run_blocking(self.collection.load)
+                self.collection.apply_events()
+
+    # Connection handling
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Answer the requests of one connection until the client closes it.
+        """
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HttpError as e:
+                    await self._send(writer, e.status, _dumps({"error": str(e)}), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                await self._dispatch(request, writer)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader):
+        """
+        Read one request from a connection.
+
+        Returns:
+            Request: The request, or None if the client closed the connection
+
+        Raises:
+            HttpError: If the request is malformed or its body too large
+        """
+        line = await _read_line(reader)
+        if not line.strip():
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await _read_line(reader)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HttpError(400, "Too many headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HttpError(400, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HttpError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, version, headers, body)
+
+    async def _send(self, writer, status, body=b"", headers=None, keep_alive=True):
+        """
+        Write a complete response.
+        """
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        if body or status not in (204, 304):
+            head += ["Content-Type: application/json; charset=utf-8", f"Content-Length: {len(body)}"]
+        head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        if not keep_alive:
+            head.append("Connection: close")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    def _route(self, request):
+        """
+        Find the handler of a request.
+
+        Returns:
+            tuple: (handler, title) where title is the decoded <title> of
+                /movies/<title> paths, otherwise None
+
+        Raises:
+            HttpError: 404 for unknown paths, 405 for unsupported methods
+        """
+        path = request.path.rstrip("/") or "/"
+        title = None
+        if path.startswith("/movies/"):
+            name, title = "movie", unquote(path[len("/movies/"):])
+        else:
+            name = path.lstrip("/")
+        if not any(route_name == name for _, route_name in self._routes):
+            raise HttpError(404, f"No such endpoint: {request.path}")
+        handler = self._routes.get((request.method, name))
+        if handler is None:
+            raise HttpError(405, f"{request.method} is not supported on {request.path}")
+        return handler, title
+
+    async def _dispatch(self, request, writer):
+        """
+        Answer one request.
+
+        GET responses are answered with 304 when the client already has the current
+        collection, and otherwise from the response cache when possible.
+        """
+        try:
+            handler, title = self._route(request)
+            if request.method == "GET":
+                await self._refresh()
+                etag = self.collection.etag
+                if request.headers.get("if-none-match") == etag:
+                    await self._send(writer, 304, headers={"ETag": etag}, keep_alive=request.keep_alive)
+                    return
+                body = self.collection.responses.get(request.target)
+                if body is None:
+                    body = await handler(request, writer, title)
+                    if body is None:  # Streamed
+                        return
+                    self.collection.cache_response(request.target, body)
+                await self._send(writer, 200, body, {"ETag": etag}, request.keep_alive)
+            else:
+                status, body, headers = await handler(request, title)
+                await self._send(writer, status, body, dict(headers, ETag=self.collection.etag), request.keep_alive)
+        except HttpError as e:
+            await self._send(writer, e.status, _dumps({"error": str(e)}), keep_alive=request.keep_alive)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            await self._send(writer, 500, _dumps({"error": f"{type(e).__name__}: {e}"}), keep_alive=False)
+            request.keep_alive = False
+
+    # Reads
+
+    async def _list_movies(self, request, writer, title):
+        """
+        Render one page of the collection, or stream all of it if no page is requested.
+        """
+        movies = self.collection.movies
+        if "page" not in request.query:
+            await self._stream_movies(request, writer)
+            return None
+
+        page = request.int_param("page", 1, high=math.inf)
+        size = request.int_param("size", DEFAULT_PAGE_SIZE)
+        by = request.query.get("by")
+        if by in ("rating", "year"):
+            titles = self.collection.ordered.page(page, size, by)
+        elif by is None:
+            start = (page - 1) * size
+            titles = self.collection.titles()[start:start + size]
+        else:
+            raise HttpError(400, "'by' must be 'rating' or 'year'")
+        return _dumps({
+            "page": page,
+            "size": size,
+            "total": len(movies),
+            "pages": math.ceil(len(movies) / size),
+            "movies": [movie_record(title, movies[title]) for title in titles]
+        })
+
+    async def _stream_movies(self, request, writer):
+        """
+        Send the whole collection in chunks, encoding a few hundred movies at a time.
+
+        HTTP/1.1 clients get chunked transfer encoding; HTTP/1.0 clients get the body
+        until the connection closes.
+        """
+        items = list(self.collection.movies.items())  # Later changes do not affect this response
+        head = ["HTTP/1.1 200 OK", "Content-Type: application/json; charset=utf-8",
+                f"ETag: {self.collection.etag}"]
+        if request.chunked:
+            head.append("Transfer-Encoding: chunked")
+        else:
+            request.keep_alive = False
+            head.append("Connection: close")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+
+        def send_chunk(data):
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data) if request.chunked else data)
+
+        send_chunk(_dumps({"count": len(items)})[:-1] + b', "movies": [')
+        for start in range(0, len(items), STREAM_CHUNK):
+            records = (json.dumps(movie_record(title, details), ensure_ascii=False)
+                       for title, details in items[start:start + STREAM_CHUNK])
+            send_chunk(("," if start else "").encode() + ",".join(records).encode("utf-8"))
+            await writer.drain()
+        send_chunk(b"]}")
+        if request.chunked:
+            writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _get_movie(self, request, writer, title):
+        """Render one movie."""
+        actual_title = self.collection.find(title)
+        if actual_title is None:
+            raise HttpError(404, f"Movie '{title}' not found")
+        return _dumps(movie_record(actual_title, self.collection.movies[actual_title]))
+
+    async def _search(self, request, writer, title):
+        """Render the movies whose title contains the query, or close matches if none does."""
+        query = request.query.get("q", "")
+        if not query:
+            raise HttpError(400, "Missing query parameter 'q'")
+        limit = request.int_param("limit", DEFAULT_PAGE_SIZE)
+        movies = self.collection.movies
+        titles = self.collection.search_index.search(query, limit)
+        result = {"query": query, "movies": [movie_record(title, movies[title]) for title in titles]}
+        if not titles:
+            result["suggestions"] = [title for title, _ in self.collection.search_index.fuzzy_search(query, limit=5)]
+        return _dumps(result)
+
+    async def _stats(self, request, writer, title):
+        """Render the rating statistics and the number of movies per year."""
+        stats = self.collection.stats
+        return _dumps(dict(stats.summary(), years=stats.year_histogram()))
+
+    async def _top(self, request, writer, title):
+        """Render the best rated movies."""
+        movies = self.collection.movies
+        titles = self.collection.ordered.top(request.int_param("n", 10))
+        return _dumps({"movies": [movie_record(title, movies[title]) for title in titles]})
+
+    # Writes
+
+    async def _write(self, request, change, *args):
+        """
+        Make one change through the storage in the worker thread and apply its events.
+
+        Args:
+            request (Request): The request, checked against its If-Match header
+            change (callable): Storage method, e.g. storage.update_movie
+            *args: Arguments of the storage method
+
+        Returns:
+            The result of the storage method
+
+        Raises:
+            HttpError: 412 if If-Match does not match the current collection,
+                409 if another process changed the storage file meanwhile
+        """
+        await self._refresh()
+        async with self._write_lock:
+            expected = request.headers.get("if-match")
+            if expected not in (None, "*", self.collection.etag):
+                raise HttpError(412, "The collection changed since it was read")
+
+            def run():
+                result = change(*args)
+                self.collection.stored()
+                return result
+
+            try:
+                return await self._run_blocking(run)
+            except StorageConflictError as e:
+                raise HttpError(409, str(e))
+            finally:
+                self.collection.apply_events()
+
+    async def _add_movie(self, request, title):
+        """Add a movie given as {"title", "year", "rating", "poster"}."""
+        record = request.json()
+        title = record.get("title")
+        try:
+            rating = float(record.get("rating"))
+        except (TypeError, ValueError):
+            rating = None
+        if not isinstance(title, str) or not title.strip() or rating is None or not 1 <= rating <= 10:
+            raise HttpError(400, "Expected a title and a rating between 1 and 10")
+        year, poster = str(record.get("year", "")), record.get("poster") or ""
+
+        if not await self._write(request, self.storage.add_movie, title, year, rating, poster):
+            raise HttpError(409, f"Movie '{title}' already exists")
+        return 201, _dumps(movie_record(title, self.collection.movies[title])), {
+            "Location": "/movies/" + quote(title, safe="")
+        }
+
+    async def _update_movie(self, request, title):
+        """Change a movie's rating, given as {"rating"}."""
+        record = request.json()
+        try:
+            rating = float(record.get("rating"))
+        except (TypeError, ValueError):
+            rating = None
+        if rating is None or not 1 <= rating <= 10:
+            raise HttpError(400, "Expected a rating between 1 and 10")
+        actual_title = self.collection.find(title)
+        if actual_title is None or not await self._write(request, self.storage.update_movie, actual_title, rating):
+            raise HttpError(404, f"Movie '{title}' not found")
+        return 200, _dumps(movie_record(actual_title, self.collection.movies[actual_title])), {}
+
+    async def _delete_movie(self, request, title):
+        """Delete a movie."""
+        actual_title = self.collection.find(title)
+        if actual_title is None or not await self._write(request, self.storage.delete_movie, actual_title):
+            raise HttpError(404, f"Movie '{title}' not found")
+        return 204, b"", {}
+
+
+def start_api_server(storage, host="127.0.0.1", port=0, refresh_interval=1.0):
+    """
+    Start the API server in a background thread, e.g. for load tests.
+
+    Args:
+        storage (IStorage): Storage holding the movie collection
+        host (str): Address to listen on
+        port (int): Port to listen on, 0 picks a free one
+        refresh_interval (float): Seconds between checks for outside changes
+
+    Returns:
+        tuple: (server, base_url); call server.shutdown() to stop it
+    """
+    server = ApiServer(storage, host, port, refresh_interval)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server, server.url
+
+
+def serve(storage, host="127.0.0.1", port=8000):
+    """
+    Run the API server in the foreground until Ctrl+C.
+
+    Args:
+        storage (IStorage): Storage holding the movie collection
+        host (str): Address to listen on
+        port (int): Port to listen on
+    """
+    server = ApiServer(storage, host, port)
+
+    async def run():
+        await server.start()
+        print(f"🌐 Movie API listening on {server.url} (Ctrl+C to stop)")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("👋 API server stopped.")
@@ -0,0 +1,88 @@
+"""
+Compare the NumPy and pure-Python paths of RatingAnalytics on synthetic data.
+
+Run from the project root:
+
+    python -m benchmarks.bench_analytics --sizes 10000 1000000 10000000
+"""
+import argparse
+import random
+import time
+from array import array
+from indexes.analytics import HAS_NUMPY, RatingAnalytics
+
+DEFAULT_SIZES = (10_000, 1_000_000, 10_000_000)
+OPERATIONS = ("load", "summary", "histogram", "decades", "ranking")
+
+
+def generate_columns(size, seed=42):
+    """
+    Generate synthetic rating and year columns.
+
+    Titles are the row numbers, so ten million movies do not need ten million strings.
+
+    Args:
+        size (int): Number of movies
+        seed (int): Seed of the random generator
+
+    Returns:
+        tuple: (titles, ratings, years)
+    """
+    rng = random.Random(seed)
+    ratings = array("d", (round(rng.uniform(1, 10), 1) for _ in range(size)))
+    years = array("l", (rng.randint(1920, 2024) for _ in range(size)))
+    return range(size), ratings, years
+
+
+def time_operations(analytics, columns):
+    """
+    Time every analytics operation once.
+
+    Args:
+        analytics (RatingAnalytics): Analytics using the path under test
+        columns (tuple): (titles, ratings, years) as returned by generate_columns()
+
+    Returns:
+        dict: Operation name -> seconds
+    """
+    operations = {
+        "load": lambda: analytics.load_columns(*columns),
+        "summary": analytics.summary,
+        "histogram": analytics.histogram,
+        "decades": analytics.decades,
+        "ranking": analytics.ranking
+    }
+    timings = {}
+    for name in OPERATIONS:
+        start = time.perf_counter()
+        operations[name]()
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    """Run the benchmark and print one table row per size and path."""
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy and pure-Python analytics paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Collection sizes to benchmark (default: 10k, 1M and 10M)")
+    args = parser.parse_args()
+
+    paths = [("python", False)] + ([("numpy", True)] if HAS_NUMPY else [])
+    if not HAS_NUMPY:
+        print("⚠️ NumPy is not installed; only the pure-Python path is benchmarked.")
+
+    print(f"{'rows':>10} {'path':>7} " + " ".join(f"{name:>10}" for name in OPERATIONS) + f" {'total':>10}")
+    for size in args.sizes:
+        columns = generate_columns(size)
+        results = {}
+        for name, use_numpy in paths:
+            timings = time_operations(RatingAnalytics(use_numpy=use_numpy), columns)
+            results[name] = sum(timings.values())
+            print(f"{size:>10} {name:>7} " + " ".join(f"{timings[op]:>9.3f}s" for op in OPERATIONS)
+                  + f" {results[name]:>9.3f}s")
+        if "numpy" in results:
+            print(f"{'':>10} speedup {results['python'] / results['numpy']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
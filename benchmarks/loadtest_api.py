@@ -0,0 +1,289 @@
+"""
+Load-test the HTTP API and report requests per second and latency percentiles.
+
+Run from the project root. Without --url a local instance is started on a
+synthetic collection and stopped afterwards:
+
+    python -m benchmarks.loadtest_api --movies 10000 --connections 32 --duration 10
+    python -m benchmarks.loadtest_api --url http://127.0.0.1:8000/ --writes 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+from benchmarks.synthetic import WORDS, generate_movies, write_json
+
+# Share of each kind of read request; --writes replaces part of them with rating updates
+READ_MIX = {
+    "page": 0.30,
+    "search": 0.25,
+    "movie": 0.20,
+    "top": 0.10,
+    "stats": 0.10,
+    "revalidate": 0.05  # Conditional GET answered with 304
+}
+
+
+def percentile(sorted_values, percent):
+    """
+    Return a percentile of sorted values (nearest rank), 0 for no values.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class HttpConnection:
+    """
+    Minimal keep-alive HTTP/1.1 client, so the load generator itself stays cheap.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None, headers=None):
+        """
+        Send one request and read the whole response.
+
+        Returns:
+            tuple: (status, headers, body)
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(data)}"]
+        head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+
+        status = int((await self.reader.readline()).split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            content = b"".join(chunks)
+        else:
+            content = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+        if response_headers.get("connection") == "close":
+            self.close()
+        return status, response_headers, content
+
+    def close(self):
+        """Close the connection; the next request opens a new one."""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = self.reader = None
+
+
+class LoadTest:
+    """
+    Sends a random mix of API requests over several connections for a fixed time.
+    """
+
+    def __init__(self, url, connections=16, duration=10.0, writes=0.0, seed=42):
+        """
+        Args:
+            url (str): Base URL of the API
+            connections (int): Concurrent keep-alive connections
+            duration (float): Seconds to send requests for
+            writes (float): Share of requests that update a rating
+            seed (int): Seed of the random request mix
+        """
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.connections = connections
+        self.duration = duration
+        self.writes = writes
+        self.rng = random.Random(seed)
+        self.titles = []
+        self.etag = None
+        self.latencies = {}
+        self.errors = 0
+
+    def _next_request(self):
+        """
+        Pick the next request of the mix.
+
+        Returns:
+            tuple: (kind, method, path, body, headers)
+        """
+        if self.rng.random() < self.writes:
+            title = self.rng.choice(self.titles)
+            return "update", "PUT", "/movies/" + quote(title, safe=""), {"rating": round(self.rng.uniform(1, 10), 1)}, None
+        kind = self.rng.choices(list(READ_MIX), weights=list(READ_MIX.values()))[0]
+        if kind == "page":
+            by = self.rng.choice(("", "&by=rating", "&by=year"))
+            return kind, "GET", f"/movies?page={self.rng.randint(1, 50)}&size=20{by}", None, None
+        if kind == "search":
+            return kind, "GET", f"/search?q={self.rng.choice(WORDS).lower()}&limit=20", None, None
+        if kind == "movie":
+            return kind, "GET", "/movies/" + quote(self.rng.choice(self.titles), safe=""), None, None
+        if kind == "top":
+            return kind, "GET", f"/top?n={self.rng.choice((10, 50, 100))}", None, None
+        if kind == "stats":
+            return kind, "GET", "/stats", None, None
+        return kind, "GET", "/stats", None, {"If-None-Match": self.etag}
+
+    async def _prepare(self):
+        """
+        Fetch a sample of titles for movie and update requests, and the current ETag.
+        """
+        connection = HttpConnection(self.host, self.port)
+        status, headers, body = await connection.request("GET", f"/movies?page=1&size=1000")
+        connection.close()
+        if status != 200:
+            raise RuntimeError(f"API answered {status} to the first request")
+        self.titles = [movie["title"] for movie in json.loads(body)["movies"]] or ["missing"]
+        self.etag = headers.get("etag")
+
+    async def _client(self, deadline):
+        """
+        Send requests over one connection until the deadline.
+        """
+        connection = HttpConnection(self.host, self.port)
+        try:
+            while time.perf_counter() < deadline:
+                kind, method, path, body, headers = self._next_request()
+                start = time.perf_counter()
+                try:
+                    status, response_headers, _ = await connection.request(method, path, body, headers)
+                except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    self.errors += 1
+                    connection.close()
+                    continue
+                self.latencies.setdefault(kind, []).append(time.perf_counter() - start)
+                if status >= 400:
+                    self.errors += 1
+                if "etag" in response_headers:
+                    self.etag = response_headers["etag"]
+        finally:
+            connection.close()
+
+    async def run(self):
+        """
+        Run the load test.
+
+        Returns:
+            dict: Requests, errors, requests per second and latency percentiles
+                in milliseconds, overall and per kind of request
+        """
+        await self._prepare()
+        start = time.perf_counter()
+        await asyncio.gather(*(self._client(start + self.duration) for _ in range(self.connections)))
+        elapsed = time.perf_counter() - start
+
+        def summarize(values):
+            values = sorted(values)
+            return {
+                "requests": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p90_ms": round(percentile(values, 90) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+                "max_ms": round(values[-1] * 1000, 3) if values else 0.0
+            }
+
+        everything = [value for values in self.latencies.values() for value in values]
+        report = summarize(everything)
+        report.update(rps=round(len(everything) / elapsed, 1), errors=self.errors,
+                      connections=self.connections, duration=round(elapsed, 2),
+                      endpoints={kind: summarize(values) for kind, values in sorted(self.latencies.items())})
+        return report
+
+
+def start_local_instance(movies, cache=True):
+    """
+    Write a synthetic collection to a temporary file and serve it with main.py --serve.
+
+    Args:
+        movies (int): Number of movies in the collection
+        cache (bool): Run the server with --cache, so writes do not reparse the file
+
+    Returns:
+        tuple: (process, base_url, temporary directory)
+    """
+    directory = tempfile.TemporaryDirectory()
+    path = os.path.join(directory.name, "movies.json")
+    write_json(path, generate_movies(movies))
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, os.path.join(root, "main.py"), path, "--serve", "--port", str(port)]
+    if cache:
+        command.append("--cache")
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process, f"http://127.0.0.1:{port}/", directory
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    directory.cleanup()
+    raise RuntimeError("The API server did not start")
+
+
+def main():
+    """Parse the command line, run the load test and print the report."""
+    parser = argparse.ArgumentParser(description="Load-test the movie HTTP API")
+    parser.add_argument("--url", help="Base URL of a running API; by default a local instance is started")
+    parser.add_argument("--movies", type=int, default=10_000, help="Size of the local instance's collection")
+    parser.add_argument("--connections", type=int, default=16, help="Concurrent connections (default: 16)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run (default: 10)")
+    parser.add_argument("--writes", type=float, default=0.0, help="Share of requests updating a rating (default: 0)")
+    parser.add_argument("--no-cache", action="store_true", help="Start the local instance without --cache")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    process = directory = None
+    url = args.url
+    if url is None:
+        process, url, directory = start_local_instance(args.movies, cache=not args.no_cache)
+    try:
+        report = asyncio.run(LoadTest(url, args.connections, args.duration, args.writes).run())
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+            directory.cleanup()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['requests']} requests in {report['duration']}s over {report['connections']} connections, "
+          f"{report['errors']} errors")
+    print(f"{report['rps']} requests/s, p50 {report['p50_ms']} ms, p99 {report['p99_ms']} ms")
+    print(f"{'endpoint':<12}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for kind, stats in report["endpoints"].items():
+        print(f"{kind:<12}{stats['requests']:>10}{stats['p50_ms']:>10}{stats['p99_ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Benchmark suite for the storage backends, the MovieApp commands and site generation.
+
+Every size gets a synthetic collection; OMDb lookups go to the local stub server,
+and everything is written inside a temporary directory. Run from the project root:
+
+    python -m benchmarks.run --sizes 1000 10000 100000 --output bench.json
+    python -m benchmarks.run --sizes 1000 10000 100000 --compare bench.json
+    python -m benchmarks.run --compare bench.json --current new.json --threshold 0.1
+
+Compare mode exits with status 1 if any benchmark got slower than the baseline
+by more than the threshold, so it can gate CI.
+"""
+import argparse
+import builtins
+import contextlib
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from benchmarks.synthetic import generate_movies, write_csv, write_json
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)  # Add 1000000 for the largest collections
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.20  # Slower by more than 20% is a regression
+MIN_DELTA = 0.001  # ...and by more than a millisecond, so tiny timings do not flap
+GROUPS = ("storage", "commands", "website")
+BACKENDS = ("json", "csv")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(function, repeat, setup=None):
+    """
+    Time a function several times.
+
+    Args:
+        function (callable): Code to time, called with the result of setup()
+        repeat (int): Number of runs
+        setup (callable, optional): Untimed preparation before every run
+
+    Returns:
+        dict: Fastest and median run time in seconds, and the number of runs
+    """
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        function(argument) if setup else function()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings), "runs": repeat}
+
+
+@contextlib.contextmanager
+def scripted(answer):
+    """
+    Answer input() prompts with answer(prompt) and silence print() while the block runs.
+
+    Args:
+        answer (callable): Returns the text typed at a prompt
+    """
+    original = builtins.input
+    builtins.input = lambda prompt="": answer(prompt)
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        builtins.input = original
+
+
+def bench_storage(backend, path, movies, repeat):
+    """
+    Time loading, saving and single changes of one storage backend.
+
+    Every change goes through the public methods, so it includes the load and save
+    (or the streaming rewrite) the backend does for it.
+
+    Args:
+        backend (str): "json" or "csv"
+        path (str): File holding the synthetic collection
+        movies (dict): The synthetic collection
+        repeat (int): Runs per benchmark
+
+    Returns:
+        dict: Benchmark name -> timings
+    """
+    from storage import StorageCsv, StorageJson
+    storage = StorageJson(path) if backend == "json" else StorageCsv(path)
+    titles = iter(list(movies)[:repeat * 2])
+    new_titles = (f"Benchmark Movie {number}" for number in itertools.count())
+    loaded = storage._load_movies()
+
+    return {
+        f"{backend}.load": measure(storage._load_movies, repeat),
+        f"{backend}.save": measure(lambda: storage._save_movies(loaded), repeat),
+        f"{backend}.add_movie": measure(
+            lambda title: storage.add_movie(title, "2000", 7.0, "https://example.com/poster.jpg"),
+            repeat, setup=lambda: next(new_titles)),
+        f"{backend}.update_movie": measure(lambda title: storage.update_movie(title, 5.5),
+                                           repeat, setup=lambda: next(titles)),
+        f"{backend}.delete_movie": measure(storage.delete_movie, repeat, setup=lambda: next(titles))
+    }
+
+
+def bench_commands(path, repeat):
+    """
+    Time the MovieApp commands over a JSON collection, answering their prompts.
+
+    The add command looks the movie up on the OMDb stub server.
+
+    Args:
+        path (str): movies.json file holding the synthetic collection
+        repeat (int): Runs per benchmark
+
+    Returns:
+        dict: Benchmark name -> timings
+    """
+    from movie_app import MovieApp
+    from storage import StorageJson
+    storage = StorageJson(path)
+    with scripted(lambda prompt: ""):
+        timings = {"app.start": measure(lambda: MovieApp(StorageJson(path)), repeat)}
+    app = MovieApp(storage)
+
+    with scripted(lambda prompt: "night 1"):
+        timings["command.search"] = measure(app._command_search_movie, repeat)
+    with scripted(lambda prompt: "nihgt rvier"):  # Typo: falls back to fuzzy matching
+        timings["command.search_fuzzy"] = measure(app._command_search_movie, repeat)
+    with scripted(lambda prompt: "q"):
+        timings["command.sort"] = measure(app._command_sorted_movies, repeat)
+    with scripted(lambda prompt: ""):
+        timings["command.stats"] = measure(app._command_movie_stats, repeat)
+
+    new_titles = (f"Stub Movie {number}" for number in itertools.count())
+    answers = {}
+    with scripted(lambda prompt: answers.pop("title") if "title" in prompt else ""):
+        timings["command.add_omdb"] = measure(lambda _: app._command_add_movie(), repeat,
+                                              setup=lambda: answers.update(title=next(new_titles)))
+    return timings
+
+
+def bench_website(path, repeat):
+    """
+    Time generating the single-page and the paginated website.
+
+    Args:
+        path (str): movies.json file holding the synthetic collection
+        repeat (int): Runs per benchmark
+
+    Returns:
+        dict: Benchmark name -> timings
+    """
+    from movie_app import MovieApp
+    from storage import StorageJson
+    with scripted(lambda prompt: ""):
+        single = MovieApp(StorageJson(path))
+        paginated = MovieApp(StorageJson(path), page_size=50, incremental=False)
+        return {
+            "website.single_page": measure(single._generate_website, repeat),
+            "website.paginated": measure(paginated._generate_website, repeat)
+        }
+
+
+def run_suite(sizes, repeat=DEFAULT_REPEAT, groups=GROUPS, backends=BACKENDS, progress=None):
+    """
+    Run the benchmarks for every collection size in a temporary working directory.
+
+    Args:
+        sizes (iterable): Collection sizes
+        repeat (int): Runs per benchmark
+        groups (iterable): Benchmark groups to run ("storage", "commands", "website")
+        backends (iterable): Storage backends for the storage group ("json", "csv")
+        progress (callable, optional): Called with a message before every step
+
+    Returns:
+        dict: {"meta": {...}, "benchmarks": {"<name>@<size>": timings with the size}}
+    """
+    if ROOT not in sys.path:  # Modules are imported after changing into the temporary directory
+        sys.path.insert(0, ROOT)
+    from omdb.stub_server import start_stub_server
+    progress = progress or (lambda message: None)
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="movie-bench-")
+    cwd = os.getcwd()
+    server, url = start_stub_server()
+    os.environ.update(OMDB_API_URL=url, OMDB_API_KEY="benchmark",
+                      OMDB_CACHE_PATH=os.path.join(workdir, "omdb_cache.db"))
+    try:
+        # Commands read static/ and write data/ relative to the working directory
+        shutil.copytree(os.path.join(ROOT, "static"), os.path.join(workdir, "static"))
+        os.chdir(workdir)
+
+        for size in sizes:
+            progress(f"Generating {size} movies")
+            movies = generate_movies(size)
+            timings = {}
+            for backend in backends if "storage" in groups else ():
+                progress(f"{size} movies: {backend} storage")
+                path = os.path.join(workdir, f"movies-{size}.{backend}")
+                (write_json if backend == "json" else write_csv)(path, movies)
+                timings.update(bench_storage(backend, path, movies, repeat))
+            path = os.path.join(workdir, f"app-{size}.json")
+            write_json(path, movies)
+            if "commands" in groups:
+                progress(f"{size} movies: commands")
+                timings.update(bench_commands(path, repeat))
+            if "website" in groups:
+                progress(f"{size} movies: website")
+                timings.update(bench_website(path, repeat))
+            for name, timing in timings.items():
+                results[f"{name}@{size}"] = dict(timing, size=size)
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {"meta": environment(repeat), "benchmarks": results}
+
+
+def environment(repeat):
+    """
+    Describe the machine and code the benchmarks ran on.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+        "repeat": repeat
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare the median timings of two benchmark runs.
+
+    Args:
+        baseline (dict): Saved result of run_suite()
+        current (dict): New result of run_suite()
+        threshold (float): Allowed slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        list: (name, baseline seconds, current seconds, ratio, status) for every
+            benchmark in both runs, status being "regression", "improvement" or "ok"
+    """
+    rows = []
+    for name, timing in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+        old, new = before["median"], timing["median"]
+        ratio = new / old if old else float("inf")
+        if ratio > 1 + threshold and new - old > MIN_DELTA:
+            status = "regression"
+        elif ratio < 1 - threshold and old - new > MIN_DELTA:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, old, new, ratio, status))
+    return rows
+
+
+def print_results(results):
+    """Print the timings of a run as a table."""
+    print(f"{'benchmark':<36}{'median ms':>12}{'min ms':>12}")
+    for name, timing in results["benchmarks"].items():
+        print(f"{name:<36}{timing['median'] * 1000:>12.2f}{timing['min'] * 1000:>12.2f}")
+
+
+def print_comparison(rows, threshold):
+    """Print a comparison as a table, marking regressions and improvements."""
+    marks = {"regression": "❌ slower", "improvement": "✅ faster", "ok": ""}
+    print(f"{'benchmark':<36}{'baseline ms':>12}{'current ms':>12}{'change':>9}")
+    for name, old, new, ratio, status in rows:
+        print(f"{name:<36}{old * 1000:>12.2f}{new * 1000:>12.2f}{(ratio - 1) * 100:>+8.1f}%  {marks[status]}")
+    regressions = sum(status == "regression" for *_, status in rows)
+    print(f"\n{regressions} regressions over {threshold:.0%} among {len(rows)} benchmarks.")
+
+
+def main():
+    """Parse the command line, run or load the benchmarks and report or compare them."""
+    parser = argparse.ArgumentParser(description="Benchmark storage backends, commands and site generation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Collection sizes (default: 1000 10000 100000)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per benchmark (default: 3)")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=GROUPS, help="Benchmark groups to run")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS,
+                        help="Storage backends to benchmark")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare the results with a saved JSON file")
+    parser.add_argument("--current", metavar="RESULTS",
+                        help="With --compare, compare this saved JSON file instead of running the benchmarks")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown counted as a regression in compare mode (default: 0.2 for 20%%)")
+    args = parser.parse_args()
+
+    if args.current:
+        with open(args.current, "r", encoding="utf-8") as file:
+            results = json.load(file)
+    else:
+        results = run_suite(args.sizes, args.repeat, args.groups, args.backends,
+                            progress=lambda message: print(f"⏱️ {message}", file=sys.stderr))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if not args.compare:
+        print_results(results)
+        return
+    with open(args.compare, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    rows = compare(baseline, results, args.threshold)
+    print_comparison(rows, args.threshold)
+    if any(status == "regression" for *_, status in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Measure how long one-shot runs of main.py take to start, and which imports the time goes to.
+
+Every scenario is run in a fresh interpreter with `python -X importtime` on a
+synthetic collection in a temporary directory. Run from the project root:
+
+    python -m benchmarks.startup --output startup.json
+    python -m benchmarks.startup --compare startup.json --threshold 0.2
+
+Exits with status 1 if a scenario imported a module it must not need (e.g. the
+HTTP stack for a local "stats"), or in compare mode if a scenario got slower
+than the baseline by more than the threshold, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.run import DEFAULT_THRESHOLD, ROOT, compare, environment, print_comparison
+from benchmarks.synthetic import generate_movies, write_csv, write_json
+
+DEFAULT_MOVIES = 1_000
+DEFAULT_REPEAT = 5
+DEFAULT_TOP = 8
+# Modules only needed for OMDb lookups, .env loading, the API server, the SQLite backend or NumPy analytics
+LAZY_MODULES = ("omdb", "requests", "urllib3", "dotenv", "asyncio", "sqlite3", "numpy", "api", "bulk_import",
+                "movie_app")
+# Also not needed by commands that only stream the collection
+STREAMING_LAZY_MODULES = LAZY_MODULES + ("indexes", "storage.storage_mmap")
+
+# name -> (main.py arguments, modules the run must not import)
+SCENARIOS = {
+    "interpreter": (None, ()),  # python -c pass, the floor every run pays
+    "help": (["--help"], STREAMING_LAZY_MODULES),
+    "json.stats": (["movies.json", "stats"], LAZY_MODULES),
+    "json.list": (["movies.json", "list", "--limit", "10"], STREAMING_LAZY_MODULES),
+    "csv.stats": (["movies.csv", "stats"], LAZY_MODULES),
+    "csv.export": (["movies.csv", "export", "--output", "export.json"], STREAMING_LAZY_MODULES)
+}
+
+
+def parse_importtime(output):
+    """
+    Parse the stderr of python -X importtime.
+
+    Args:
+        output (str): The interpreter's stderr
+
+    Returns:
+        list: (module, self seconds, cumulative seconds, depth) in import order,
+            depth 0 being the modules imported directly by the program
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not own.strip().isdigit():  # The header line
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(own) / 1e6, int(cumulative) / 1e6, depth))
+    return imports
+
+
+def run_scenario(arguments, workdir):
+    """
+    Run main.py once with -X importtime.
+
+    Args:
+        arguments (list): Arguments of main.py, None to start an empty interpreter
+        workdir (str): Working directory holding the collections
+
+    Returns:
+        tuple: (wall seconds, parsed imports)
+    """
+    command = [sys.executable, "-X", "importtime"]
+    command += ["-c", "pass"] if arguments is None else [os.path.join(ROOT, "main.py")] + arguments
+    start = time.perf_counter()
+    process = subprocess.run(command, cwd=workdir, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        errors = "\n".join(line for line in process.stderr.splitlines() if not line.startswith("import time:"))
+        raise RuntimeError(f"main.py {' '.join(arguments)} failed with status {process.returncode}:\n{errors}")
+    return elapsed, parse_importtime(process.stderr)
+
+
+def run_startup(movies=DEFAULT_MOVIES, repeat=DEFAULT_REPEAT, top=DEFAULT_TOP, scenarios=SCENARIOS):
+    """
+    Time every scenario and break its import time down.
+
+    Args:
+        movies (int): Size of the synthetic collections
+        repeat (int): Runs per scenario
+        top (int): Number of slowest top-level imports to report
+        scenarios (dict): name -> (main.py arguments, modules it must not import)
+
+    Returns:
+        dict: {"meta": {...}, "benchmarks": {"startup.<name>": wall timings},
+            "imports": {name: import breakdown of the fastest run}}
+    """
+    workdir = tempfile.mkdtemp(prefix="movie-startup-")
+    results = {"meta": dict(environment(repeat), movies=movies), "benchmarks": {}, "imports": {}}
+    try:
+        collection = generate_movies(movies)
+        write_json(os.path.join(workdir, "movies.json"), collection)
+        write_csv(os.path.join(workdir, "movies.csv"), collection)
+        for name, (arguments, forbidden) in scenarios.items():
+            runs = [run_scenario(arguments, workdir) for _ in range(repeat)]
+            times = [elapsed for elapsed, _ in runs]
+            _, imports = min(runs, key=lambda run: run[0])
+            loaded = {module for module, *_ in imports}
+            results["benchmarks"][f"startup.{name}"] = {
+                "median": statistics.median(times),
+                "min": min(times),
+                "max": max(times),
+                "runs": len(times)
+            }
+            results["imports"][name] = {
+                "total": sum(own for _, own, _, _ in imports),
+                "modules": len(imports),
+                "top": sorted(((module, cumulative) for module, _, cumulative, depth in imports if depth == 0),
+                              key=lambda item: item[1], reverse=True)[:top],
+                "unexpected": sorted(module for module in forbidden if module in loaded)
+            }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def print_startup(results):
+    """Print the wall times and import breakdown of every scenario."""
+    print(f"{'scenario':<16}{'median ms':>11}{'min ms':>9}{'imports ms':>12}{'modules':>9}")
+    for name, breakdown in results["imports"].items():
+        timing = results["benchmarks"][f"startup.{name}"]
+        print(f"{name:<16}{timing['median'] * 1000:>11.1f}{timing['min'] * 1000:>9.1f}"
+              f"{breakdown['total'] * 1000:>12.1f}{breakdown['modules']:>9}")
+    for name, breakdown in results["imports"].items():
+        if not breakdown["top"]:
+            continue
+        print(f"\n{name}: slowest top-level imports")
+        for module, cumulative in breakdown["top"]:
+            print(f"  {module:<36}{cumulative * 1000:>8.1f} ms")
+    for name, breakdown in results["imports"].items():
+        if breakdown["unexpected"]:
+            print(f"\n❌ {name} imported {', '.join(breakdown['unexpected'])}, which it should load lazily.")
+
+
+def main():
+    """Parse the command line, measure startup and report or compare it."""
+    parser = argparse.ArgumentParser(description="Measure main.py startup time and import breakdown")
+    parser.add_argument("--movies", type=int, default=DEFAULT_MOVIES,
+                        help="Size of the synthetic collections (default: 1000)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per scenario (default: 5)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Slowest imports shown per scenario (default: 8)")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare the wall times with a saved JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown counted as a regression in compare mode (default: 0.2 for 20%%)")
+    args = parser.parse_args()
+
+    results = run_startup(args.movies, args.repeat, args.top)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    print_startup(results)
+    failed = any(breakdown["unexpected"] for breakdown in results["imports"].values())
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        print()
+        rows = compare(baseline, results, args.threshold)
+        print_comparison(rows, args.threshold)
+        failed = failed or any(status == "regression" for *_, status in rows)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
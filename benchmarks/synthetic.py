@@ -0,0 +1,63 @@
+"""
+Synthetic movie collections shared by the benchmarks.
+"""
+import csv
+import json
+import random
+
+WORDS = ("Night", "Blue", "Return", "Last", "City", "Dream", "Iron", "Silent", "River", "Star", "Lost", "King")
+
+
+def generate_movies(size, seed=42):
+    """
+    Generate a synthetic collection in the movies.json layout.
+
+    Titles are built from a small vocabulary plus the movie's number, so searches
+    for a word match many movies and every title is unique.
+
+    Args:
+        size (int): Number of movies
+        seed (int): Seed of the random generator
+
+    Returns:
+        dict: Title -> year, rating, poster and link
+    """
+    rng = random.Random(seed)
+    movies = {}
+    for number in range(size):
+        title = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {number}"
+        movies[title] = {
+            "year": str(rng.randint(1920, 2024)),
+            "rating": round(rng.uniform(1, 10), 1),
+            "poster": f"https://example.com/posters/{number}.jpg",
+            "link": f"https://www.imdb.com/title/tt{number:07d}"
+        }
+    return movies
+
+
+def write_json(path, movies):
+    """
+    Write a collection as a movies.json file, without the indentation StorageJson
+    uses, which makes generating a million movies several times faster.
+
+    Args:
+        path (str): File to write
+        movies (dict): Collection from generate_movies()
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"movies": movies}, file)
+
+
+def write_csv(path, movies):
+    """
+    Write a collection as a movies.csv file.
+
+    Args:
+        path (str): File to write
+        movies (dict): Collection from generate_movies()
+    """
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["title", "year", "rating", "poster"])
+        writer.writerows((title, details["year"], details["rating"], details["poster"])
+                         for title, details in movies.items())
@@ -0,0 +1,139 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from omdb.client import movie_from_payload
+
+# "Title (1999)" - a trailing year in parentheses
+YEAR_SUFFIX = re.compile(r"^(.*?)\s*\((\d{4})\)$")
+
+
+def parse_titles(lines):
+    """
+    Parse the titles to import, one per line.
+
+    A title is optionally followed by a tab and the year or by the year in
+    parentheses ("Heat\\t1995" or "Heat (1995)"). Blank lines and lines starting
+    with "#" are skipped.
+
+    Args:
+        lines (iterable): Lines of text, e.g. an open file
+
+    Returns:
+        list: (title, year) tuples, year is None when not given
+    """
+    entries = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if "\t" in line:
+            title, year = (part.strip() for part in line.split("\t", 1))
+        else:
+            match = YEAR_SUFFIX.match(line)
+            title, year = match.groups() if match else (line, None)
+        entries.append((title, year or None))
+    return entries
+
+
+def read_titles(file_path):
+    """
+    Read the titles to import from a text file, see parse_titles().
+
+    Args:
+        file_path (str): Path to the titles file
+
+    Returns:
+        list: (title, year) tuples, year is None when not given
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        return parse_titles(file)
+
+
+class BulkImporter:
+    """
+    Resolves many titles against OMDb concurrently and commits them to storage at once.
+    """
+
+    def __init__(self, storage, client, workers=8):
+        """
+        Args:
+            storage (IStorage): Storage to import the movies into
+            client (OmdbClient): OMDb client used to resolve the titles
+            workers (int): Number of concurrent lookups
+        """
+        self.storage = storage
+        self.client = client
+        self.workers = max(1, int(workers))
+
+    def _resolve(self, entry):
+        """
+        Look up one (title, year) entry.
+
+        Returns:
+            tuple: (entry, payload, cached, error)
+        """
+        import requests
+        title, year = entry
+        try:
+            payload, cached = self.client.lookup(title, year)
+            return entry, payload, cached, None
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return entry, None, False, e
+
+    def run(self, entries):
+        """
+        Import all entries and save the collection once.
+
+        Args:
+            entries (list): (title, year) tuples to import
+
+        Returns:
+            dict: Import report with counts, failures and throughput
+        """
+        report = {
+            "total": len(entries), "imported": 0, "duplicates": 0, "not_found": 0,
+            "cache_hits": 0, "cache_misses": 0, "failures": [], "seconds": 0.0
+        }
+        start = time.perf_counter()
+
+        with self.storage.batch(), ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for (title, year), payload, cached, error in executor.map(self._resolve, entries):
+                if error is not None:
+                    report["failures"].append((title, year, str(error)))
+                    continue
+                report["cache_hits" if cached else "cache_misses"] += 1
+                if payload.get("Response") != "True":
+                    report["not_found"] += 1
+                    continue
+                details = movie_from_payload(payload)
+                if self.storage.add_movie(payload["Title"], details["year"], details["rating"], details["poster"],
+                                          link=details["link"]):
+                    report["imported"] += 1
+                else:
+                    report["duplicates"] += 1
+        report["seconds"] = time.perf_counter() - start
+        report["latency"] = self.client.metrics.summary()
+        return report
+
+
+def print_report(report):
+    """
+    Print the summary of a bulk import.
+
+    Args:
+        report (dict): Report returned by BulkImporter.run
+    """
+    seconds = report["seconds"]
+    rate = report["total"] / seconds if seconds else 0.0
+    print("\n📦 Import Summary:")
+    print(f"📄 Titles processed: {report['total']} in {seconds:.2f}s ({rate:.1f} titles/s)")
+    print(f"✅ Imported: {report['imported']}")
+    print(f"⚠️ Already in collection: {report['duplicates']}")
+    print(f"❌ Not found: {report['not_found']}")
+    print(f"💾 Cache hits: {report['cache_hits']}, misses: {report['cache_misses']}")
+    latency = report["latency"]
+    print(f"⏱️ OMDb requests: {latency['requests']} ({latency['retries']} retries), "
+          f"avg {latency['avg_seconds'] * 1000:.0f} ms, p95 {latency['p95_seconds'] * 1000:.0f} ms")
+    print(f"🚫 Failed: {len(report['failures'])}")
+    for title, year, error in report["failures"]:
+        print(f"   - {title}{f' ({year})' if year else ''}: {error}")
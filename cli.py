@@ -0,0 +1,394 @@
+import json
+import os
+import sys
+from contextlib import closing
+from urllib.parse import quote_plus
+from storage import StorageConflictError, StorageListener
+
+# The OMDb client and the indexes are imported by the commands that use them, so
+# "list" or "export" start without loading them.
+
+COMMANDS = ("list", "add", "delete", "update", "stats", "search", "sort", "build-site", "import", "export")
+
+EXIT_OK = 0
+EXIT_FAILURES = 1  # Some input records could not be applied
+EXIT_CONFLICT = 3  # Another process changed the file meanwhile; nothing was saved, run the command again
+
+
+def read_records(lines):
+    """
+    Parse JSON Lines input, one record per line.
+
+    Blank lines are skipped. A line that is not valid JSON is passed on as an
+    error, so one bad line does not stop a whole batch.
+
+    Args:
+        lines (iterable): Lines of text, e.g. sys.stdin
+
+    Yields:
+        tuple: (line number, record, error) where record is the parsed value,
+            or None with an error message
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line), None
+        except ValueError as e:
+            yield number, None, f"Invalid JSON: {e}"
+
+
+def movie_record(title, details):
+    """
+    Convert a movie to an output record.
+
+    Args:
+        title (str): The title of the movie
+        details (dict): The movie's year, rating, poster and link
+
+    Returns:
+        dict: The title followed by the details
+    """
+    return {"title": title, **dict(details)}
+
+
+class ChangeRecorder(StorageListener):
+    """
+    Remembers the movie a storage changed last, e.g. to report the stored title
+    a case-insensitive delete or update matched.
+    """
+
+    def __init__(self):
+        self.title = None
+
+    def movie_added(self, title, details):
+        self.title = title
+
+    def movie_deleted(self, title, details):
+        self.title = title
+
+    def movie_updated(self, title, old_details, details):
+        self.title = title
+
+
+class CommandRunner:
+    """
+    Runs one non-interactive command against a storage.
+
+    Mutating commands read JSON Lines records, apply all of them to one loaded
+    collection and save it once. Every command writes machine-readable output:
+    one JSON object per line, or a single JSON object for summaries.
+    """
+
+    def __init__(self, storage, output=None, options=None):
+        """
+        Args:
+            storage (IStorage): Storage holding the movie collection
+            output (file, optional): Where results are written, sys.stdout by default
+            options (argparse.Namespace, optional): Parsed command line options
+                (limit, by, output_file, page_size, ...)
+        """
+        self.storage = storage
+        self.output = output or sys.stdout
+        self.options = options
+        self.failures = 0
+
+    def _option(self, name, default=None):
+        """
+        Return a command line option, or the default when it is not set.
+        """
+        value = getattr(self.options, name, None)
+        return default if value is None else value
+
+    def _write(self, record):
+        """
+        Write one JSON record on its own line.
+        """
+        self.output.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _result(self, line, status, ok, **fields):
+        """
+        Write the result of one input record and count it if it failed.
+        """
+        if not ok:
+            self.failures += 1
+        self._write({"line": line, "status": status, "ok": ok, **fields})
+
+    def run(self, command, lines=()):
+        """
+        Run a command.
+
+        Args:
+            command (str): One of COMMANDS
+            lines (iterable): Input lines for commands that read records
+
+        Returns:
+            int: Exit status, EXIT_FAILURES if any input record failed, or
+                EXIT_CONFLICT if the changes could not be saved because another
+                process changed the storage file in the meantime
+        """
+        handler = getattr(self, "_command_" + command.replace("-", "_"))
+        try:
+            handler(lines)
+        except StorageConflictError as e:
+            self._result(0, "conflict", False, error=str(e))
+            return EXIT_CONFLICT
+        return EXIT_FAILURES if self.failures else EXIT_OK
+
+    def _mutate(self, lines, apply):
+        """
+        Apply input records through the storage's add, delete and update methods,
+        in one batch that saves once and leaves the storage unchanged if applying
+        them fails.
+
+        Args:
+            lines (iterable): JSON Lines input
+            apply (callable): apply(line, record, changes) makes the change of one
+                record; changes is a ChangeRecorder telling which movie it touched
+        """
+        changes = ChangeRecorder()
+        self.storage.add_listener(changes, reset=False)
+        try:
+            with self.storage.batch():
+                for line, record, error in read_records(lines):
+                    if error is not None:
+                        self._result(line, "invalid", False, error=error)
+                        continue
+                    apply(line, record, changes)
+        finally:
+            self.storage.remove_listener(changes)
+
+    @staticmethod
+    def _title_of(record):
+        """
+        Return the title of a record given as {"title": ...} or as a plain string.
+        """
+        if isinstance(record, str):
+            return record
+        if isinstance(record, dict) and isinstance(record.get("title"), str):
+            return record["title"]
+        return None
+
+    def _command_list(self, lines):
+        """Write every movie as one JSON line, streamed from storage."""
+        limit = self._option("limit")
+        with closing(self.storage.iter_movies()) as movies:
+            for number, (title, details) in enumerate(movies):
+                if limit is not None and number >= limit:
+                    break
+                self._write(movie_record(title, details))
+
+    def _command_add(self, lines):
+        """
+        Add movies given as {"title", "year", "rating", "poster"} records.
+
+        Records without a rating or poster are looked up on OMDb by title and year.
+        """
+        client = None
+
+        def apply(line, record, changes):
+            nonlocal client
+            title = self._title_of(record)
+            if title is None:
+                self._result(line, "invalid", False, error="Expected a title")
+                return
+            record = record if isinstance(record, dict) else {"title": title}
+
+            if record.get("rating") is None or record.get("poster") is None:
+                from omdb import get_default_client, getenv, movie_from_payload
+                if client is None:
+                    if not getenv("OMDB_API_KEY"):
+                        self._result(line, "error", False, title=title, error="OMDB_API_KEY is missing")
+                        return
+                    client = get_default_client()
+                import requests
+                try:
+                    payload, _ = client.lookup(title, record.get("year"))
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    self._result(line, "error", False, title=title, error=str(e))
+                    return
+                if payload.get("Response") != "True":
+                    self._result(line, "not_found", False, title=title)
+                    return
+                title, details = payload["Title"], movie_from_payload(payload)
+            else:
+                try:
+                    rating = float(record["rating"])
+                except (TypeError, ValueError):
+                    self._result(line, "invalid", False, title=title, error="Rating must be a number")
+                    return
+                details = {
+                    "year": record.get("year", ""),
+                    "rating": rating,
+                    "poster": record["poster"],
+                    "link": record.get("link") or f"https://www.imdb.com/find?q={quote_plus(title)}"
+                }
+
+            if self.storage.add_movie(title, details["year"], details["rating"], details["poster"],
+                                      link=details["link"]):
+                self._result(line, "added", True, title=title)
+            else:
+                self._result(line, "exists", True, title=title)
+
+        self._mutate(lines, apply)
+
+    def _command_delete(self, lines):
+        """Delete movies given as {"title"} records or plain JSON strings."""
+        def apply(line, record, changes):
+            title = self._title_of(record)
+            if title is None:
+                self._result(line, "invalid", False, error="Expected a title")
+            elif self.storage.delete_movie(title):
+                self._result(line, "deleted", True, title=changes.title)
+            else:
+                self._result(line, "missing", False, title=title)
+
+        self._mutate(lines, apply)
+
+    def _command_update(self, lines):
+        """Update ratings given as {"title", "rating"} records."""
+        def apply(line, record, changes):
+            title = self._title_of(record)
+            try:
+                rating = float(record["rating"])
+            except (KeyError, TypeError, ValueError):
+                rating = None
+            if title is None or rating is None or not 1 <= rating <= 10:
+                self._result(line, "invalid", False, title=title,
+                             error="Expected a title and a rating between 1 and 10")
+            elif self.storage.update_movie(title, rating):
+                self._result(line, "updated", True, title=changes.title, rating=rating)
+            else:
+                self._result(line, "missing", False, title=title)
+
+        self._mutate(lines, apply)
+
+    def _command_stats(self, lines):
+        """Write the collection statistics as one JSON object."""
+        from indexes import RatingAnalytics, StatsEngine
+        movies = self.storage.list_movies()
+        if self._option("analytics", False):
+            analytics = RatingAnalytics()
+            analytics.reset(movies)
+            summary = dict(analytics.summary(), decades=analytics.decades(),
+                           histogram=analytics.histogram())
+        else:
+            stats = StatsEngine()
+            stats.reset(movies)
+            summary = dict(stats.summary(), years=stats.year_histogram())
+        self._write(summary)
+
+    def _command_search(self, lines):
+        """
+        Answer {"query"} records (or plain JSON strings) with the matching movies.
+
+        Queries without a match get close matches as suggestions instead.
+        """
+        from indexes import SearchIndex
+        movies = self.storage.list_movies()
+        index = SearchIndex()
+        index.reset(movies)
+        limit = self._option("limit")
+        for line, record, error in read_records(lines):
+            query = record if isinstance(record, str) else record.get("query") if isinstance(record, dict) else None
+            if error is not None or not isinstance(query, str):
+                self._result(line, "invalid", False, error=error or "Expected a query")
+                continue
+            titles = index.search(query, limit)
+            if titles:
+                self._result(line, "found", True, query=query,
+                             results=[movie_record(title, movies[title]) for title in titles])
+            else:
+                suggestions = [title for title, _ in index.fuzzy_search(query, limit=limit or 5)]
+                self._result(line, "no_match", True, query=query, suggestions=suggestions)
+
+    def _command_sort(self, lines):
+        """Write the movies sorted by rating (best first) or by year (oldest first)."""
+        movies = self.storage.list_movies()
+        if self._option("by", "rating") == "year":
+            key = lambda item: str(item[1].get("year", ""))
+            ordered = sorted(movies.items(), key=key)[:self._option("limit")]
+        else:
+            key = lambda item: item[1]["rating"] if item[1]["rating"] is not None else float("-inf")
+            limit = self._option("limit")
+            from indexes import top_n
+            ordered = (top_n(movies.items(), limit, key=key) if limit is not None
+                       else sorted(movies.items(), key=key, reverse=True))
+        for title, details in ordered:
+            self._write(movie_record(title, details))
+
+    def _command_build_site(self, lines):
+        """Generate the website and write the build statistics as one JSON object."""
+        from website import OUTPUT_PATH, SITE_DIR, build_paginated_site, write_site
+        movies = self.storage.list_movies()
+        page_size = self._option("page_size")
+        items = movies.items()
+        poster_stats = {}
+        if self._option("posters", False):
+            from website.posters import DEFAULT_MAX_AGE, PosterCache
+            try:
+                posters = PosterCache(workers=self._option("poster_workers", 8),
+                                      max_age=0 if self._option("refresh_posters", False) else DEFAULT_MAX_AGE,
+                                      thumbnail_width=self._option("thumbnails"))
+            except ValueError as e:
+                self._result(0, "error", False, error=str(e))
+                return
+            try:
+                poster_stats = {"posters": posters.prefetch(details.get("poster") for details in movies.values())}
+            finally:
+                posters.close()
+            items = posters.localize(items, SITE_DIR if page_size else os.path.dirname(OUTPUT_PATH))
+        try:
+            if page_size:
+                stats = build_paginated_site(items, SITE_DIR, page_size,
+                                             not self._option("full_rebuild", False),
+                                             workers=self._option("build_workers", 1))
+                self._write(dict(stats, output=os.path.join(SITE_DIR, "index.html"), **poster_stats))
+            else:
+                count = write_site(items)
+                self._write(dict({"movies": count, "output": "movies.html"}, **poster_stats))
+        except FileNotFoundError as e:
+            self._result(0, "error", False, error=f"HTML template file not found: {e.filename}")
+
+    def _command_import(self, lines):
+        """
+        Import titles (plain text, one per line, see bulk_import.parse_titles) from OMDb
+        and write the import report as one JSON object.
+        """
+        from omdb import OmdbClient, get_default_cache, getenv
+        if not getenv("OMDB_API_KEY"):
+            self._result(0, "error", False, error="OMDB_API_KEY is missing")
+            return
+        from bulk_import import BulkImporter, parse_titles
+        workers = self._option("workers", 8)
+        client = OmdbClient.from_env(rate=self._option("rate", 10), pool_size=workers, cache=get_default_cache())
+        try:
+            report = BulkImporter(self.storage, client, workers=workers).run(parse_titles(lines))
+        finally:
+            client.close()
+        report["failures"] = [{"title": title, "year": year, "error": error}
+                              for title, year, error in report["failures"]]
+        self.failures += len(report["failures"])
+        self._write(report)
+
+    def _command_export(self, lines):
+        """
+        Write the whole collection to --output (JSON, CSV or MBIN, by extension),
+        or to the output stream in the movies.json format.
+        """
+        output_file = self._option("output_file")
+        movies = self.storage.list_movies()
+        if output_file is None:
+            json.dump({"movies": {title: dict(details) for title, details in movies.items()}},
+                      self.output, indent=4, ensure_ascii=False)
+            self.output.write("\n")
+            return
+
+        import storage
+        file_extension = os.path.splitext(output_file)[-1].lower()
+        targets = {".json": "StorageJson", ".csv": "StorageCsv", ".mbin": "StorageMmap"}
+        if file_extension not in targets:
+            self._result(0, "error", False, error=f"Cannot export to '{output_file}': use a JSON, CSV or MBIN file.")
+            return
+        getattr(storage, targets[file_extension])(output_file)._save_movies(movies)  # Only loads that backend
+        self._write({"movies": len(movies), "output": output_file})
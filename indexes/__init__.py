@@ -0,0 +1,6 @@
+from .stats import StatsEngine
+from .search import SearchIndex
+from .ordered import OrderedIndex, top_n
+from .analytics import RatingAnalytics, HAS_NUMPY
+
+__all__ = ["StatsEngine", "SearchIndex", "OrderedIndex", "top_n", "RatingAnalytics", "HAS_NUMPY"]
\ No newline at end of file
@@ -0,0 +1,288 @@
+import importlib.util
+import math
+from storage.istorage import StorageListener
+from .stats import _rating_of
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None  # Optional; the pure-Python path is used without it
+np = None  # The numpy module, imported when the first RatingAnalytics uses it
+UNKNOWN_YEAR = 0  # Stored in the year column when a movie has no usable year
+
+
+def _load_numpy():
+    """
+    Import NumPy on first use, so programs that never compute analytics do not pay for it.
+    """
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+
+def _year_of(details):
+    """
+    Return the release year of a movie as an int, taken from the first four digits.
+
+    Series years such as "2008–2013" count as their first year.
+
+    Args:
+        details (dict): The movie's details
+
+    Returns:
+        int: The year, or UNKNOWN_YEAR if it has no usable year
+    """
+    year = str(details.get("year", ""))[:4]
+    return int(year) if year.isdigit() else UNKNOWN_YEAR
+
+
+class RatingAnalytics(StorageListener):
+    """
+    Column-oriented analytics over the ratings and years of the whole collection.
+
+    Ratings and years are copied once into contiguous arrays, and mean, median,
+    percentiles, histograms, per-decade aggregates and the rating ranking are
+    computed over those arrays: vectorised with NumPy when it is installed, with
+    plain Python otherwise. Storage changes only mark the columns as stale; the
+    caller reloads them with reset() before the next query.
+    """
+
+    def __init__(self, use_numpy=None):
+        """
+        Args:
+            use_numpy (bool, optional): Force the NumPy (True) or pure-Python (False)
+                path; by default NumPy is used when it is installed
+        """
+        if use_numpy and not HAS_NUMPY:
+            raise ValueError("NumPy is not installed. Install it with 'pip install numpy'.")
+        self.use_numpy = HAS_NUMPY if use_numpy is None else bool(use_numpy)
+        if self.use_numpy:
+            _load_numpy()
+        self.reset({})
+
+    def reset(self, movies):
+        """
+        Load the rating and year columns from the complete collection.
+
+        Args:
+            movies (dict): Dictionary of movie information
+        """
+        titles = list(movies)
+        ratings = [_rating_of(details) for details in movies.values()]
+        years = [_year_of(details) for details in movies.values()]
+        self.load_columns(titles, [math.nan if rating is None else rating for rating in ratings], years)
+
+    def load_columns(self, titles, ratings, years):
+        """
+        Load the columns directly, e.g. from generated data.
+
+        Args:
+            titles (sequence): Movie titles
+            ratings (sequence): Ratings as floats, NaN for unrated movies
+            years (sequence): Release years as ints, UNKNOWN_YEAR when not known
+        """
+        self._titles = titles
+        if self.use_numpy:
+            self._ratings = np.asarray(ratings, dtype=np.float64)
+            self._years = np.asarray(years, dtype=np.int64)
+            self._rated = np.sort(self._ratings[~np.isnan(self._ratings)])
+        else:
+            self._ratings = list(ratings)
+            self._years = list(years)
+            self._rated = sorted(rating for rating in self._ratings if not math.isnan(rating))
+        self.stale = False
+
+    def movie_added(self, title, details):
+        """Mark the columns as stale."""
+        self.stale = True
+
+    def movie_deleted(self, title, details):
+        """Mark the columns as stale."""
+        self.stale = True
+
+    def movie_updated(self, title, old_details, details):
+        """Mark the columns as stale."""
+        self.stale = True
+
+    def __len__(self):
+        """Return the number of loaded movies."""
+        return len(self._ratings)
+
+    @property
+    def count(self):
+        """int: Number of rated movies."""
+        return len(self._rated)
+
+    @property
+    def average(self):
+        """float: Mean rating, None for an empty collection."""
+        if not self.count:
+            return None
+        if self.use_numpy:
+            return float(self._rated.mean())
+        return math.fsum(self._rated) / self.count
+
+    @property
+    def median(self):
+        """float: Median rating, None for an empty collection."""
+        return self.percentile(50)
+
+    @property
+    def stdev(self):
+        """float: Sample standard deviation of the ratings, None with fewer than two movies."""
+        if self.count < 2:
+            return None
+        if self.use_numpy:
+            return float(self._rated.std(ddof=1))
+        mean = self.average
+        return math.sqrt(math.fsum((rating - mean) ** 2 for rating in self._rated) / (self.count - 1))
+
+    @property
+    def best(self):
+        """tuple: (title, rating) of the highest rated movie, None for an empty collection."""
+        if not self.count:
+            return None
+        if self.use_numpy:
+            index = int(np.nanargmax(self._ratings))
+        else:
+            index = -max((rating, -index) for index, rating in enumerate(self._ratings)
+                         if not math.isnan(rating))[1]
+        return self._titles[index], float(self._ratings[index])
+
+    @property
+    def worst(self):
+        """tuple: (title, rating) of the lowest rated movie, None for an empty collection."""
+        if not self.count:
+            return None
+        if self.use_numpy:
+            index = int(np.nanargmin(self._ratings))
+        else:
+            index = min((rating, index) for index, rating in enumerate(self._ratings)
+                        if not math.isnan(rating))[1]
+        return self._titles[index], float(self._ratings[index])
+
+    def percentile(self, percent):
+        """
+        Return a rating percentile, interpolating between neighbouring ratings.
+
+        Matches StatsEngine.percentile and numpy.percentile.
+
+        Args:
+            percent (float): Percentile between 0 and 100
+
+        Returns:
+            float: The rating at that percentile, None for an empty collection
+        """
+        if not self.count:
+            return None
+        if self.use_numpy:
+            return float(np.percentile(self._rated, percent))
+        position = (self.count - 1) * percent / 100
+        lower = math.floor(position)
+        upper = min(lower + 1, self.count - 1)
+        return self._rated[lower] + (self._rated[upper] - self._rated[lower]) * (position - lower)
+
+    def histogram(self, bins=10, low=0.0, high=10.0):
+        """
+        Count the rated movies in equally wide rating bins.
+
+        The last bin includes its upper edge, like numpy.histogram.
+
+        Args:
+            bins (int): Number of bins
+            low (float): Lower edge of the first bin
+            high (float): Upper edge of the last bin
+
+        Returns:
+            list: (bin start, bin end, number of movies) tuples
+        """
+        width = (high - low) / bins
+        edges = [low + width * i for i in range(bins)] + [high]
+        if self.use_numpy:
+            counts = np.histogram(self._rated, bins=bins, range=(low, high))[0].tolist()
+        else:
+            counts = [0] * bins
+            for rating in self._rated:
+                if low <= rating <= high:
+                    counts[min(int((rating - low) / width), bins - 1)] += 1
+        return [(edges[i], edges[i + 1], counts[i]) for i in range(bins)]
+
+    def decades(self):
+        """
+        Aggregate the movies per release decade.
+
+        Returns:
+            dict: Decade (e.g. 1990) -> {"count": movies, "average": mean rating or None},
+                sorted by decade; movies without a year are left out
+        """
+        if self.use_numpy:
+            known = self._years != UNKNOWN_YEAR
+            decades, inverse, counts = np.unique(self._years[known] // 10 * 10,
+                                                 return_inverse=True, return_counts=True)
+            ratings = self._ratings[known]
+            rated = ~np.isnan(ratings)
+            rated_counts = np.bincount(inverse[rated], minlength=len(decades))
+            totals = np.bincount(inverse[rated], weights=ratings[rated], minlength=len(decades))
+            return {int(decade): {"count": int(count),
+                                  "average": float(total / rated_count) if rated_count else None}
+                    for decade, count, rated_count, total in zip(decades, counts, rated_counts, totals)}
+
+        aggregates = {}
+        for year, rating in zip(self._years, self._ratings):
+            if year == UNKNOWN_YEAR:
+                continue
+            aggregate = aggregates.setdefault(year // 10 * 10, [0, 0, 0.0])
+            aggregate[0] += 1
+            if not math.isnan(rating):
+                aggregate[1] += 1
+                aggregate[2] += rating
+        return {decade: {"count": count, "average": total / rated_count if rated_count else None}
+                for decade, (count, rated_count, total) in sorted(aggregates.items())}
+
+    def ranking(self, limit=None):
+        """
+        Return the positions of the movies ordered by rating, best first.
+
+        Ties keep the collection order and unrated movies come last.
+
+        Args:
+            limit (int, optional): Only return the first positions
+
+        Returns:
+            list: Positions into the loaded columns, see title()
+        """
+        if self.use_numpy:
+            order = np.argsort(-self._ratings, kind="stable")
+            return order[:limit].tolist()
+        order = sorted(range(len(self._ratings)),
+                       key=lambda index: (math.isnan(self._ratings[index]), -self._ratings[index]))
+        return order[:limit]
+
+    def title(self, position):
+        """
+        Return the title at a position returned by ranking().
+
+        Args:
+            position (int): Position into the loaded columns
+
+        Returns:
+            str: The title
+        """
+        return self._titles[position]
+
+    def summary(self):
+        """
+        Return all statistics as a dictionary.
+
+        Returns:
+            dict: Count, average, median, standard deviation, quartiles, best and worst movie
+        """
+        return {
+            "count": self.count,
+            "average": self.average,
+            "median": self.median,
+            "stdev": self.stdev,
+            "p25": self.percentile(25),
+            "p75": self.percentile(75),
+            "p90": self.percentile(90),
+            "best": self.best,
+            "worst": self.worst
+        }
@@ -0,0 +1,170 @@
+import heapq
+import random
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+from storage.istorage import StorageListener
+from .stats import _rating_of
+
+
+def top_n(movies, n, key=lambda item: item[1]["rating"]):
+    """
+    Select the n largest movies without sorting the whole collection.
+
+    For collections without an ordered index; runs in O(len(movies) * log n).
+
+    Args:
+        movies (iterable): (title, details) pairs
+        n (int): Number of movies to return
+        key (callable): Sort key of a (title, details) pair, the rating by default
+
+    Returns:
+        list: Up to n (title, details) pairs, largest first
+    """
+    return heapq.nlargest(n, movies, key=key)
+
+
+class OrderedIndex(StorageListener):
+    """
+    Secondary indexes that keep the titles ordered by rating and by year.
+
+    Both are lists kept sorted with bisect, so the first page of a sorted listing,
+    the top N or all movies within a rating range are slices instead of a sort of
+    the full collection. Ties keep the order in which the movies were added.
+    """
+
+    def __init__(self):
+        """Start with an empty index; IStorage.add_listener fills it."""
+        self.reset({})
+
+    def reset(self, movies):
+        """
+        Rebuild the index from the complete collection.
+
+        Args:
+            movies (dict): Dictionary of movie information
+        """
+        self._counter = count()
+        self._entries = {}    # title -> (rating key, year key) as stored in the lists
+        for title, details in movies.items():
+            self._entries[title] = self._keys(title, details, next(self._counter))
+        # Sorted once; inserting every movie with insort would be quadratic
+        self._by_rating = sorted(rating_key for rating_key, _ in self._entries.values())  # (-rating, seq, title)
+        self._by_year = sorted(year_key for _, year_key in self._entries.values())  # (year, seq, title)
+
+    @staticmethod
+    def _keys(title, details, seq):
+        """
+        Return the (rating key, year key) of one movie as stored in the lists.
+        """
+        rating = _rating_of(details)
+        rating_key = (-(rating if rating is not None else float("-inf")), seq, title)
+        year_key = (str(details.get("year", "")), seq, title)
+        return rating_key, year_key
+
+    def _add(self, title, details, seq):
+        """
+        Insert one movie into both lists.
+        """
+        rating_key, year_key = self._keys(title, details, seq)
+        insort(self._by_rating, rating_key)
+        insort(self._by_year, year_key)
+        self._entries[title] = (rating_key, year_key)
+
+    def _remove(self, title):
+        """
+        Remove one movie from both lists.
+
+        Returns:
+            int: The insertion sequence number of the movie, None if it was not indexed
+        """
+        entry = self._entries.pop(title, None)
+        if entry is None:
+            return None
+        rating_key, year_key = entry
+        del self._by_rating[bisect_left(self._by_rating, rating_key)]
+        del self._by_year[bisect_left(self._by_year, year_key)]
+        return rating_key[1]
+
+    def movie_added(self, title, details):
+        """Index a new movie."""
+        self._add(title, details, next(self._counter))
+
+    def movie_deleted(self, title, details):
+        """Remove a deleted movie from the index."""
+        self._remove(title)
+
+    def movie_updated(self, title, old_details, details):
+        """Move a movie to the position of its new rating, keeping its tie-break order."""
+        seq = self._remove(title)
+        self._add(title, details, seq if seq is not None else next(self._counter))
+
+    def __len__(self):
+        """Return the number of indexed movies."""
+        return len(self._entries)
+
+    def top(self, n):
+        """
+        Return the n best rated titles.
+
+        Args:
+            n (int): Number of titles
+
+        Returns:
+            list: Titles, best rated first
+        """
+        return [title for _, _, title in self._by_rating[:n]]
+
+    def page(self, number, size, by="rating"):
+        """
+        Return one page of a sorted listing.
+
+        Args:
+            number (int): Page number, starting at 1
+            size (int): Number of titles per page
+            by (str): "rating" (best first) or "year" (oldest first)
+
+        Returns:
+            list: Titles on that page, empty past the last page
+        """
+        entries = self._by_rating if by == "rating" else self._by_year
+        start = (number - 1) * size
+        return [title for _, _, title in entries[start:start + size]]
+
+    def rated_between(self, low, high):
+        """
+        Return the titles with a rating between low and high (inclusive).
+
+        Args:
+            low (float): Minimum rating
+            high (float): Maximum rating
+
+        Returns:
+            list: Titles, best rated first
+        """
+        start = bisect_left(self._by_rating, (-high,))
+        end = bisect_right(self._by_rating, (-low, float("inf")))
+        return [title for _, _, title in self._by_rating[start:end]]
+
+    def from_year(self, year):
+        """
+        Return the titles released in a given year.
+
+        Args:
+            year (str): The release year
+
+        Returns:
+            list: Titles in the order they were added
+        """
+        year = str(year)
+        start = bisect_left(self._by_year, (year,))
+        end = bisect_left(self._by_year, (year + "\0",))
+        return [title for _, _, title in self._by_year[start:end]]
+
+    def random_title(self):
+        """
+        Pick a random title without copying the collection.
+
+        Returns:
+            str: A title, None for an empty collection
+        """
+        return random.choice(self._by_rating)[2] if self._by_rating else None
@@ -0,0 +1,221 @@
+import heapq
+import json
+import os
+from collections import Counter, defaultdict
+from itertools import islice
+from storage.istorage import StorageListener
+
+INDEX_VERSION = 1
+
+
+def _trigrams(text):
+    """
+    Return the set of three-character substrings of a text.
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        set: The trigrams of the text
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _padded(lowered):
+    """
+    Pad a lowercase title so its first and last characters also form trigrams.
+    """
+    return f"  {lowered} "
+
+
+class SearchIndex(StorageListener):
+    """
+    Trigram inverted index over the movie titles.
+
+    Every title gets an id and is listed under each trigram of its lowercase,
+    padded form. Substring queries intersect the postings of the query's trigrams
+    and verify the few remaining candidates; fuzzy queries rank titles by the
+    share of trigrams they have in common with the query, which tolerates typos.
+    """
+
+    def __init__(self):
+        """Start with an empty index; IStorage.add_listener fills it."""
+        self.reset({})
+
+    def reset(self, movies):
+        """
+        Rebuild the index from the complete collection.
+
+        Args:
+            movies (dict): Dictionary of movie information
+        """
+        self._titles = list(movies)                              # id -> title, None once deleted
+        self._lowered = [title.lower() for title in self._titles]  # id -> lowercase title, None once deleted
+        self._sizes = []       # id -> number of trigrams of the padded title
+        self._ids = {title: movie_id for movie_id, title in enumerate(self._titles)}  # title -> id
+        self._postings = defaultdict(set)
+        # The same steps as _add, inlined: this loop dominates startup on large collections
+        postings, sizes = self._postings, self._sizes
+        for movie_id, lowered in enumerate(self._lowered):
+            grams = _trigrams(_padded(lowered))
+            sizes.append(len(grams))
+            for gram in grams:
+                postings[gram].add(movie_id)
+
+    def _add(self, title):
+        """
+        Index one title.
+        """
+        if title in self._ids:
+            return
+        movie_id = len(self._titles)
+        lowered = title.lower()
+        grams = _trigrams(_padded(lowered))
+        self._ids[title] = movie_id
+        self._titles.append(title)
+        self._lowered.append(lowered)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings[gram].add(movie_id)
+
+    def _remove(self, title):
+        """
+        Drop one title from the index.
+        """
+        movie_id = self._ids.pop(title, None)
+        if movie_id is None:
+            return
+        for gram in _trigrams(_padded(self._lowered[movie_id])):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(movie_id)
+                if not posting:
+                    del self._postings[gram]
+        self._titles[movie_id] = None
+        self._lowered[movie_id] = None
+
+    def movie_added(self, title, details):
+        """Index a new movie."""
+        self._add(title)
+
+    def movie_deleted(self, title, details):
+        """Remove a deleted movie from the index."""
+        self._remove(title)
+
+    def __len__(self):
+        """Return the number of indexed titles."""
+        return len(self._ids)
+
+    def search(self, query, limit=None):
+        """
+        Find the titles that contain the query, ignoring case.
+
+        Args:
+            query (str): Text to look for
+            limit (int, optional): Maximum number of results
+
+        Returns:
+            list: Matching titles in the order they were added
+        """
+        query = query.lower()
+        grams = _trigrams(query)
+        if not grams:  # Queries shorter than three characters cannot use the postings
+            candidates = (movie_id for movie_id, lowered in enumerate(self._lowered)
+                          if lowered is not None and query in lowered)
+        else:
+            postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+            matches = postings[0].intersection(*postings[1:])
+            candidates = (movie_id for movie_id in sorted(matches) if query in self._lowered[movie_id])
+        return [self._titles[movie_id] for movie_id in islice(candidates, limit)]
+
+    def fuzzy_search(self, query, limit=10, min_score=0.3):
+        """
+        Rank titles by trigram similarity to the query, tolerating typos.
+
+        The score is the Jaccard similarity of the trigram sets: 1.0 for the same
+        title, lower the more characters differ.
+
+        Args:
+            query (str): Text to look for
+            limit (int): Maximum number of results
+            min_score (float): Minimum similarity between 0 and 1
+
+        Returns:
+            list: (title, score) tuples, best match first
+        """
+        grams = _trigrams(_padded(query.lower()))
+        shared = Counter()
+        for gram in grams:
+            for movie_id in self._postings.get(gram, ()):
+                shared[movie_id] += 1
+
+        scored = []
+        for movie_id, common in shared.items():
+            score = common / (len(grams) + self._sizes[movie_id] - common)
+            if score >= min_score:
+                scored.append((score, -movie_id))
+        best = heapq.nlargest(limit, scored)
+        return [(self._titles[-negative_id], score) for score, negative_id in best]
+
+    def find(self, title):
+        """
+        Return the stored spelling of a title, ignoring case.
+
+        Args:
+            title (str): The title to look up
+
+        Returns:
+            str: The title as stored, or None if it is not in the index
+        """
+        if title in self._ids:
+            return title
+        matches = self.search(title)
+        lowered = title.lower()
+        return next((match for match in matches if match.lower() == lowered), None)
+
+    def save(self, path, signature):
+        """
+        Save the index so the next start does not have to rebuild it.
+
+        Args:
+            path (str): Path of the index file
+            signature (list): Identifies the storage state the index belongs to,
+                e.g. the storage file's modification time and size
+        """
+        data = {
+            "version": INDEX_VERSION,
+            "signature": list(signature),
+            "titles": self._titles,
+            "sizes": self._sizes,
+            "postings": {gram: list(posting) for gram, posting in self._postings.items()}
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def load(self, path, signature):
+        """
+        Load a saved index if it belongs to the given storage state.
+
+        Args:
+            path (str): Path of the index file
+            signature (list): Expected storage signature, see save()
+
+        Returns:
+            bool: True if the index was loaded, False if it is missing or stale
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != INDEX_VERSION or data.get("signature") != list(signature):
+            return False
+
+        self._titles = data["titles"]
+        self._lowered = [title.lower() if title is not None else None for title in self._titles]
+        self._sizes = data["sizes"]
+        self._ids = {title: movie_id for movie_id, title in enumerate(self._titles) if title is not None}
+        self._postings = defaultdict(set, ((gram, set(ids)) for gram, ids in data["postings"].items()))
+        return True
@@ -0,0 +1,178 @@
+import math
+from bisect import bisect_left, insort
+from collections import Counter
+from storage.istorage import StorageListener
+
+
+def _rating_of(details):
+    """
+    Return the rating of a movie as a float, or None if it has no usable rating.
+
+    Args:
+        details (dict): The movie's details
+
+    Returns:
+        float: The rating, or None
+    """
+    try:
+        return float(details.get("rating"))
+    except (TypeError, ValueError):
+        return None
+
+
+class StatsEngine(StorageListener):
+    """
+    Collection statistics kept up to date incrementally from storage changes.
+
+    Running totals give the count, average and standard deviation in O(1). A list of
+    (rating, title) pairs kept sorted with bisect gives the median, percentiles and
+    the best and worst movies without sorting the collection on every call.
+    """
+
+    def __init__(self):
+        """Start with empty statistics; IStorage.add_listener fills them."""
+        self.reset({})
+
+    def reset(self, movies):
+        """
+        Rebuild all statistics from the complete collection.
+
+        Args:
+            movies (dict): Dictionary of movie information
+        """
+        self._ranked = []       # (rating, title), kept sorted
+        self._total = 0.0
+        self._total_squares = 0.0
+        self._years = Counter()
+        for title, details in movies.items():
+            self._years[str(details.get("year", ""))] += 1
+            rating = _rating_of(details)
+            if rating is not None:
+                self._ranked.append((rating, title))
+                self._total += rating
+                self._total_squares += rating * rating
+        self._ranked.sort()  # Once; inserting every movie with insort would be quadratic
+
+    def _add(self, title, details):
+        """
+        Account for one movie.
+        """
+        self._years[str(details.get("year", ""))] += 1
+        rating = _rating_of(details)
+        if rating is None:
+            return
+        insort(self._ranked, (rating, title))
+        self._total += rating
+        self._total_squares += rating * rating
+
+    def _remove(self, title, details):
+        """
+        Stop accounting for one movie.
+        """
+        year = str(details.get("year", ""))
+        self._years[year] -= 1
+        if self._years[year] <= 0:
+            del self._years[year]
+        rating = _rating_of(details)
+        if rating is None:
+            return
+        index = bisect_left(self._ranked, (rating, title))
+        if index < len(self._ranked) and self._ranked[index] == (rating, title):
+            del self._ranked[index]
+            self._total -= rating
+            self._total_squares -= rating * rating
+
+    def movie_added(self, title, details):
+        """Account for a new movie."""
+        self._add(title, details)
+
+    def movie_deleted(self, title, details):
+        """Forget a deleted movie."""
+        self._remove(title, details)
+
+    def movie_updated(self, title, old_details, details):
+        """Replace the old rating of a movie with the new one."""
+        self._remove(title, old_details)
+        self._add(title, details)
+
+    @property
+    def count(self):
+        """int: Number of rated movies."""
+        return len(self._ranked)
+
+    @property
+    def average(self):
+        """float: Mean rating, None for an empty collection."""
+        return self._total / len(self._ranked) if self._ranked else None
+
+    @property
+    def median(self):
+        """float: Median rating, None for an empty collection."""
+        return self.percentile(50)
+
+    @property
+    def stdev(self):
+        """float: Sample standard deviation of the ratings, None with fewer than two movies."""
+        count = len(self._ranked)
+        if count < 2:
+            return None
+        variance = (self._total_squares - self._total * self._total / count) / (count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    @property
+    def best(self):
+        """tuple: (title, rating) of the highest rated movie, None for an empty collection."""
+        return (self._ranked[-1][1], self._ranked[-1][0]) if self._ranked else None
+
+    @property
+    def worst(self):
+        """tuple: (title, rating) of the lowest rated movie, None for an empty collection."""
+        return (self._ranked[0][1], self._ranked[0][0]) if self._ranked else None
+
+    def percentile(self, percent):
+        """
+        Return a rating percentile, interpolating between neighbouring ratings.
+
+        The 50th percentile equals statistics.median.
+
+        Args:
+            percent (float): Percentile between 0 and 100
+
+        Returns:
+            float: The rating at that percentile, None for an empty collection
+        """
+        if not self._ranked:
+            return None
+        position = (len(self._ranked) - 1) * percent / 100
+        lower = math.floor(position)
+        upper = min(lower + 1, len(self._ranked) - 1)
+        fraction = position - lower
+        return self._ranked[lower][0] + (self._ranked[upper][0] - self._ranked[lower][0]) * fraction
+
+    def year_histogram(self):
+        """
+        Return the number of movies per release year.
+
+        Returns:
+            dict: Year -> number of movies, sorted by year
+        """
+        return dict(sorted(self._years.items()))
+
+    def summary(self):
+        """
+        Return all statistics as a dictionary.
+
+        Returns:
+            dict: Count, average, median, standard deviation, quartiles, best and worst movie
+        """
+        return {
+            "count": self.count,
+            "average": self.average,
+            "median": self.median,
+            "stdev": self.stdev,
+            "p25": self.percentile(25),
+            "p75": self.percentile(75),
+            "p90": self.percentile(90),
+            "best": self.best,
+            "worst": self.worst
+        }
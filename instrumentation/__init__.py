@@ -0,0 +1,6 @@
+from .metrics import Histogram, Metrics, MetricsHook, format_report, get_default_metrics
+from .wrappers import instrument_app, instrument_omdb, instrument_storage
+from .profiling import ProfileSession
+
+__all__ = ["Histogram", "Metrics", "MetricsHook", "format_report", "get_default_metrics", "instrument_app",
+           "instrument_omdb", "instrument_storage", "ProfileSession"]
\ No newline at end of file
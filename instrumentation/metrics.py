@@ -0,0 +1,239 @@
+import bisect
+import math
+import threading
+
+# Upper bounds of the latency histogram buckets in seconds, from 50 µs to 30 s
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+
+
+class MetricsHook:
+    """
+    Base class for forwarding metrics to another collector (StatsD, Prometheus, a log, ...).
+    Register one with Metrics.add_hook; every method does nothing by default, so
+    subclasses only override what they need.
+    """
+
+    def timing(self, name, seconds):
+        """
+        An operation finished.
+
+        Args:
+            name (str): Metric name, e.g. "storage.StorageJson._load_movies"
+            seconds (float): How long it took
+        """
+        pass
+
+    def count(self, name, value):
+        """
+        A counter was increased.
+
+        Args:
+            name (str): Metric name, e.g. "storage.StorageJson.bytes_read"
+            value (int): The increase
+        """
+        pass
+
+
+class Histogram:
+    """
+    Latency histogram with fixed buckets, so recording is O(log buckets) and
+    memory does not grow with the number of calls.
+    """
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds):
+        """
+        Add one measurement.
+
+        Args:
+            seconds (float): Duration in seconds
+        """
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percent):
+        """
+        Estimate a percentile as the upper bound of the bucket it falls into,
+        capped at the largest measurement.
+
+        Args:
+            percent (float): Percentile between 0 and 100
+
+        Returns:
+            float: Duration in seconds, 0.0 if nothing was recorded
+        """
+        if not self.count:
+            return 0.0
+        rank = math.ceil(percent / 100 * self.count)
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= max(rank, 1):
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        """
+        Return the histogram as a dictionary.
+
+        Returns:
+            dict: Call count, total, mean, min, max and percentiles in seconds,
+                and the non-empty buckets as {upper bound: count}
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": {("inf" if bound == math.inf else bound): count
+                        for bound, count in zip(BUCKETS, self.counts) if count}
+        }
+
+
+class Metrics:
+    """
+    Thread-safe registry of latency histograms and counters, shared by the
+    instrumentation wrappers of one session.
+
+    Counters whose names end in ".hits" and ".misses" are reported together as a
+    hit rate.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """
+        Forward every measurement to a hook as well.
+
+        Args:
+            hook (MetricsHook): The hook to call
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """
+        Stop forwarding measurements to a hook.
+
+        Args:
+            hook (MetricsHook): The hook to remove
+        """
+        self._hooks.remove(hook)
+
+    def _forward(self, event, name, value):
+        """
+        Call a hook method on every hook; a failing hook is removed with a
+        warning instead of breaking the instrumented operation.
+        """
+        for hook in list(self._hooks):
+            try:
+                getattr(hook, event)(name, value)
+            except Exception as e:
+                print(f"⚠️ Metrics hook {type(hook).__name__} failed and was removed: {e}")
+                self._hooks.remove(hook)
+
+    def timing(self, name, seconds):
+        """
+        Record how long an operation took.
+
+        Args:
+            name (str): Metric name
+            seconds (float): Duration in seconds
+        """
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.record(seconds)
+        self._forward("timing", name, seconds)
+
+    def count(self, name, value=1):
+        """
+        Increase a counter.
+
+        Args:
+            name (str): Metric name
+            value (int): The increase
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+        self._forward("count", name, value)
+
+    def report(self):
+        """
+        Return everything recorded so far.
+
+        Returns:
+            dict: {"timings": {name: histogram summary}, "counters": {name: value},
+                "hit_rates": {name: share of hits}}
+        """
+        with self._lock:
+            timings = {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+            counters = dict(sorted(self._counters.items()))
+        hit_rates = {}
+        for name, hits in counters.items():
+            if name.endswith(".hits"):
+                prefix = name[:-len(".hits")]
+                total = hits + counters.get(prefix + ".misses", 0)
+                hit_rates[prefix] = hits / total if total else 0.0
+        for name in counters:
+            if name.endswith(".misses") and name[:-len(".misses")] not in hit_rates:
+                hit_rates[name[:-len(".misses")]] = 0.0
+        return {"timings": timings, "counters": counters, "hit_rates": hit_rates}
+
+
+def format_report(report):
+    """
+    Format a Metrics report as text tables.
+
+    Args:
+        report (dict): Result of Metrics.report()
+
+    Returns:
+        str: The report
+    """
+    lines = ["📈 Session profile", f"{'operation':<46}{'calls':>7}{'total ms':>11}{'mean ms':>10}"
+                                  f"{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+    for name, timing in report["timings"].items():
+        lines.append(f"{name:<46}{timing['count']:>7}{timing['total'] * 1000:>11.2f}{timing['mean'] * 1000:>10.2f}"
+                     f"{timing['p50'] * 1000:>9.2f}{timing['p99'] * 1000:>9.2f}{timing['max'] * 1000:>9.2f}")
+    if report["counters"]:
+        lines.append("")
+        lines.extend(f"{name:<46}{value:>14,}" for name, value in report["counters"].items())
+    if report["hit_rates"]:
+        lines.append("")
+        lines.extend(f"{name + ' hit rate':<46}{rate:>14.1%}" for name, rate in report["hit_rates"].items())
+    return "\n".join(lines)
+
+
+_default_metrics = None
+
+
+def get_default_metrics():
+    """
+    Return the process-wide metrics registry, creating it on first use.
+
+    Returns:
+        Metrics: The shared registry
+    """
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = Metrics()
+    return _default_metrics
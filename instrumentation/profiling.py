@@ -0,0 +1,55 @@
+import cProfile
+import json
+import pstats
+import sys
+from .metrics import format_report, get_default_metrics
+from .wrappers import instrument_omdb
+
+
+class ProfileSession:
+    """
+    Collects metrics for one run of the program and reports them when it ends.
+
+    Use it as a context manager around the whole session. OMDb lookups are
+    instrumented for its duration; storages and apps are instrumented where they
+    are created (see instrument_storage and instrument_app). The report is printed
+    to stderr, so it never mixes with the JSON output of scripted commands.
+    """
+
+    def __init__(self, metrics=None, report_path=None, pstats_path=None):
+        """
+        Args:
+            metrics (Metrics, optional): Registry to report, the default one if omitted
+            report_path (str, optional): Also write the report to this JSON file
+            pstats_path (str, optional): Run cProfile as well and dump its
+                statistics to this file (read it with python -m pstats)
+        """
+        self.metrics = metrics or get_default_metrics()
+        self.report_path = report_path
+        self.pstats_path = pstats_path
+        self._profiler = None
+        self._uninstall = None
+
+    def __enter__(self):
+        self._uninstall = instrument_omdb(self.metrics)
+        if self.pstats_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.pstats_path)
+        self._uninstall()
+
+        report = self.metrics.report()
+        print("\n" + format_report(report), file=sys.stderr)
+        if self.report_path:
+            with open(self.report_path, "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+            print(f"📝 Profile report written to '{self.report_path}'.", file=sys.stderr)
+        if self._profiler is not None:
+            print(f"📝 cProfile statistics written to '{self.pstats_path}'. Slowest functions:", file=sys.stderr)
+            pstats.Stats(self.pstats_path, stream=sys.stderr).sort_stats("cumulative").print_stats(10)
+        return False
@@ -0,0 +1,196 @@
+import functools
+import os
+import time
+from omdb.client import ClientMetrics, OmdbClient
+from storage import StorageCsv, StorageJson
+from website import SITE_DIR
+from website.renderer import OUTPUT_PATH
+from .metrics import get_default_metrics
+
+STORAGE_METHODS = ("_load_movies", "_save_movies", "list_movies", "add_movie", "delete_movie", "update_movie")
+WHOLE_FILE_STORAGES = (StorageJson, StorageCsv)  # Read and write the entire file on every load and save
+
+
+def _file_size(path):
+    """Return the size of a file in bytes, 0 if it does not exist."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _timed(metrics, name, function):
+    """
+    Wrap a function so every call is recorded under name, also calls that raise.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            metrics.timing(name, time.perf_counter() - start)
+    return wrapper
+
+
+def _timed_iter(metrics, name, function):
+    """
+    Wrap a generator function so the time spent producing its items is recorded
+    under name, without the time the consumer spends between items.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        spent = 0.0
+        iterator = function(*args, **kwargs)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    spent += time.perf_counter() - start
+                yield item
+        finally:
+            iterator.close()  # A consumer that stops early closes the wrapped iterator too
+            metrics.timing(name, spent)
+    return wrapper
+
+
+def instrument_storage(storage, metrics=None):
+    """
+    Record the latency of every IStorage method of one storage instance.
+
+    Internal calls go through the instance too, so an add_movie also records the
+    _load_movies and _save_movies it makes. JSON and CSV storages count the bytes
+    read and written by whole-file loads and saves; a StorageCached counts how
+    often it answered from memory ("cache.hits") or had to reload ("cache.misses"),
+    and its backend is instrumented as well.
+
+    Args:
+        storage (IStorage): The storage to instrument, changed in place
+        metrics (Metrics, optional): Registry to record into, the default one if omitted
+
+    Returns:
+        IStorage: The same storage
+    """
+    metrics = metrics or get_default_metrics()
+    prefix = f"storage.{type(storage).__name__}"
+    for name in STORAGE_METHODS:
+        setattr(storage, name, _timed(metrics, f"{prefix}.{name}", getattr(storage, name)))
+    storage.iter_movies = _timed_iter(metrics, f"{prefix}.iter_movies", storage.iter_movies)
+
+    if isinstance(storage, WHOLE_FILE_STORAGES):
+        load, save = storage._load_movies, storage._save_movies
+
+        def counted_load():
+            size = _file_size(storage.file_path)
+            movies = load()
+            metrics.count(f"{prefix}.bytes_read", size)
+            return movies
+
+        def counted_save(movies):
+            save(movies)
+            metrics.count(f"{prefix}.bytes_written", _file_size(storage.file_path))
+
+        storage._load_movies, storage._save_movies = counted_load, counted_save
+
+    backend = getattr(storage, "backend", None)
+    if backend is not None:
+        instrument_storage(backend, metrics)
+        backend_loads = [0]
+        backend_load, cached_load = backend._load_movies, storage._load_movies
+
+        def counted_backend_load():
+            backend_loads[0] += 1
+            return backend_load()
+
+        def counted_cached_load():
+            before = backend_loads[0]
+            movies = cached_load()
+            metrics.count(f"{prefix}.cache.hits" if backend_loads[0] == before else f"{prefix}.cache.misses")
+            return movies
+
+        backend._load_movies, storage._load_movies = counted_backend_load, counted_cached_load
+    return storage
+
+
+def instrument_app(app, metrics=None):
+    """
+    Record how long a MovieApp takes to generate the website, and how many files
+    and bytes each build writes.
+
+    Args:
+        app (MovieApp): The app to instrument, changed in place
+        metrics (Metrics, optional): Registry to record into, the default one if omitted
+
+    Returns:
+        MovieApp: The same app
+    """
+    metrics = metrics or get_default_metrics()
+    generate = _timed(metrics, "website.generate", app._generate_website)
+
+    def output_files():
+        paths = [OUTPUT_PATH]
+        if os.path.isdir(SITE_DIR):
+            paths += [os.path.join(SITE_DIR, name) for name in os.listdir(SITE_DIR)]
+        signatures = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signatures[path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def counted_generate():
+        before = output_files()
+        generate()
+        written = [(path, size) for path, (mtime, size) in output_files().items() if before.get(path) != (mtime, size)]
+        metrics.count("website.files_written", len(written))
+        metrics.count("website.bytes_written", sum(size for _, size in written))
+
+    app._generate_website = counted_generate
+    return app
+
+
+def instrument_omdb(metrics=None):
+    """
+    Record OMDb lookups ("omdb.lookup", with cache hits and misses), every HTTP
+    request ("omdb.request"), failures and retries, for every OmdbClient of the process.
+
+    Args:
+        metrics (Metrics, optional): Registry to record into, the default one if omitted
+
+    Returns:
+        callable: Call it to remove the instrumentation again
+    """
+    metrics = metrics or get_default_metrics()
+    lookup, record, record_retry = OmdbClient.lookup, ClientMetrics.record, ClientMetrics.record_retry
+
+    def timed_lookup(self, title, year=None):
+        start = time.perf_counter()
+        try:
+            payload, cached = lookup(self, title, year)
+        finally:
+            metrics.timing("omdb.lookup", time.perf_counter() - start)
+        metrics.count("omdb.cache.hits" if cached else "omdb.cache.misses")
+        return payload, cached
+
+    def recorded_request(self, seconds, failed=False):
+        record(self, seconds, failed)
+        metrics.timing("omdb.request", seconds)
+        if failed:
+            metrics.count("omdb.request_failures")
+
+    def recorded_retry(self):
+        record_retry(self)
+        metrics.count("omdb.retries")
+
+    OmdbClient.lookup, ClientMetrics.record, ClientMetrics.record_retry = timed_lookup, recorded_request, recorded_retry
+
+    def uninstall():
+        OmdbClient.lookup, ClientMetrics.record, ClientMetrics.record_retry = lookup, record, record_retry
+
+    return uninstall
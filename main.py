@@ -1,32 +1,218 @@
 import argparse
+import contextlib
 import os
-from storage.storage_json import StorageJson
-from storage.storage_csv import StorageCsv
-from movie_app import MovieApp
+import sys
+from storage.storage_cached import StorageCached
+
+# Backends, the command runner, the OMDb client, the API server, the menu and the
+# instrumentation are imported where they are used, so each kind of run only loads what it needs.
+
+def open_storage(args):
+    """
+    Create the storage backend for the storage file, chosen by its extension.
+
+    Args:
+        args (argparse.Namespace): Parsed command line options
+
+    Returns:
+        IStorage: The storage, or None if the file type is not supported
+    """
+    storage_file = args.storage_file
+    file_extension = os.path.splitext(storage_file)[-1].lower()  # Get file extension
+
+    if file_extension == ".json":
+        from storage.storage_json import StorageJson
+        storage = StorageJson(storage_file, compact=args.compact)  # Use JSON storage
+    elif file_extension == ".csv":
+        from storage.storage_csv import StorageCsv
+        storage = StorageCsv(storage_file, compact=args.compact)  # Use CSV storage
+    elif file_extension == ".mlog":
+        from storage.storage_journal import StorageJournal
+        try:
+            storage = StorageJournal(storage_file)  # Use append-only journal storage
+        except ValueError as e:
+            print(f"❌ ERROR: {e}")
+            return None
+    elif file_extension in (".db", ".sqlite"):
+        from storage.storage_sqlite import StorageSqlite
+        storage = StorageSqlite(storage_file)  # Use SQLite storage
+    elif file_extension == ".mbin":
+        from storage.storage_mmap import StorageMmap
+        storage = StorageMmap(storage_file)  # Use memory-mapped binary snapshot storage
+    else:
+        print("❌ ERROR: Unsupported file type. Use a JSON, CSV, MLOG, SQLite or MBIN file.")
+        return None
+
+    if args.cache:
+        storage = StorageCached(storage, flush_policy=args.flush_policy, flush_every=args.flush_every)
+    if args.profile:
+        from instrumentation import instrument_storage
+        instrument_storage(storage)
+    return storage
+
+
+def run_command(args):
+    """
+    Run one non-interactive command and exit with its status.
+
+    Results go to stdout as JSON; human-readable messages go to stderr, so the
+    output can be piped into other programs.
+
+    Args:
+        args (argparse.Namespace): Parsed command line options
+    """
+    from cli import CommandRunner
+    output = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        storage = open_storage(args)
+        if storage is None:
+            sys.exit(2)
+        input_file = open(args.input, "r", encoding="utf-8") if args.input else sys.stdin
+        try:
+            reads_input = args.command in ("add", "delete", "update", "search", "import")
+            status = CommandRunner(storage, output, args).run(args.command, input_file if reads_input else ())
+        finally:
+            if args.input:
+                input_file.close()
+            storage.close()
+    sys.exit(status)
+
 
 def main():
     """Main function that initializes the MovieApp with the appropriate storage file."""
 
+    from cli import COMMANDS  # Only the command names; the commands import what they need themselves
+
     # ✅ Step 1: Use argparse to get the storage file from the command line
     parser = argparse.ArgumentParser(description="Movie Database App")
-    parser.add_argument("storage_file", nargs="?", default="movies.json", help="Path to the storage file (JSON or CSV)")
+    parser.add_argument("storage_file", nargs="?", default="movies.json", help="Path to the storage file (JSON, CSV, MLOG, SQLite or MBIN)")
+    parser.add_argument("command", nargs="?", choices=COMMANDS,
+                        help="Run one command without the menu, reading JSON Lines from stdin where it needs input "
+                             "(titles for import) and writing JSON to stdout")
+    parser.add_argument("--input", metavar="FILE", help="Read command input from a file instead of stdin")
+    parser.add_argument("--output", dest="output_file", metavar="FILE",
+                        help="File written by the export command (JSON, CSV or MBIN)")
+    parser.add_argument("--limit", type=int, help="Maximum number of movies or results for list, search and sort")
+    parser.add_argument("--by", choices=("rating", "year"), default="rating",
+                        help="Sort order of the sort command (default: rating)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep the collection in memory instead of re-reading the file for every command")
+    parser.add_argument("--flush-policy", choices=StorageCached.FLUSH_POLICIES, default=StorageCached.FLUSH_IMMEDIATE,
+                        help="When cached changes are written to disk (default: immediate)")
+    parser.add_argument("--flush-every", type=int, default=50,
+                        help="Number of changes per write with --flush-policy batch (default: 50)")
+    parser.add_argument("--import", dest="import_file", metavar="TITLES_FILE",
+                        help="Import the titles listed in a text file (one per line, optional year) and exit")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Number of concurrent OMDb lookups for --import (default: 8)")
+    parser.add_argument("--rate", type=float, default=10,
+                        help="Maximum OMDb requests per second for --import (default: 10)")
+    parser.add_argument("--page-size", type=int,
+                        help="Generate the website as pages of this many movies instead of a single page")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Rewrite every website page, even those that did not change")
+    parser.add_argument("--build-workers", type=int, default=1,
+                        help="Processes rendering website pages with --page-size, 0 for one per CPU core (default: 1)")
+    parser.add_argument("--save-search-index", action="store_true",
+                        help="Save the title search index next to the storage file so it is not rebuilt on start")
+    parser.add_argument("--compact", action="store_true",
+                        help="Hold JSON/CSV collections in a memory-efficient columnar layout")
+    parser.add_argument("--analytics", action="store_true",
+                        help="Compute stats and the sorted listing over rating/year columns, vectorised with NumPy if installed")
+    parser.add_argument("--posters", action="store_true",
+                        help="Download the posters when generating the website and show the local copies, "
+                             "so the site works offline")
+    parser.add_argument("--poster-workers", type=int, default=8,
+                        help="Concurrent poster downloads with --posters (default: 8)")
+    parser.add_argument("--thumbnails", type=int, metavar="WIDTH",
+                        help="With --posters, show thumbnails at most this wide instead of full-size posters (needs Pillow)")
+    parser.add_argument("--refresh-posters", action="store_true",
+                        help="With --posters, revalidate every cached poster with its server instead of weekly")
+    parser.add_argument("--serve", action="store_true",
+                        help="Serve the collection as a JSON HTTP API instead of starting the menu")
+    parser.add_argument("--host", default="127.0.0.1", help="Address the API server listens on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port the API server listens on (default: 8000)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time storage, OMDb and website operations and print a report to stderr on exit")
+    parser.add_argument("--profile-report", metavar="FILE", help="Also write the --profile report to a JSON file")
+    parser.add_argument("--pstats", metavar="FILE",
+                        help="Also run cProfile with --profile and dump its statistics to a pstats file")
     args = parser.parse_args()
+    if args.storage_file in COMMANDS and args.command is None:  # "main.py stats" uses the default file
+        args.storage_file, args.command = parser.get_default("storage_file"), args.storage_file
+    args.profile = args.profile or bool(args.profile_report or args.pstats)
+
+    session = contextlib.nullcontext()
+    if args.profile:
+        from instrumentation import ProfileSession
+        session = ProfileSession(report_path=args.profile_report, pstats_path=args.pstats)
+    with session:
+        start(args)
+
+
+def start(args):
+    """
+    Run the session the command line asked for: one command, an import, the API server or the menu.
+
+    Args:
+        args (argparse.Namespace): Parsed command line options
+    """
+    if args.command:
+        run_command(args)
 
     # ✅ Step 2: Determine storage type from file extension
     storage_file = args.storage_file
-    file_extension = os.path.splitext(storage_file)[-1].lower()  # Get file extension
+    storage = open_storage(args)
+    if storage is None:
+        return
 
-    if file_extension == ".json":
-        storage = StorageJson(storage_file)  # Use JSON storage
-    elif file_extension == ".csv":
-        storage = StorageCsv(storage_file)  # Use CSV storage
-    else:
-        print("❌ ERROR: Unsupported file type. Use a JSON or CSV file.")
+    if args.import_file:
+        from omdb import OmdbClient, get_default_cache, getenv
+        from bulk_import import BulkImporter, read_titles, print_report
+        if not getenv("OMDB_API_KEY"):
+            print("❌ ERROR: OMDB_API_KEY is missing! Check your .env file.")
+            return
+        client = OmdbClient.from_env(rate=args.rate, pool_size=args.workers, cache=get_default_cache())
+        try:
+            report = BulkImporter(storage, client, workers=args.workers).run(read_titles(args.import_file))
+            print_report(report)
+        finally:
+            client.close()
+            storage.close()
         return
 
+    if args.serve:
+        from api import serve
+        try:
+            serve(storage, args.host, args.port)
+        finally:
+            storage.close()
+        return
+
+    posters = None
+    if args.posters:
+        from website.posters import DEFAULT_MAX_AGE, PosterCache
+        try:
+            posters = PosterCache(workers=args.poster_workers, max_age=0 if args.refresh_posters else DEFAULT_MAX_AGE,
+                                  thumbnail_width=args.thumbnails)
+        except ValueError as e:
+            print(f"❌ ERROR: {e}")
+            storage.close()
+            return
+
     # ✅ Step 3: Start the MovieApp
-    movie_app = MovieApp(storage)
-    movie_app.run()
+    from movie_app import MovieApp
+    movie_app = MovieApp(storage, page_size=args.page_size, incremental=not args.full_rebuild,
+                         build_workers=args.build_workers,
+                         search_index_path=storage_file + ".idx" if args.save_search_index else None,
+                         analytics=args.analytics, posters=posters)
+    if args.profile:
+        from instrumentation import instrument_app
+        instrument_app(movie_app)
+    try:
+        movie_app.run()
+    finally:
+        movie_app.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
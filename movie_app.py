@@ -1,66 +1,157 @@
-import requests
-import random
+import itertools
 import os
-import statistics
-from urllib.parse import quote_plus
-from dotenv import load_dotenv
-
-# Load API Key from .env
-load_dotenv()
-API_KEY = os.getenv("OMDB_API_KEY")
+from contextlib import closing
+from omdb import get_default_client, getenv, movie_from_payload
+from indexes import OrderedIndex, RatingAnalytics, SearchIndex, StatsEngine, top_n
+from website import OUTPUT_PATH, SITE_DIR, build_paginated_site, print_poster_report, write_site
 
 
 class MovieApp:
     """
     The MovieApp class handles user interaction and commands to manage the movie collection.
     """
+    PAGE_SIZE = 20  # Movies shown per page in sorted and filtered listings
 
-    def __init__(self, storage):
+    def __init__(self, storage, page_size=None, incremental=True, build_workers=1, search_index_path=None,
+                 analytics=False, posters=None):
+        """
+        Args:
+            storage (IStorage): Storage holding the movie collection
+            page_size (int, optional): Generate the website as pages of this many movies
+                instead of one single page
+            incremental (bool): Only rewrite website pages whose content changed
+            build_workers (int): Number of processes rendering website pages,
+                0 for one per CPU core
+            search_index_path (str, optional): File the search index is loaded from
+                and saved to, so it is not rebuilt on every start
+            analytics (bool): Compute stats and the sorted listing over rating and year
+                columns (vectorised with NumPy when installed) instead of incrementally
+            posters (PosterCache, optional): Download the posters before generating the
+                website and show the local copies instead of the remote images
+        """
         self._storage = storage
+        self._page_size = page_size
+        self._incremental = incremental
+        self._build_workers = build_workers
+        self._posters = posters
+        if analytics:
+            self._analytics = RatingAnalytics()
+        else:
+            self._analytics = None
+            self._stats = StatsEngine()
+        self._ordered = OrderedIndex()
+        self._search_index_path = search_index_path
+        self._search = SearchIndex()
+        self._indexes = [self._analytics or self._stats, self._ordered, self._search]
 
-    def _command_list_movies(self):
-        """List all movies in a structured, readable format."""
+        # The collection is loaded once and every index is built from that one copy
+        self._signature = self._storage_signature()
+        loaded = bool(search_index_path and self._signature and self._search.load(search_index_path, self._signature))
+        for index in self._indexes:
+            storage.add_listener(index, reset=False)
+        self._reset_indexes([index for index in self._indexes if not (loaded and index is self._search)])
+
+    def _reset_indexes(self, indexes=None):
+        """
+        Rebuild indexes from one load of the collection.
+
+        Args:
+            indexes (list, optional): The indexes to rebuild, all of them by default
+        """
         movies = self._storage.list_movies()
-        if movies:
+        for index in self._indexes if indexes is None else indexes:
+            index.reset(movies)
+
+    def _refresh_indexes(self):
+        """
+        Rebuild the indexes if another program changed the storage file since they were built.
+
+        Changes made through this app keep the indexes up to date as they happen;
+        this catches the others, by the file's modification time and size.
+        """
+        signature = self._storage_signature()
+        if signature != self._signature:
+            self._reset_indexes()
+            self._signature = signature
+
+    def _changed_storage(self):
+        """Remember the storage file as it is after a change made through this app."""
+        self._signature = self._storage_signature()
+
+    def _storage_signature(self):
+        """
+        Identify the current state of the storage file by its modification time and size.
+
+        Returns:
+            list: [mtime, size], or None if the storage has no file yet
+        """
+        try:
+            stat = os.stat(self._storage.file_path)
+        except (AttributeError, OSError):
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def close(self):
+        """Write pending changes to storage, save the search index if enabled and close the poster cache."""
+        self._storage.close()
+        if self._posters is not None:
+            self._posters.close()
+        signature = self._storage_signature()
+        if self._search_index_path and signature:
+            self._search.save(self._search_index_path, signature)
+
+    def _fresh_analytics(self):
+        """
+        Return the column analytics, reloading the columns if the collection changed.
+
+        Returns:
+            RatingAnalytics: The analytics, None when analytics mode is off
+        """
+        if self._analytics is not None and self._analytics.stale:
+            self._analytics.reset(self._storage.list_movies())
+        return self._analytics
+
+    def _command_list_movies(self):
+        """List all movies in a structured, readable format, streaming them from storage."""
+        with closing(self._storage.iter_movies()) as movies:
+            first = next(movies, None)
+            if not first:
+                print("📭 Your movie collection is empty!")
+                return
             print("\n============================================================")
             print("                    🎬 My Movie Collection 🎬               ")
             print("============================================================")
-            for title, details in movies.items():
+            for title, details in itertools.chain([first], movies):
                 print(f"📽️  Title: {title}")
                 print(f"📆  Year: {details['year']}")
                 print(f"⭐  Rating: {details['rating']}/10")
                 print(f"🖼️  Poster: {details['poster']}")
                 print(f"🔗  IMDb: {details['link']}")
                 print("------------------------------------------------------------")
-        else:
-            print("📭 Your movie collection is empty!")
 
     def _command_add_movie(self):
         """Add a new movie to the database by fetching from OMDb API with error handling."""
         title = input("Enter movie title: ")
         year = input("Enter movie year (optional, press Enter to skip): ")
 
-        if not API_KEY:
+        if not getenv("OMDB_API_KEY"):
             print("❌ ERROR: OMDB_API_KEY is missing! Check your .env file.")
             return
 
-        title_encoded = quote_plus(title)
-        url = f"http://www.omdbapi.com/?apikey={API_KEY}&t={title_encoded}"
-        if year:
-            url += f"&y={year}"
-
+        import requests
+        self._refresh_indexes()
         try:
-            response = requests.get(url, timeout=10)  # Add timeout to prevent hanging indefinitely
-            response.raise_for_status()
-            movie_data = response.json()
+            movie_data, _ = get_default_client().lookup(title, year)
 
             if movie_data.get("Response") == "True":
+                details = movie_from_payload(movie_data)
                 added = self._storage.add_movie(
                     title=movie_data["Title"],
-                    year=movie_data["Year"],
-                    rating=float(movie_data.get("imdbRating", 0)),
-                    poster=movie_data.get("Poster", "N/A")
+                    year=details["year"],
+                    rating=details["rating"],
+                    poster=details["poster"]
                 )
+                self._changed_storage()
                 if added:
                     print(f"✅ '{movie_data['Title']}' added successfully!")
                 else:
@@ -75,7 +166,9 @@ class MovieApp:
     def _command_delete_movie(self):
         """Delete a movie from the database."""
         title = input("Enter movie title to delete: ")
+        self._refresh_indexes()
         result = self._storage.delete_movie(title)
+        self._changed_storage()
         if result:
             print(f"🗑️ '{title}' removed successfully!")
         else:
@@ -93,7 +186,9 @@ class MovieApp:
         try:
             rating = float(rating)
             if 1 <= rating <= 10:
+                self._refresh_indexes()
                 updated = self._storage.update_movie(title, rating)
+                self._changed_storage()
                 if updated:
                     print(f"✏️ '{title}' rating updated successfully!")
                 else:
@@ -104,48 +199,124 @@ class MovieApp:
             print("❌ Error: Invalid rating format! Please enter a number between 1 and 10.")
 
     def _command_movie_stats(self):
-        """Show basic movie statistics, including the median rating."""
-        movies = self._storage.list_movies()
+        """
+        Show movie statistics, including the median rating.
+
+        Served from the incrementally maintained stats engine, or from the column
+        analytics (with per-decade averages) in analytics mode.
+        """
+        self._refresh_indexes()
+        analytics = self._fresh_analytics()
+        stats = analytics or self._stats
 
-        if movies:
-            ratings = [details["rating"] for details in movies.values()]
-            avg_rating = sum(ratings) / len(ratings)
-            median_rating = statistics.median(ratings)  # ✅ Calculate median rating
-            highest_rated = max(movies, key=lambda x: movies[x]["rating"])
-            lowest_rated = min(movies, key=lambda x: movies[x]["rating"])
+        if stats.count:
+            highest_rated, highest_rating = stats.best
+            lowest_rated, lowest_rating = stats.worst
 
             print("\n📊 Movie Statistics:")
-            print(f"⭐ Average Rating: {avg_rating:.2f}/10")
-            print(f"📊 Median Rating: {median_rating:.2f}/10")  # ✅ Show median rating
-            print(f"🏆 Highest Rated: {highest_rated} ({movies[highest_rated]['rating']}/10)")
-            print(f"🐢 Lowest Rated: {lowest_rated} ({movies[lowest_rated]['rating']}/10)")
+            print(f"⭐ Average Rating: {stats.average:.2f}/10")
+            print(f"📊 Median Rating: {stats.median:.2f}/10")  # ✅ Show median rating
+            if stats.stdev is not None:
+                print(f"📐 Standard Deviation: {stats.stdev:.2f}")
+            print(f"📈 Percentiles: 25th {stats.percentile(25):.2f}, 75th {stats.percentile(75):.2f}, "
+                  f"90th {stats.percentile(90):.2f}")
+            print(f"🏆 Highest Rated: {highest_rated} ({highest_rating}/10)")
+            print(f"🐢 Lowest Rated: {lowest_rated} ({lowest_rating}/10)")
+            if analytics:
+                print("📅 By Decade: " + ", ".join(
+                    f"{decade}s ({aggregate['count']}, ⭐ {aggregate['average']:.2f})"
+                    if aggregate["average"] is not None else f"{decade}s ({aggregate['count']})"
+                    for decade, aggregate in analytics.decades().items()))
+            else:
+                busiest_years = sorted(stats.year_histogram().items(), key=lambda x: x[1], reverse=True)[:5]
+                print("📅 Busiest Years: " + ", ".join(f"{year} ({count})" for year, count in busiest_years))
         else:
             print("📭 No movies available for statistics!")
 
     def _command_search_movie(self):
-        """Search for a movie in the database."""
-        query = input("Enter movie title to search: ").lower()
-        movies = self._storage.list_movies()
-        results = {k: v for k, v in movies.items() if query in k.lower()}
+        """Search for a movie in the database, suggesting close matches when nothing contains the query."""
+        query = input("Enter movie title to search: ")
+        self._refresh_indexes()
+        results = set(self._search.search(query))
         if results:
-            for title in results:
-                print(f"🔍 {title} ({results[title]['year']}) - ⭐ {results[title]['rating']}/10")
+            for title, details in self._storage.iter_movies(where=lambda title, _: title in results):
+                print(f"🔍 {title} ({details['year']}) - ⭐ {details['rating']}/10")
+            return
+
+        suggestions = self._search.fuzzy_search(query, limit=5)
+        if suggestions:
+            suggested = {title for title, _ in suggestions}
+            movies = dict(self._storage.iter_movies(where=lambda title, _: title in suggested))
+            print("No exact matches. Did you mean:")
+            for title, _ in suggestions:
+                if title in movies:
+                    print(f"🔍 {title} ({movies[title]['year']}) - ⭐ {movies[title]['rating']}/10")
         else:
             print("No matching movies found.")
 
     def _command_sorted_movies(self):
-        """Sort movies by rating."""
+        """
+        Show movies sorted by rating, one page at a time.
+
+        Pages come from the ordered rating index, or from one argsort of the rating
+        column in analytics mode.
+        """
+        self._refresh_indexes()
         movies = self._storage.list_movies()
-        sorted_movies = sorted(movies.items(), key=lambda x: x[1]['rating'], reverse=True)
+        analytics = self._fresh_analytics()
+        if analytics:
+            ranking = [analytics.title(position) for position in analytics.ranking()]
         print("📋 Movies sorted by rating:")
-        for title, details in sorted_movies:
-            print(f"{title} - ⭐ {details['rating']}/10")
+        page = 1
+        while True:
+            if analytics:
+                titles = ranking[(page - 1) * self.PAGE_SIZE:page * self.PAGE_SIZE]
+            else:
+                titles = self._ordered.page(page, self.PAGE_SIZE)
+            for title in titles:
+                if title in movies:  # Deleted by another program since the index was refreshed
+                    print(f"{title} - ⭐ {movies[title]['rating']}/10")
+            if page * self.PAGE_SIZE >= len(movies):
+                break
+            if input("Press Enter for more, or 'q' to stop: ").strip().lower() == "q":
+                break
+            page += 1
+
+    def _command_filter_movies(self):
+        """Show the best rated movies within a rating range and/or from one year."""
+        low = input("Enter minimum rating (press Enter to skip): ").strip()
+        high = input("Enter maximum rating (press Enter to skip): ").strip()
+        year = input("Enter year (press Enter to skip): ").strip()
+
+        try:
+            low = float(low) if low else 0.0
+            high = float(high) if high else 10.0
+        except ValueError:
+            print("❌ Error: Invalid rating format! Please enter a number between 1 and 10.")
+            return
+
+        self._refresh_indexes()
+        titles = self._ordered.rated_between(low, high)
+        if year:
+            from_year = set(self._ordered.from_year(year))
+            titles = [title for title in titles if title in from_year]
+        if not titles:
+            print("No matching movies found.")
+            return
+
+        movies = self._storage.list_movies()
+        print(f"🎯 {len(titles)} matching movies, showing the best {min(len(titles), self.PAGE_SIZE)}:")
+        for title, details in top_n(((title, movies[title]) for title in titles if title in movies), self.PAGE_SIZE):
+            print(f"{title} ({details['year']}) - ⭐ {details['rating']}/10")
 
     def _generate_website(self):
         """
         Generate an HTML page displaying the movie collection with error handling.
 
-        Uses an HTML template file instead of hardcoding HTML.
+        Uses an HTML template file instead of hardcoding HTML. The page is streamed
+        to disk card by card, so memory use does not grow with the collection.
+        With a page size set, the site is split into numbered pages plus an index.
+        With a poster cache, the posters are downloaded first and the cards show the local copies.
         """
         try:
             movies = self._storage.list_movies()
@@ -153,45 +324,42 @@ class MovieApp:
                 print("❌ No movies found. Add movies first before generating the website.")
                 return
 
-            # Read the HTML template file
+            items = movies.items()
+            if self._posters is not None:
+                print_poster_report(self._posters.prefetch(details.get("poster") for details in movies.values()))
+                items = self._posters.localize(items, SITE_DIR if self._page_size else os.path.dirname(OUTPUT_PATH))
+
             try:
-                with open("static/index_template.html", "r", encoding="utf-8") as template_file:
-                    template = template_file.read()
+                if self._page_size:
+                    stats = build_paginated_site(items, SITE_DIR, self._page_size, self._incremental,
+                                                 workers=self._build_workers)
+                else:
+                    write_site(items)
             except FileNotFoundError:
                 print("❌ Error: HTML template file not found.")
                 return
 
-            # Generate movie cards HTML
-            movie_cards_html = ""
-            for title, details in movies.items():
-                movie_cards_html += f"""
-                <div class="movie-card">
-                    <h2>{title}</h2>
-                    <p>📆 {details['year']}</p>
-                    <p>⭐ {details['rating']}/10</p>
-                    <img src="{details['poster']}" alt="{title} Poster">
-                    <p><a href="{details['link']}" target="_blank">🔗 IMDb Link</a></p>
-                </div>
-                """
-
-            # Replace the placeholder with the movie cards HTML
-            generated_html = template.replace("<!-- MOVIE_CARDS_PLACEHOLDER -->", movie_cards_html)
-
-            # Write the generated HTML to the output file
-            with open("data/movies.html", "w", encoding="utf-8") as file:
-                file.write(generated_html)
-
-            print("✅ Website generated successfully! Open 'movies.html' to view it.")
+            if self._page_size:
+                print(f"✅ Website generated successfully! {stats['pages']} pages, "
+                      f"{stats['written']} written, {stats['unchanged']} unchanged, {stats['removed']} removed "
+                      f"in {stats['seconds']:.2f}s ({stats['pages_per_second']:.1f} pages/s). "
+                      f"Open '{SITE_DIR}/index.html' to view it.")
+            else:
+                print("✅ Website generated successfully! Open 'movies.html' to view it.")
         except Exception as e:
             print(f"❌ Error: Failed to generate website. {e}")
 
     def _command_random_movie(self):
         """Pick and display a random movie from the collection."""
+        self._refresh_indexes()
+        random_movie = self._ordered.random_title()
         movies = self._storage.list_movies()
-        if not movies:
+        if random_movie is not None and random_movie not in movies:  # Deleted by another program meanwhile
+            self._reset_indexes()
+            random_movie = self._ordered.random_title()
+        if random_movie is None:
             print("📭 No movies available to pick from!")
             return
-        random_movie = random.choice(list(movies.keys()))
         details = movies[random_movie]
         print("\n🎲 Random Movie Recommendation:")
         print(f"📽️  Title: {random_movie}")
@@ -212,8 +380,8 @@ class MovieApp:
             "6": self._command_random_movie,
             "7": self._command_search_movie,
             "8": self._command_sorted_movies,
-            "9": self._generate_website
-
+            "9": self._generate_website,
+            "10": self._command_filter_movies
         }
         while True:
             print("\n********** My Movies Database **********")
@@ -227,9 +395,10 @@ class MovieApp:
                 "6. Pick a random movie\n"
                 "7. Search movie\n"
                 "8. Movies sorted by rating\n"
-                "9. Generate website\n")
+                "9. Generate website\n"
+                "10. Filter movies by rating or year\n")
 
-            choice = input("Enter choice (0-9): ")
+            choice = input("Enter choice (0-10): ")
             if choice == "0":
                 print("👋 Goodbye!")
                 break
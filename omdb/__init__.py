@@ -0,0 +1,5 @@
+from .cache import OmdbCache, get_default_cache
+from .client import OmdbClient, get_default_client, movie_from_payload
+from .env import getenv, load_environment
+
+__all__ = ["OmdbCache", "get_default_cache", "OmdbClient", "get_default_client", "movie_from_payload", "getenv", "load_environment"]
\ No newline at end of file
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from .env import getenv
+
+DEFAULT_CACHE_PATH = "data/omdb_cache.db"
+DEFAULT_TTL = 30 * 24 * 3600          # Found movies are kept for 30 days
+DEFAULT_NEGATIVE_TTL = 24 * 3600      # "Movie not found!" answers are kept for 1 day
+DEFAULT_MAX_ENTRIES = 50000
+
+
+class OmdbCache:
+    """
+    Persistent SQLite cache for OMDb lookups.
+
+    Responses are keyed on the normalised title and year. Found movies live for
+    `ttl` seconds, "not found" answers for the shorter `negative_ttl`, and the least
+    recently used entries are evicted once the cache holds more than `max_entries`.
+    Other errors (bad API key, request limit reached, ...) are never cached.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL,
+                 negative_ttl=DEFAULT_NEGATIVE_TTL, max_entries=DEFAULT_MAX_ENTRIES, clock=time.time):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): Path to the SQLite cache file
+            ttl (float): Lifetime of found movies in seconds
+            negative_ttl (float): Lifetime of "not found" answers in seconds
+            max_entries (int): Maximum number of cached lookups
+            clock (callable): Returns the current time in seconds, e.g. a fake clock in tests
+        """
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max(1, int(max_entries))
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        import sqlite3  # Only needed once the cache is opened
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS lookups (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_lookups_last_used ON lookups (last_used);
+        """)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+
+    @staticmethod
+    def make_key(title, year=None):
+        """
+        Build the cache key for a lookup.
+
+        Titles are compared case-insensitively with runs of whitespace collapsed.
+
+        Args:
+            title (str): The movie title
+            year (str, optional): The release year
+
+        Returns:
+            str: Normalised cache key
+        """
+        normalised_title = " ".join(str(title).casefold().split())
+        return f"{normalised_title}|{str(year or '').strip()}"
+
+    def get(self, title, year=None):
+        """
+        Return the cached OMDb response for a lookup.
+
+        Args:
+            title (str): The movie title
+            year (str, optional): The release year
+
+        Returns:
+            dict: The cached OMDb response (possibly a "not found" answer), or None
+        """
+        key = self.make_key(title, year)
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM lookups WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE lookups SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, title, year, payload):
+        """
+        Store an OMDb response.
+
+        Args:
+            title (str): The movie title that was looked up
+            year (str): The release year that was looked up, or None
+            payload (dict): The decoded OMDb JSON response
+        """
+        if payload.get("Response") == "True":
+            ttl = self.ttl
+        elif payload.get("Error") == "Movie not found!":
+            ttl = self.negative_ttl
+        else:
+            return
+
+        key = self.make_key(title, year)
+        now = self.clock()
+        with self._lock, self._conn:
+            exists = self._conn.execute("SELECT 1 FROM lookups WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookups VALUES (?, ?, ?, ?)",
+                (key, json.dumps(payload), now + ttl, now)
+            )
+            if not exists:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict(self._count - self.max_entries)
+
+    def _evict(self, count):
+        """
+        Delete the least recently used entries. The caller must hold the lock.
+
+        Args:
+            count (int): Number of entries to delete
+        """
+        self._conn.execute(
+            "DELETE FROM lookups WHERE key IN "
+            "(SELECT key FROM lookups ORDER BY last_used LIMIT ?)", (count,)
+        )
+        self._count -= count
+
+    def purge_expired(self):
+        """
+        Delete all expired entries.
+
+        Returns:
+            int: Number of entries deleted
+        """
+        with self._lock, self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM lookups WHERE expires_at <= ?", (self.clock(),)
+            ).rowcount
+            self._count -= deleted
+        return deleted
+
+    def close(self):
+        """
+        Close the cache database.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """
+    Return the cache shared by the whole application.
+
+    The location and limits can be configured with the OMDB_CACHE_PATH,
+    OMDB_CACHE_TTL, OMDB_CACHE_NEGATIVE_TTL and OMDB_CACHE_MAX_ENTRIES
+    environment variables.
+
+    Returns:
+        OmdbCache: The shared cache
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = OmdbCache(
+            path=getenv("OMDB_CACHE_PATH", DEFAULT_CACHE_PATH),
+            ttl=float(getenv("OMDB_CACHE_TTL", DEFAULT_TTL)),
+            negative_ttl=float(getenv("OMDB_CACHE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL)),
+            max_entries=int(getenv("OMDB_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        )
+    return _default_cache
@@ -0,0 +1,277 @@
+import threading
+import time
+from collections import deque
+from .cache import get_default_cache
+from .env import getenv
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls evenly to at most `rate` per second.
+    """
+
+    def __init__(self, rate=None):
+        """
+        Args:
+            rate (float, optional): Maximum calls per second, None or 0 for no limit
+        """
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """
+        Block until the caller may make its next call.
+        """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ClientMetrics:
+    """
+    Thread-safe request counters and latency samples for an OmdbClient.
+    """
+
+    def __init__(self, sample_size=1000):
+        """
+        Args:
+            sample_size (int): Number of most recent latencies kept for percentiles
+        """
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._samples = deque(maxlen=sample_size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds, failed=False):
+        """
+        Record one HTTP request.
+
+        Args:
+            seconds (float): Time the request took
+            failed (bool): Whether the request failed or has to be retried
+        """
+        with self._lock:
+            self.requests += 1
+            self.failures += failed
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self._samples.append(seconds)
+
+    def record_retry(self):
+        """
+        Record that a request is about to be retried.
+        """
+        with self._lock:
+            self.retries += 1
+
+    def percentile(self, percent):
+        """
+        Return a latency percentile over the recent samples.
+
+        Args:
+            percent (float): Percentile between 0 and 100
+
+        Returns:
+            float: Latency in seconds, 0.0 if nothing was recorded
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def summary(self):
+        """
+        Return the metrics as a dictionary.
+
+        Returns:
+            dict: Request counts and latencies in seconds
+        """
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retries,
+            "avg_seconds": self.total_seconds / self.requests if self.requests else 0.0,
+            "p50_seconds": self.percentile(50),
+            "p95_seconds": self.percentile(95),
+            "max_seconds": self.max_seconds
+        }
+
+
+def movie_from_payload(payload):
+    """
+    Convert a successful OMDb response to the details stored for a movie.
+
+    Args:
+        payload (dict): Decoded OMDb JSON response with "Response": "True"
+
+    Returns:
+        dict: The movie's year, rating, poster and IMDb link
+    """
+    try:
+        rating = float(payload.get("imdbRating", 0))
+    except ValueError:  # OMDb reports "N/A" for unrated titles
+        rating = 0.0
+    return {
+        "year": payload.get("Year", ""),
+        "rating": rating,
+        "poster": payload.get("Poster", "N/A"),
+        "link": f"https://www.imdb.com/title/{payload.get('imdbID', '')}"
+    }
+
+
+class OmdbClient:
+    """
+    OMDb API client that reuses pooled connections, limits the request rate and
+    retries transient failures with exponential backoff.
+    """
+    DEFAULT_URL = "http://www.omdbapi.com/"
+    DEFAULT_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, api_key, base_url=DEFAULT_URL, timeout=DEFAULT_TIMEOUT, retries=3, backoff=0.5,
+                 rate=None, pool_size=10, cache=None):
+        """
+        Initialize the client.
+
+        Args:
+            api_key (str): OMDb API key
+            base_url (str): OMDb endpoint, e.g. a local stub server for load tests
+            timeout (float or tuple): Timeout of a single request in seconds,
+                or a (connect, read) pair
+            retries (int): Number of retries after a failed request
+            backoff (float): Delay before the first retry, doubled for every next one
+            rate (float, optional): Maximum requests per second
+            pool_size (int): Number of keep-alive connections kept open
+            cache (OmdbCache, optional): Lookup cache consulted before the network
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+        self.rate_limiter = RateLimiter(rate)
+        self.metrics = ClientMetrics()
+
+        import requests  # The HTTP stack is only loaded once a client is created
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """
+        Create a client configured from environment variables.
+
+        OMDB_API_KEY, OMDB_API_URL, OMDB_TIMEOUT, OMDB_RETRIES and OMDB_POOL_SIZE
+        are read unless the matching keyword argument is given.
+
+        Returns:
+            OmdbClient: The configured client
+        """
+        kwargs.setdefault("api_key", getenv("OMDB_API_KEY", ""))
+        kwargs.setdefault("base_url", getenv("OMDB_API_URL", cls.DEFAULT_URL))
+        if getenv("OMDB_TIMEOUT"):
+            kwargs.setdefault("timeout", float(getenv("OMDB_TIMEOUT")))
+        if getenv("OMDB_RETRIES"):
+            kwargs.setdefault("retries", int(getenv("OMDB_RETRIES")))
+        if getenv("OMDB_POOL_SIZE"):
+            kwargs.setdefault("pool_size", int(getenv("OMDB_POOL_SIZE")))
+        return cls(**kwargs)
+
+    def fetch(self, title, year=None):
+        """
+        Request a title from the OMDb API, bypassing the cache.
+
+        Args:
+            title (str): The movie title
+            year (str, optional): The release year
+
+        Returns:
+            dict: Decoded OMDb JSON response
+
+        Raises:
+            requests.exceptions.RequestException: If the request still fails after all retries
+        """
+        import requests
+        params = {"apikey": self.api_key, "t": title}
+        if year:
+            params["y"] = year
+
+        attempt = 0
+        while True:
+            self.rate_limiter.wait()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                retry = response.status_code in self.RETRY_STATUSES
+                self.metrics.record(time.perf_counter() - start, failed=not response.ok)
+                if not retry or attempt >= self.retries:
+                    response.raise_for_status()
+                    return response.json()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.metrics.record(time.perf_counter() - start, failed=True)
+                if attempt >= self.retries:
+                    raise
+            self.metrics.record_retry()
+            time.sleep(self.backoff * 2 ** attempt)
+            attempt += 1
+
+    def lookup(self, title, year=None):
+        """
+        Look up a title, answering from the cache when possible.
+
+        Args:
+            title (str): The movie title
+            year (str, optional): The release year
+
+        Returns:
+            tuple: (payload, cached) where payload is the OMDb response and
+                cached tells whether it came from the cache
+        """
+        if self.cache is not None:
+            payload = self.cache.get(title, year)
+            if payload is not None:
+                return payload, True
+        payload = self.fetch(title, year)
+        if self.cache is not None:
+            self.cache.put(title, year, payload)
+        return payload, False
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        self.session.close()
+
+
+_default_client = None
+
+
+def get_default_client():
+    """
+    Return the OMDb client shared by the whole application.
+
+    The client is configured from the environment (see OmdbClient.from_env) and
+    answers from the shared lookup cache when possible.
+
+    Returns:
+        OmdbClient: The shared client
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = OmdbClient.from_env(cache=get_default_cache())
+    return _default_client
@@ -0,0 +1,33 @@
+import os
+
+_loaded = False
+
+
+def load_environment():
+    """
+    Load the variables of a .env file into the environment, the first time it is
+    called. Variables that are already set keep their value.
+
+    python-dotenv is only imported here, so commands that never need the OMDb
+    settings do not pay for it at startup.
+    """
+    global _loaded
+    if not _loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _loaded = True
+
+
+def getenv(name, default=None):
+    """
+    Read an environment variable, loading the .env file first.
+
+    Args:
+        name (str): Variable name
+        default (str, optional): Value if the variable is not set
+
+    Returns:
+        str: The value, or default
+    """
+    load_environment()
+    return os.getenv(name, default)
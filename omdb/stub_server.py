@@ -0,0 +1,119 @@
+"""
+Local stand-in for the OMDb API, used for load tests and benchmarks without network access.
+
+Run it and point the app at it:
+
+    python -m omdb.stub_server --port 8765
+    OMDB_API_URL=http://127.0.0.1:8765/ OMDB_API_KEY=stub python main.py
+
+Every title is "found" unless it starts with "missing". Latency and error rate
+can be simulated with --delay and --error-rate.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_movie(title, year=None):
+    """
+    Build a deterministic OMDb-style answer for a title.
+
+    Args:
+        title (str): The requested title
+        year (str, optional): The requested year
+
+    Returns:
+        dict: OMDb JSON response
+    """
+    if title.lower().startswith("missing"):
+        return {"Response": "False", "Error": "Movie not found!"}
+    digest = int(hashlib.sha1(title.lower().encode("utf-8")).hexdigest(), 16)
+    return {
+        "Title": title.title(),
+        "Year": year or str(1950 + digest % 75),
+        "imdbRating": f"{1 + digest % 90 / 10:.1f}",
+        "imdbID": f"tt{digest % 10_000_000:07d}",
+        "Poster": f"https://example.com/posters/{digest % 100_000}.jpg",
+        "Response": "True"
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers OMDb "?t=<title>&y=<year>" requests with fake movies.
+    """
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    disable_nagle_algorithm = True
+    delay = 0.0
+    error_rate = 0.0
+
+    def do_GET(self):
+        """Answer one lookup."""
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error_rate and random.random() < self.error_rate:
+            self._send(503, {"Response": "False", "Error": "Service unavailable"})
+            return
+        query = parse_qs(urlparse(self.path).query)
+        title = query.get("t", [""])[0]
+        if not title:
+            self._send(200, {"Response": "False", "Error": "Incorrect IMDb ID."})
+            return
+        self._send(200, fake_movie(title, query.get("y", [None])[0]))
+
+    def _send(self, status, payload):
+        """Send a JSON response."""
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep load tests quiet
+
+
+def start_stub_server(port=0, delay=0.0, error_rate=0.0, handler=StubHandler):
+    """
+    Start the stub server in a background thread.
+
+    Args:
+        port (int): Port to listen on, 0 picks a free one
+        delay (float): Simulated latency per request in seconds
+        error_rate (float): Fraction of requests answered with HTTP 503
+        handler (type): Request handler class
+
+    Returns:
+        tuple: (server, base_url); call server.shutdown() to stop it
+    """
+    handler_class = type("ConfiguredStubHandler", (handler,), {"delay": delay, "error_rate": error_rate})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def main():
+    """Run the stub server in the foreground."""
+    parser = argparse.ArgumentParser(description="Local OMDb stub server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Simulated latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.port, args.delay, args.error_rate)
+    print(f"🧪 OMDb stub server listening on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
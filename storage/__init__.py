@@ -1,5 +1,28 @@
-from .storage_json import StorageJson
-from .storage_csv import StorageCsv
-from .istorage import IStorage
+from .istorage import IStorage, StorageListener
+from .locking import StorageConflictError
 
-__all__ = ["StorageJson", "StorageCsv", "IStorage"]
\ No newline at end of file
+# Backends are imported on first use, so opening one file type does not load the others
+_BACKENDS = {
+    "StorageJson": ".storage_json",
+    "StorageCsv": ".storage_csv",
+    "StorageCached": ".storage_cached",
+    "StorageJournal": ".storage_journal",
+    "StorageSqlite": ".storage_sqlite",
+    "StorageMmap": ".storage_mmap"
+}
+
+
+def __getattr__(name):
+    if name not in _BACKENDS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    backend = getattr(importlib.import_module(_BACKENDS[name], __name__), name)
+    globals()[name] = backend
+    return backend
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_BACKENDS))
+
+
+__all__ = ["StorageJson", "StorageCsv", "StorageCached", "StorageJournal", "StorageSqlite", "StorageMmap", "IStorage", "StorageListener", "StorageConflictError"]
\ No newline at end of file
@@ -0,0 +1,299 @@
+import json
+import math
+import re
+import sys
+from array import array
+from collections.abc import Mapping, MutableMapping
+from urllib.parse import quote_plus
+
+FIELDS = ("year", "rating", "poster", "link")
+NO_YEAR = 0  # Stored in the year column when the year is not a plain number
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def default_link(title):
+    """
+    Return the IMDb search link used when a movie has no link of its own.
+
+    Args:
+        title (str): The title of the movie
+
+    Returns:
+        str: IMDb search URL for the title
+    """
+    return f"https://www.imdb.com/find?q={quote_plus(title)}"
+
+
+class MovieRecord(MutableMapping):
+    """
+    Dictionary-like view of one movie stored in a CompactMovies collection.
+
+    Reading and assigning keys goes straight to the collection's columns, so code
+    that does `movies[title]["rating"] = 8.0` keeps working.
+    """
+    __slots__ = ("_movies", "_row")
+
+    def __init__(self, movies, row):
+        self._movies = movies
+        self._row = row
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return self._movies._get_field(self._row, key)
+
+    def __setitem__(self, key, value):
+        if key not in FIELDS:
+            raise KeyError(key)
+        self._movies._set_field(self._row, key, value)
+
+    def __delitem__(self, key):
+        raise TypeError("Movie fields cannot be deleted")
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        # Pickle (e.g. for a process pool) and copy as a plain dict of the fields,
+        # not as a view that would drag the whole collection along
+        return dict, (dict(self),)
+
+
+class CompactMovies(MutableMapping):
+    """
+    Memory-efficient movie collection that stores every field in a column.
+
+    Ratings live in an array('f') and years in an array('H') instead of one dict
+    of boxed objects per movie. Poster and link URLs are split into a shared,
+    interned prefix and a per-movie suffix. Links that equal the default IMDb search
+    link are not stored at all but computed when read. Movies are read through
+    MovieRecord views, so the collection can stand in for the usual dict of dicts.
+
+    Years are returned as strings, and ratings keep float32 precision (rounded to
+    4 decimals when read).
+    """
+
+    def __init__(self, movies=None):
+        """
+        Args:
+            movies (Mapping or iterable, optional): Movies to copy, as a dict of
+                dicts or as (title, details) pairs
+        """
+        self._rows = {}                 # title -> row, in insertion order
+        self._titles = []               # row -> title, None for free rows
+        self._ratings = array("f")
+        self._years = array("H")
+        self._odd_years = {}            # row -> year that does not fit the year column
+        self._poster_prefixes = array("I")
+        self._posters = []              # row -> poster suffix
+        self._link_prefixes = array("I")
+        self._links = []                # row -> link suffix, None for the default link
+        self._prefixes = []             # prefix id -> interned URL prefix
+        self._prefix_ids = {}
+        self._free_rows = []
+        if movies is not None:
+            self.update(movies.items() if isinstance(movies, Mapping) else movies)
+
+    def _prefix_id(self, prefix):
+        """
+        Return the id of a shared URL prefix, registering it if needed.
+        """
+        prefix_id = self._prefix_ids.get(prefix)
+        if prefix_id is None:
+            prefix_id = len(self._prefixes)
+            self._prefixes.append(sys.intern(prefix))
+            self._prefix_ids[prefix] = prefix_id
+        return prefix_id
+
+    def _split_url(self, url):
+        """
+        Split a URL into a shared prefix id and the suffix after its last "/",
+        not counting a trailing one (".../title/tt0111161/" shares ".../title/").
+        """
+        url = "" if url is None else str(url)
+        cut = url.rfind("/", 0, len(url) - 1) + 1
+        prefix, suffix = url[:cut], url[cut:]
+        return self._prefix_id(prefix), sys.intern(suffix) if len(suffix) < 8 else suffix
+
+    def _get_field(self, row, key):
+        """
+        Read one field of a stored movie.
+        """
+        if key == "rating":
+            rating = self._ratings[row]
+            return None if math.isnan(rating) else round(rating, 4)
+        if key == "year":
+            return self._odd_years[row] if row in self._odd_years else str(self._years[row])
+        if key == "poster":
+            return self._prefixes[self._poster_prefixes[row]] + self._posters[row]
+        link = self._links[row]
+        if link is None:
+            return default_link(self._titles[row])
+        return self._prefixes[self._link_prefixes[row]] + link
+
+    def _set_field(self, row, key, value):
+        """
+        Write one field of a stored movie.
+        """
+        if key == "rating":
+            self._ratings[row] = float("nan") if value is None else float(value)
+        elif key == "year":
+            self._odd_years.pop(row, None)
+            text = str(value)
+            if text.isdigit() and 0 < int(text) < 65536 and str(int(text)) == text:
+                self._years[row] = int(text)
+            else:
+                self._years[row] = NO_YEAR
+                self._odd_years[row] = value
+        elif key == "poster":
+            self._poster_prefixes[row], self._posters[row] = self._split_url(value)
+        elif value is None or value == default_link(self._titles[row]):
+            self._links[row] = None
+        else:
+            self._link_prefixes[row], self._links[row] = self._split_url(value)
+
+    def __getitem__(self, title):
+        return MovieRecord(self, self._rows[title])
+
+    def __setitem__(self, title, details):
+        row = self._rows.get(title)
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+                self._titles[row] = title
+            else:
+                row = len(self._titles)
+                self._titles.append(title)
+                self._ratings.append(0.0)
+                self._years.append(NO_YEAR)
+                self._poster_prefixes.append(0)
+                self._posters.append("")
+                self._link_prefixes.append(0)
+                self._links.append(None)
+            self._rows[title] = row
+        for key in FIELDS:
+            self._set_field(row, key, details.get(key))
+
+    def __delitem__(self, title):
+        row = self._rows.pop(title)
+        self._titles[row] = None
+        self._odd_years.pop(row, None)
+        self._posters[row] = ""
+        self._links[row] = None
+        self._free_rows.append(row)
+
+    def pop(self, title, *default):
+        """
+        Remove a movie and return a plain dict copy of its details.
+
+        A MovieRecord would point at a row that is about to be reused.
+        """
+        if title not in self._rows:
+            if default:
+                return default[0]
+            raise KeyError(title)
+        details = dict(self[title])
+        del self[title]
+        return details
+
+    def __contains__(self, title):
+        return title in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __repr__(self):
+        return f"CompactMovies({len(self)} movies)"
+
+
+def _skip_whitespace(text, pos):
+    return WHITESPACE.match(text, pos).end()
+
+
+def _read_object(decoder, text, pos, read_value):
+    """
+    Parse the JSON object at text[pos] one member at a time.
+
+    Args:
+        decoder (json.JSONDecoder): Decoder for the keys
+        text (str): The JSON document
+        pos (int): Offset of the object
+        read_value (callable): Called with each key and the offset of its value,
+            returns the offset after the value
+
+    Returns:
+        int: Offset after the object
+
+    Raises:
+        json.JSONDecodeError: If the object is malformed
+    """
+    pos = _skip_whitespace(text, pos)
+    if not text.startswith("{", pos):
+        raise json.JSONDecodeError("Expecting '{'", text, pos)
+    pos = _skip_whitespace(text, pos + 1)
+    if text.startswith("}", pos):
+        return pos + 1
+    while True:
+        if not text.startswith('"', pos):
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, pos)
+        key, pos = decoder.raw_decode(text, pos)
+        pos = _skip_whitespace(text, pos)
+        if not text.startswith(":", pos):
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+        pos = _skip_whitespace(text, read_value(key, _skip_whitespace(text, pos + 1)))
+        if text.startswith("}", pos):
+            return pos + 1
+        if not text.startswith(",", pos):
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = _skip_whitespace(text, pos + 1)
+
+
+def load_json(text):
+    """
+    Parse a movies JSON document straight into a CompactMovies.
+
+    json.load would first build the whole file as a dict of dicts; here each
+    movie is decoded and packed on its own, so only one movie's dict exists at a
+    time. Both layouts StorageJson reads are accepted: {"movies": {title: details}}
+    and the older {title: details}.
+
+    Args:
+        text (str): The JSON document
+
+    Returns:
+        CompactMovies: The movies
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON
+    """
+    decoder = json.JSONDecoder()
+    wrapped, unwrapped = None, CompactMovies()
+
+    def read_movie(movies):
+        def read(title, pos):
+            details, pos = decoder.raw_decode(text, pos)
+            if isinstance(details, dict):
+                movies[title] = details
+            return pos
+        return read
+
+    def read_member(key, pos):
+        nonlocal wrapped
+        if key == "movies" and text.startswith("{", pos):
+            wrapped = CompactMovies()
+            return _read_object(decoder, text, pos, read_movie(wrapped))
+        return read_movie(unwrapped)(key, pos)
+
+    end = _skip_whitespace(text, _read_object(decoder, text, 0, read_member))
+    if end != len(text):
+        raise json.JSONDecodeError("Extra data", text, end)
+    return unwrapped if wrapped is None else wrapped
@@ -0,0 +1,47 @@
+"""
+Convert movie collections between JSON/CSV files and binary snapshots (.mbin).
+
+    python -m storage.convert movies.json movies.mbin
+    python -m storage.convert movies.mbin movies.csv
+"""
+import argparse
+from .storage_mmap import StorageMmap
+
+
+def convert_file(source, target):
+    """
+    Convert a JSON or CSV file to a binary snapshot, or a snapshot to JSON or CSV.
+
+    Args:
+        source (str): Path of the file to read
+        target (str): Path of the file to write
+
+    Returns:
+        int: Number of movies converted
+
+    Raises:
+        ValueError: If neither file is a .mbin snapshot, or the other is not JSON or CSV
+    """
+    if target.lower().endswith(".mbin"):
+        return StorageMmap(target).import_file(source)
+    if source.lower().endswith(".mbin"):
+        return StorageMmap(source).export_file(target)
+    raise ValueError("Either the source or the target must be a .mbin snapshot.")
+
+
+def main():
+    """Parse the command line and convert one file."""
+    parser = argparse.ArgumentParser(description="Convert movie files to and from binary snapshots (.mbin)")
+    parser.add_argument("source", help="JSON, CSV or .mbin file to read")
+    parser.add_argument("target", help="JSON, CSV or .mbin file to write")
+    args = parser.parse_args()
+
+    try:
+        count = convert_file(args.source, args.target)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"✅ Converted {count} movies from '{args.source}' to '{args.target}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,55 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from urllib.parse import quote_plus
+
+
+class StorageListener:
+    """
+    Base class for objects that keep derived data (statistics, indexes, ...) in sync
+    with a storage. Register one with IStorage.add_listener; every method does
+    nothing by default, so subclasses only override what they need.
+    """
+
+    def reset(self, movies):
+        """
+        Rebuild from scratch.
+
+        Args:
+            movies (dict): The complete collection
+        """
+        pass
+
+    def movie_added(self, title, details):
+        """
+        A movie was added.
+
+        Args:
+            title (str): The title of the movie
+            details (dict): The movie's year, rating, poster and link
+        """
+        pass
+
+    def movie_deleted(self, title, details):
+        """
+        A movie was deleted.
+
+        Args:
+            title (str): The title of the movie
+            details (dict): The details the movie had before it was deleted
+        """
+        pass
+
+    def movie_updated(self, title, old_details, details):
+        """
+        A movie was changed.
+
+        Args:
+            title (str): The title of the movie
+            old_details (dict): The details before the change
+            details (dict): The details after the change
+        """
+        pass
+
 
 class IStorage(ABC):
     """Interface for movie storage implementations."""
@@ -27,6 +78,26 @@ class IStorage(ABC):
         """
         pass
 
+    @staticmethod
+    def _find_title(movies, title):
+        """
+        Return the key under which a title is stored, ignoring case.
+
+        An exact match is a dictionary lookup; only other spellings fall back to a
+        scan, which stops at the first match and builds no lookup table.
+
+        Args:
+            movies (dict): Dictionary of movie information
+            title (str): The title to look up
+
+        Returns:
+            str: The stored title, or None if there is no such movie
+        """
+        if title in movies:
+            return title
+        lowered = title.lower()
+        return next((key for key in movies if key.lower() == lowered), None)
+
     def list_movies(self):
         """
         Returns a dictionary of dictionaries that
@@ -35,12 +106,32 @@ class IStorage(ABC):
         The function returns a dictionary of dictionaries where each key is a movie title
         and the value is a dictionary with the movie's information (year, rating, poster, link).
 
+        Inside a batch() the collection includes the changes not saved yet.
+
         Returns:
             dict: Dictionary of movie information
         """
-        return self._load_movies()
+        return self._working_movies()
+
+    def iter_movies(self, where=None):
+        """
+        Iterate over the movies one at a time.
+
+        Backends that can read their storage incrementally override this to stream
+        movies without loading the whole collection.
+
+        Args:
+            where (callable, optional): Only yield movies for which
+                where(title, details) is true
+
+        Yields:
+            tuple: (title, details) pairs
+        """
+        for title, details in self.list_movies().items():
+            if where is None or where(title, details):
+                yield title, details
 
-    def add_movie(self, title, year, rating, poster):
+    def add_movie(self, title, year, rating, poster, link=None):
         """
         Adds a movie to the movie database.
 
@@ -49,23 +140,27 @@ class IStorage(ABC):
             year (str): The release year of the movie
             rating (float): The rating of the movie (1-10)
             poster (str): URL to the movie poster image
+            link (str, optional): The movie's IMDb page, an IMDb search for the title by default
 
         Returns:
             bool: True if movie was added successfully, False otherwise
         """
-        movies = self._load_movies()
+        with self._write_lock():
+            movies = self._working_movies()
 
-        if title in movies:
-            return False
+            if title in movies:
+                return False
 
-        movies[title] = {
-            "year": year,
-            "rating": rating,
-            "poster": poster
-        }
+            movies[title] = {
+                "year": year,
+                "rating": rating,
+                "poster": poster,
+                "link": link or f"https://www.imdb.com/find?q={quote_plus(title)}"
+            }
 
-        self._save_movies(movies)
-        return True
+            self._store_changes(movies)
+            self._notify("movie_added", title, movies[title])
+            return True
 
     def delete_movie(self, title):
         """
@@ -77,15 +172,16 @@ class IStorage(ABC):
         Returns:
             bool: True if movie was deleted successfully, False otherwise
         """
-        movies = self._load_movies()
-        title_mapping = {k.lower(): k for k in movies.keys()}
+        with self._write_lock():
+            movies = self._working_movies()
+            actual_title = self._find_title(movies, title)
 
-        if title.lower() in title_mapping:
-            actual_title = title_mapping[title.lower()]
-            del movies[actual_title]
-            self._save_movies(movies)
-            return True
-        return False
+            if actual_title is not None:
+                details = movies.pop(actual_title)
+                self._store_changes(movies)
+                self._notify("movie_deleted", actual_title, details)
+                return True
+            return False
 
     def update_movie(self, title, rating):
         """
@@ -98,12 +194,161 @@ class IStorage(ABC):
         Returns:
             bool: True if movie was updated successfully, False otherwise
         """
-        movies = self._load_movies()
-        title_mapping = {k.lower(): k for k in movies.keys()}
+        with self._write_lock():
+            movies = self._working_movies()
+            actual_title = self._find_title(movies, title)
+
+            if actual_title is not None:
+                old_details = dict(movies[actual_title])
+                movies[actual_title]['rating'] = rating
+                self._store_changes(movies)
+                self._notify("movie_updated", actual_title, old_details, movies[actual_title])
+                return True
+            return False
 
-        if title.lower() in title_mapping:
-            actual_title = title_mapping[title.lower()]
-            movies[actual_title]['rating'] = rating
+    def _working_movies(self):
+        """
+        Return the collection a change is applied to: the batch's collection inside
+        batch(), otherwise a freshly loaded one.
+
+        Returns:
+            dict: Dictionary of movie information
+        """
+        movies = self.__dict__.get("_batch")
+        return movies if movies is not None else self._load_movies()
+
+    def _write_lock(self):
+        """
+        Return the context manager held around one change's load, change and save,
+        so that no other process writes in between.
+
+        File based storages take an exclusive file lock outside of a batch(); the
+        default does nothing.
+
+        Returns:
+            contextmanager: Context manager for the read-modify-write cycle
+        """
+        return nullcontext()
+
+    def _in_batch(self):
+        """
+        Tell whether a batch() is in progress.
+
+        Returns:
+            bool: True inside a batch() block
+        """
+        return self.__dict__.get("_batch") is not None
+
+    def _store_changes(self, movies):
+        """
+        Save a changed collection, or only remember that it changed inside batch().
+
+        Args:
+            movies (dict): The collection returned by _working_movies()
+        """
+        if self._in_batch():
+            self._batch_dirty = True
+        else:
             self._save_movies(movies)
-            return True
-        return False
+
+    @contextmanager
+    def batch(self):
+        """
+        Apply many changes with one load and one save.
+
+        The collection is loaded when the block starts; add_movie, delete_movie and
+        update_movie change it in memory, and it is saved once when the block ends.
+        If the block raises, nothing is saved and listeners are reset to the stored
+        collection. Nested batches join the outermost one.
+
+            with storage.batch():
+                for title, rating in ratings:
+                    storage.update_movie(title, rating)
+
+        Yields:
+            IStorage: This storage
+        """
+        if self._in_batch():
+            yield self
+            return
+        self._batch = self._begin_batch()
+        self._batch_dirty = False
+        try:
+            yield self
+            movies, self._batch = self._batch, None
+            self._commit_batch(movies, self._batch_dirty)
+        except BaseException:
+            self._batch = None
+            self._rollback_batch()
+            raise
+
+    def _begin_batch(self):
+        """
+        Start a batch.
+
+        Returns:
+            dict: The collection the batch's changes are applied to
+        """
+        return self._load_movies()
+
+    def _commit_batch(self, movies, changed):
+        """
+        Save the result of a batch.
+
+        Args:
+            movies (dict): The batch's collection
+            changed (bool): Whether any change was made
+        """
+        if changed:
+            self._save_movies(movies)
+
+    def _rollback_batch(self):
+        """
+        Undo a failed batch: the unsaved collection is dropped, so listeners that
+        followed its changes are reset to the stored collection.
+        """
+        if self.__dict__.get("_listeners"):
+            self._notify("reset", self._load_movies())
+
+    def add_listener(self, listener, reset=True):
+        """
+        Register a listener that is told about every change made through this storage.
+
+        Args:
+            listener (StorageListener): The listener to register
+            reset (bool): Reset the listener with the current collection right away;
+                pass False if it is already in sync (e.g. loaded from disk)
+        """
+        if "_listeners" not in self.__dict__:
+            self._listeners = []
+        self._listeners.append(listener)
+        if reset:
+            listener.reset(self.list_movies())
+
+    def remove_listener(self, listener):
+        """
+        Unregister a listener.
+
+        Args:
+            listener (StorageListener): The listener to remove
+        """
+        self.__dict__.get("_listeners", []).remove(listener)
+
+    def _notify(self, event, *args):
+        """
+        Call a StorageListener method on every registered listener.
+
+        Args:
+            event (str): Name of the listener method, e.g. "movie_added"
+            *args: Arguments passed to the listener method
+        """
+        for listener in self.__dict__.get("_listeners", ()):
+            getattr(listener, event)(*args)
+
+    def close(self):
+        """
+        Release any resources held by the storage and write pending changes.
+
+        File based storages write on every mutation, so the default does nothing.
+        """
+        pass
@@ -0,0 +1,191 @@
+"""
+Advisory file locking and optimistic version checks for file based storages.
+
+Several processes can share one movies.json or movies.csv: reads hold a shared
+lock and writes an exclusive one, taken on a ".lock" file next to the data file
+(the data file itself is replaced on every save, so it cannot carry the lock).
+Saves write a temporary file that atomically replaces the original, and are
+refused with StorageConflictError if the file changed since it was loaded.
+
+Where fcntl is not available (Windows) the locks do nothing; saves are still atomic
+and the version check still applies.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+LOCK_SUFFIX = ".lock"
+TMP_SUFFIX = ".tmp"
+
+
+class StorageConflictError(Exception):
+    """The storage file was changed by another process since it was loaded."""
+
+
+def file_version(path):
+    """
+    Return a value that changes whenever the file is written or replaced.
+
+    Args:
+        path (str): Path of the file
+
+    Returns:
+        tuple: (inode, mtime, size) of the file, or None if it does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class SharedFile:
+    """
+    A storage file that other processes may read and write at the same time.
+
+    Locks are reentrant within a process, so a read nested in a write (e.g. a
+    rewrite that streams the old rows) reuses the lock already held; threads of
+    one process take turns.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Path of the data file
+        """
+        self.path = path
+        self.lock_path = path + LOCK_SUFFIX
+        self.version = None
+        self._loaded = False
+        self._mutex = threading.RLock()
+        self._fd = None
+        self._depth = 0
+        self._exclusive = False
+
+    def _flock(self, exclusive):
+        """
+        Take (or convert to) a shared or exclusive lock on the lock file.
+        """
+        if fcntl is None:
+            return
+        if self._fd is None:
+            try:
+                self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+            except OSError:  # E.g. a read-only directory: nobody can write there anyway
+                return
+        fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _unlock(self):
+        """
+        Release the lock and close the lock file.
+        """
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+    @contextmanager
+    def _locked(self, exclusive):
+        """
+        Hold the lock for the duration of a with block, nesting inside a lock already held.
+        """
+        with self._mutex:
+            upgrade = exclusive and not self._exclusive
+            if self._depth == 0 or upgrade:
+                self._flock(exclusive)
+            held, self._exclusive = self._exclusive, self._exclusive or exclusive
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                self._exclusive = held
+                if self._depth == 0:
+                    self._unlock()
+                elif upgrade:
+                    self._flock(False)  # Back to the shared lock of the enclosing block
+
+    def shared(self):
+        """
+        Context manager holding a shared lock: other readers may proceed, writers wait.
+        """
+        return self._locked(False)
+
+    def exclusive(self):
+        """
+        Context manager holding an exclusive lock: every other reader and writer waits.
+        """
+        return self._locked(True)
+
+    @contextmanager
+    def loading(self):
+        """
+        Context manager for loading the whole file: holds a shared lock and
+        remembers the version that was read, for the check in replace().
+        """
+        with self.shared():
+            self.version = file_version(self.path)
+            self._loaded = True
+            yield
+
+    @contextmanager
+    def changing(self):
+        """
+        Context manager for a change that reads the current file under the lock
+        instead of a loaded copy (e.g. appending a row), so it cannot conflict.
+
+        Holds an exclusive lock; a remembered version that was current stays current.
+        """
+        with self.exclusive():
+            in_sync = self._loaded and file_version(self.path) == self.version
+            yield
+            if in_sync:
+                self.version = file_version(self.path)
+
+    def check_version(self):
+        """
+        Make sure the file has not changed since it was last loaded or replaced.
+
+        Raises:
+            StorageConflictError: If another process changed the file in the meantime
+        """
+        if self._loaded and file_version(self.path) != self.version:
+            raise StorageConflictError(f"'{self.path}' was changed by another process since it was loaded.")
+
+    def replace(self, write, check=True, **open_kwargs):
+        """
+        Write the file through a temporary file that atomically replaces it.
+
+        Runs under an exclusive lock after check_version(); readers see either the
+        old or the new file, never a half-written one.
+
+        Args:
+            write (callable): write(file) writes the new content to an open text file
+            check (bool): Check and remember the version; pass False inside changing()
+            **open_kwargs: Extra arguments for open(), e.g. newline=""
+
+        Raises:
+            StorageConflictError: If the file changed since it was loaded
+        """
+        tmp_path = self.path + TMP_SUFFIX
+        with self.exclusive():
+            if check:
+                self.check_version()
+            try:
+                with open(tmp_path, "w", encoding="utf-8", **open_kwargs) as file:
+                    write(file)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            if check:
+                self.version = file_version(self.path)
+                self._loaded = True
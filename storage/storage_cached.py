@@ -0,0 +1,248 @@
+import atexit
+import os
+from collections.abc import MutableMapping
+from contextlib import nullcontext
+from urllib.parse import quote_plus
+from .istorage import IStorage
+from .locking import StorageConflictError
+
+
+class StorageCached(IStorage):
+    """
+    In-memory write-through cache that wraps another storage backend.
+
+    The parsed collection is kept in memory, so reads no longer reparse the file.
+    Changes made to the file by another program are detected by comparing its
+    modification time and size before every access. Changes not yet written are
+    then applied again to the new version of the file, the same way a single
+    change made by another process would be, so neither side's changes are lost.
+    """
+    FLUSH_IMMEDIATE = "immediate"  # Write to disk after every mutation
+    FLUSH_BATCH = "batch"          # Write to disk every `flush_every` mutations
+    FLUSH_EXIT = "exit"            # Write to disk only on flush()/close() or at exit
+    FLUSH_POLICIES = (FLUSH_IMMEDIATE, FLUSH_BATCH, FLUSH_EXIT)
+
+    def __init__(self, backend, flush_policy=FLUSH_IMMEDIATE, flush_every=50):
+        """
+        Initialize the cache around a file based storage backend.
+
+        Args:
+            backend (IStorage): Storage to cache, e.g. StorageJson or StorageCsv
+            flush_policy (str): One of "immediate", "batch" or "exit"
+            flush_every (int): Number of mutations per write for the "batch" policy
+        """
+        if flush_policy not in self.FLUSH_POLICIES:
+            raise ValueError(f"Unknown flush policy '{flush_policy}'. "
+                             f"Use one of: {', '.join(self.FLUSH_POLICIES)}")
+        self.backend = backend
+        self.file_path = backend.file_path
+        self.flush_policy = flush_policy
+        self.flush_every = max(1, int(flush_every))
+        self._movies = None
+        self._signature = None
+        self._pending = 0
+        self._changes = []  # (method, args) of the pending changes, None for one that cannot be applied again
+        self._change = None  # The add/delete/update call in progress
+
+        if flush_policy != self.FLUSH_IMMEDIATE:
+            atexit.register(self.flush)
+
+    def _file_signature(self):
+        """
+        Return the (mtime, size) pair of the backing file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_movies(self):
+        """
+        Return the cached collection, reloading it if the file was changed outside this process.
+
+        Pending (unflushed) changes are applied again to the reloaded collection and
+        stay pending. Listeners are reset whenever the file was reloaded because of
+        an outside change.
+
+        Returns:
+            dict: Dictionary of movie information
+
+        Raises:
+            StorageConflictError: If the file changed and a pending change cannot be applied again
+        """
+        if self._movies is None:
+            self._signature = self._file_signature()
+            self._movies = self._backend_movies()
+        elif self._file_signature() != self._signature:
+            self._reload()
+        return self._movies
+
+    def _reload(self):
+        """
+        Load the version of the file another program wrote and apply the pending changes to it.
+
+        Raises:
+            StorageConflictError: If a pending change cannot be applied again, e.g.
+                one made by a whole-collection save
+        """
+        if None in self._changes:
+            raise StorageConflictError(f"'{self.file_path}' was changed by another process and the cached "
+                                       f"changes cannot be applied to the new version.")
+        signature = self._file_signature()
+        movies = self._backend_movies()
+        for method, args in self._changes:
+            self._apply(movies, method, args)
+        self._movies, self._signature = movies, signature
+        self._notify("reset", self._movies)
+
+    def _backend_movies(self):
+        """
+        Load the collection from the backend, copying it if the backend only hands out a read-only view.
+
+        Returns:
+            dict: Dictionary of movie information the cache may change
+        """
+        movies = self.backend._load_movies()
+        if not isinstance(movies, MutableMapping):
+            movies = {title: dict(details) for title, details in movies.items()}
+        return movies
+
+    def _apply(self, movies, method, args):
+        """
+        Apply one recorded change to a collection. Changes that no longer apply (the
+        movie was added or deleted meanwhile) are skipped, like the original call would.
+
+        Args:
+            movies (dict): The collection to change
+            method (str): "add_movie", "delete_movie" or "update_movie"
+            args (tuple): The arguments of the call
+        """
+        if method == "add_movie":
+            title, year, rating, poster, link = args
+            if title not in movies:
+                movies[title] = {"year": year, "rating": rating, "poster": poster,
+                                 "link": link or f"https://www.imdb.com/find?q={quote_plus(title)}"}
+            return
+        actual_title = self._find_title(movies, args[0])
+        if actual_title is None:
+            return
+        if method == "delete_movie":
+            del movies[actual_title]
+        else:
+            movies[actual_title] = dict(movies[actual_title], rating=args[1])
+
+    def _recorded(self, method, *args):
+        """
+        Run an IStorage change, remembering it so it can be applied again after an outside change.
+        """
+        self._change = (method, args)
+        try:
+            return getattr(super(), method)(*args)
+        finally:
+            self._change = None
+
+    def add_movie(self, title, year, rating, poster, link=None):
+        """
+        Adds a movie to the cached collection, see IStorage.add_movie.
+        """
+        return self._recorded("add_movie", title, year, rating, poster, link)
+
+    def delete_movie(self, title):
+        """
+        Deletes a movie from the cached collection, see IStorage.delete_movie.
+        """
+        return self._recorded("delete_movie", title)
+
+    def update_movie(self, title, rating):
+        """
+        Updates a movie's rating in the cached collection, see IStorage.update_movie.
+        """
+        return self._recorded("update_movie", title, rating)
+
+    def _store_changes(self, movies):
+        """
+        Remember the change in progress, then store the collection.
+
+        Args:
+            movies (dict): The changed collection
+        """
+        self._changes.append(self._change)
+        super()._store_changes(movies)
+
+    def _save_movies(self, movies):
+        """
+        Store the collection in memory and write it through according to the flush policy.
+
+        Args:
+            movies (dict): Dictionary of movie information to save
+        """
+        self._movies = movies
+        self._pending += 1
+
+        if (self.flush_policy == self.FLUSH_IMMEDIATE or
+                (self.flush_policy == self.FLUSH_BATCH and self._pending >= self.flush_every)):
+            self.flush()
+
+    def _write_lock(self):
+        """
+        Hold the backend's lock around a single change, so the cached collection
+        cannot go stale between reloading it and writing it through.
+
+        Returns:
+            contextmanager: The backend's lock, or a no-op inside a batch
+        """
+        return nullcontext() if self._in_batch() else self.backend._write_lock()
+
+    def _begin_batch(self):
+        """
+        Write pending changes first, so rolling back a batch cannot lose them.
+
+        Returns:
+            dict: The cached collection
+        """
+        self.flush()
+        return super()._begin_batch()
+
+    def _rollback_batch(self):
+        """
+        Drop the cached collection the failed batch changed and reload it from the file.
+        """
+        self._movies = None
+        self._pending = 0
+        self._changes = []
+        super()._rollback_batch()
+
+    @property
+    def pending_changes(self):
+        """int: Number of mutations not yet written to disk."""
+        return self._pending
+
+    def flush(self):
+        """
+        Write pending changes to the backing file.
+
+        If another program changed the file since it was loaded, the pending changes
+        are applied to its new version first.
+
+        Raises:
+            StorageConflictError: If the file changed and a pending change cannot be applied again
+        """
+        if not self._pending or self._movies is None:
+            return
+        with self.backend._write_lock():
+            if self._file_signature() != self._signature:
+                self._reload()
+            self.backend._save_movies(self._movies)
+            self._signature = self._file_signature()
+            self._pending = 0
+            self._changes = []
+
+    def close(self):
+        """
+        Flush pending changes and close the backing storage.
+        """
+        if self.flush_policy != self.FLUSH_IMMEDIATE:
+            atexit.unregister(self.flush)
+        self.flush()
+        self.backend.close()
@@ -1,41 +1,163 @@
 import csv
 import os
 from .istorage import IStorage
+from .compact import CompactMovies
+from .locking import SharedFile
+from contextlib import closing, nullcontext
 from urllib.parse import quote_plus
 
 class StorageCsv(IStorage):
     """
     Storage class using CSV file format.
+
+    Besides loading the whole collection, the file can be streamed row by row
+    with iter_movies(), and adding, deleting or updating a movie never holds more
+    than one row in memory: new movies are appended, and other changes copy the
+    rows through a temporary file that then atomically replaces the original.
+    Inside batch() changes are applied to the loaded collection instead, which is
+    written once at the end.
+
+    Like StorageJson, the file may be shared with other processes: reads hold a
+    shared lock, changes an exclusive one, and saving a collection loaded before
+    another process changed the file raises StorageConflictError.
     """
-    def __init__(self, file_path):
+    FIELDNAMES = ["title", "year", "rating", "poster"]
+
+    def __init__(self, file_path, compact=False):
         """
         Initialize the CSV storage.
 
         Args:
             file_path (str): Path to the CSV file
+            compact (bool): Hold the loaded collection in a memory-efficient
+                CompactMovies instead of a dict of dicts
         """
         self.file_path = file_path
+        self.compact = compact
+        self._file = SharedFile(file_path)
+
+    def _rows(self):
+        """
+        Stream the raw rows of the CSV file.
+
+        The file is only opened under the shared lock, which is released before the
+        first row is yielded, so a consumer that stops early or pauses between rows
+        never keeps writers waiting. Saves replace the file instead of rewriting it
+        and appends only add bytes after its end, so reading the opened file up to
+        the size it had then still sees one consistent version.
+
+        Yields:
+            dict: One row with the title, year, rating and poster as strings
+        """
+        with self._file.shared():
+            if not os.path.exists(self.file_path):
+                return
+            file = open(self.file_path, "rb")
+            size = os.fstat(file.fileno()).st_size
+        with file:
+            yield from csv.DictReader(self._lines(file, size))
+
+    @staticmethod
+    def _lines(file, size):
+        """
+        Decode the lines of a binary file, stopping after its first size bytes.
+
+        Args:
+            file (file): File opened in binary mode
+            size (int): Number of bytes to read
+
+        Yields:
+            str: Lines with their line breaks, as csv.reader expects them
+        """
+        for line in file:
+            if len(line) >= size:
+                yield line[:size].decode("utf-8")
+                return
+            size -= len(line)
+            yield line.decode("utf-8")
+
+    @staticmethod
+    def _details(row):
+        """
+        Convert a CSV row to the details of a movie, with the default IMDb link.
+
+        Args:
+            row (dict): Raw CSV row
+
+        Returns:
+            dict: The movie's year, rating, poster and link
+        """
+        return {
+            "year": row["year"],
+            "rating": float(row["rating"]),
+            "poster": row["poster"],
+            "link": f"https://www.imdb.com/find?q={quote_plus(row['title'])}"  # Add default link
+        }
+
+    def iter_movies(self, where=None):
+        """
+        Stream movies from the CSV file without loading the whole collection.
+
+        Args:
+            where (callable, optional): Only yield movies for which
+                where(title, details) is true
+
+        Yields:
+            tuple: (title, details) pairs in file order
+        """
+        if self._in_batch():
+            yield from super().iter_movies(where)
+            return
+        for row in self._rows():
+            details = self._details(row)
+            if where is None or where(row["title"], details):
+                yield row["title"], details
 
     def _load_movies(self):
         """
         Load movies from CSV file.
 
+        In compact mode no link is built per row; CompactMovies derives the
+        default link from the title when it is read. If a title appears in more
+        than one row (e.g. after editing the file by hand), the first row is used,
+        the same one update_movie changes.
+
         Returns:
-            dict: Dictionary of movie information
-        """
-        movies = {}
-        if os.path.exists(self.file_path):
-            with open(self.file_path, "r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    movies[row["title"]] = {
-                        "year": row["year"],
-                        "rating": float(row["rating"]),
-                        "poster": row["poster"],
-                        "link": (f"https://www.imdb.com/find?q="
-                                f"{quote_plus(row['title'])}")  # Add default link
-                    }
-        return movies
+            dict: Dictionary of movie information (a CompactMovies in compact mode)
+        """
+        with self._file.loading():
+            if not self.compact:
+                movies = {}
+                for row in self._rows():
+                    if row["title"] not in movies:
+                        movies[row["title"]] = self._details(row)
+                return movies
+            movies = CompactMovies()
+            for row in self._rows():
+                if row["title"] not in movies:
+                    movies[row["title"]] = {"year": row["year"], "rating": float(row["rating"]), "poster": row["poster"]}
+            return movies
+
+    def _write_rows(self, rows, check=True):
+        """
+        Write rows to a temporary file next to the CSV file and swap it in atomically.
+
+        Readers see either the old or the new file, never a half-written one.
+
+        Args:
+            rows (iterable): Row dicts with the title, year, rating and poster
+            check (bool): Refuse to overwrite changes made since the file was loaded;
+                False for rewrites that stream the current rows under the lock
+
+        Raises:
+            StorageConflictError: If another process changed the file since it was loaded
+        """
+        def write(file):
+            writer = csv.DictWriter(file, fieldnames=self.FIELDNAMES, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+
+        self._file.replace(write, check, newline="")
 
     def _save_movies(self, movies):
         """
@@ -44,14 +166,138 @@ class StorageCsv(IStorage):
         Args:
             movies (dict): Dictionary of movie information to save
         """
-        with open(self.file_path, "w", newline="", encoding="utf-8") as file:
-            fieldnames = ["title", "year", "rating", "poster"]
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            for title, details in movies.items():
-                writer.writerow({
-                    "title": title,
-                    "year": details["year"], 
-                    "rating": details["rating"],
-                    "poster": details["poster"]
-                })
+        self._write_rows({
+            "title": title,
+            "year": details["year"],
+            "rating": details["rating"],
+            "poster": details["poster"]
+        } for title, details in movies.items())
+
+    def _write_lock(self):
+        """
+        Hold an exclusive lock on the file around a single change.
+
+        Returns:
+            contextmanager: The file lock, or a no-op inside a batch
+        """
+        return nullcontext() if self._in_batch() else self._file.exclusive()
+
+    def _find_row_title(self, title):
+        """
+        Stream the file for the stored spelling of a title, ignoring case.
+
+        Like IStorage._find_title, an exact match wins over other spellings.
+
+        Args:
+            title (str): The title to look up
+
+        Returns:
+            str: The stored title, or None if there is no such movie
+        """
+        lowered = title.lower()
+        match = None
+        with closing(self._rows()) as rows:
+            for row in rows:
+                if row["title"] == title:
+                    return title
+                if match is None and row["title"].lower() == lowered:
+                    match = row["title"]
+        return match
+
+    def add_movie(self, title, year, rating, poster, link=None):
+        """
+        Add a movie by appending one row, without rewriting the file.
+
+        Args:
+            title (str): The title of the movie
+            year (str): The release year of the movie
+            rating (float): The rating of the movie (1-10)
+            poster (str): URL to the movie poster image
+            link (str, optional): Ignored, CSV rows have no link column and always
+                get an IMDb search for the title
+
+        Returns:
+            bool: True if movie was added successfully, False otherwise
+        """
+        if self._in_batch():
+            return super().add_movie(title, year, rating, poster)
+        with self._file.changing():
+            with closing(self._rows()) as rows:
+                if any(row["title"] == title for row in rows):
+                    return False
+
+            row = {"title": title, "year": year, "rating": rating, "poster": poster}
+            with open(self.file_path, "ab+") as file:
+                file.seek(0, os.SEEK_END)
+                is_new = file.tell() == 0
+                if not is_new:
+                    file.seek(-1, os.SEEK_END)
+                    if file.read(1) not in (b"\n", b"\r"):  # Last row written without a line break
+                        file.write(b"\r\n")
+            with open(self.file_path, "a", newline="", encoding="utf-8") as file:
+                writer = csv.DictWriter(file, fieldnames=self.FIELDNAMES)
+                if is_new:
+                    writer.writeheader()
+                writer.writerow(row)
+        self._notify("movie_added", title, self._details(row))
+        return True
+
+    def delete_movie(self, title):
+        """
+        Delete a movie by copying every other row to a new file.
+
+        Args:
+            title (str): The title of the movie to delete
+
+        Returns:
+            bool: True if movie was deleted successfully, False otherwise
+        """
+        if self._in_batch():
+            return super().delete_movie(title)
+        deleted = []
+
+        def keep(row):
+            if row["title"] == actual_title:
+                deleted.append(row)
+                return False
+            return True
+
+        with self._file.changing():
+            actual_title = self._find_row_title(title)
+            if actual_title is None:
+                return False
+            self._write_rows((row for row in self._rows() if keep(row)), check=False)
+        self._notify("movie_deleted", actual_title, self._details(deleted[0]))
+        return True
+
+    def update_movie(self, title, rating):
+        """
+        Update a movie's rating by copying the rows to a new file, changing only that one.
+        If the title appears in several rows, only the first is changed.
+
+        Args:
+            title (str): The title of the movie
+            rating (float): The new rating for the movie
+
+        Returns:
+            bool: True if movie was updated successfully, False otherwise
+        """
+        if self._in_batch():
+            return super().update_movie(title, rating)
+        changed = []
+
+        def update(row):
+            if row["title"] == actual_title and not changed:
+                changed.append(dict(row))
+                row["rating"] = rating
+                changed.append(row)
+            return row
+
+        with self._file.changing():
+            actual_title = self._find_row_title(title)
+            if actual_title is None:
+                return False
+            self._write_rows((update(row) for row in self._rows()), check=False)
+        old_row, row = changed
+        self._notify("movie_updated", actual_title, self._details(old_row), self._details(row))
+        return True
@@ -0,0 +1,353 @@
+import json
+import os
+from collections.abc import Mapping
+from types import MappingProxyType
+from urllib.parse import quote_plus
+from .istorage import IStorage
+
+
+class JournalMovies(Mapping):
+    """
+    Read-only view of a journal's in-memory collection.
+
+    Movies are read without copying them, but the view and the details it returns
+    cannot be changed: every change has to go through add_movie, delete_movie or
+    update_movie, so it is written to the journal.
+    """
+    __slots__ = ("_movies",)
+
+    def __init__(self, movies):
+        self._movies = movies
+
+    def __getitem__(self, title):
+        return MappingProxyType(self._movies[title])
+
+    def __contains__(self, title):
+        return title in self._movies
+
+    def __iter__(self):
+        return iter(self._movies)
+
+    def __len__(self):
+        return len(self._movies)
+
+    def __repr__(self):
+        return repr(self._movies)
+
+
+class StorageJournal(IStorage):
+    """
+    Storage class using an append-only journal on top of a JSON snapshot.
+
+    Every mutation is appended to the log file as one JSON line, so a write costs
+    O(1) instead of rewriting the whole collection. On startup the log is replayed
+    onto the last snapshot. Once the log grows past `compact_threshold` records it
+    is folded into a new snapshot that replaces the old one with an atomic rename.
+    Inside batch() the records are buffered and appended with a single write and
+    fsync when the batch ends.
+    """
+    SNAPSHOT_SUFFIX = ".snapshot"
+
+    def __init__(self, file_path, compact_threshold=1000, fsync=True):
+        """
+        Initialize the journal storage and replay the log.
+
+        Args:
+            file_path (str): Path to the log file, e.g. "movies.mlog"
+            compact_threshold (int): Number of log records that triggers a compaction
+            fsync (bool): Force every appended record to disk before returning
+        """
+        self.file_path = file_path
+        self.snapshot_path = file_path + self.SNAPSHOT_SUFFIX
+        self.compact_threshold = max(1, int(compact_threshold))
+        self.fsync = fsync
+        self._movies = {}
+        self._titles = {}  # lowercase title -> actual titles; several differ only in case
+        self._seq = 0
+        self._log_records = 0
+        self._log_file = None
+        self._batch_records = None  # Records buffered by batch()
+        self._replay()
+
+    def _replay(self):
+        """
+        Rebuild the in-memory collection from the snapshot and the log.
+
+        Records already contained in the snapshot (by sequence number) are skipped,
+        so a crash between writing a snapshot and truncating the log is harmless.
+        A torn last line left by a crash mid-append is discarded. A damaged record
+        followed by valid ones is not a crash artefact: the log is left untouched
+        and the journal refuses to open.
+
+        Raises:
+            ValueError: If a record other than the last one is damaged
+        """
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "r", encoding="utf-8") as file:
+                    data = json.load(file)
+                self._movies = data.get("movies", {})
+                snapshot_seq = data.get("seq", 0)
+            except json.JSONDecodeError as e:
+                print(f"❌ Error loading journal snapshot: {e}")
+                self._movies = {}
+        self._seq = snapshot_seq
+        self._index_titles()
+
+        if not os.path.exists(self.file_path):
+            return
+
+        good_offset = 0
+        damaged = False
+        with open(self.file_path, "rb") as file:
+            for line in file:
+                if damaged:
+                    raise ValueError(f"The journal record at byte {good_offset} of '{self.file_path}' is damaged "
+                                     f"and followed by other records. Repair or remove it and try again.")
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("record is missing its line terminator")
+                    record = json.loads(line)
+                except ValueError:
+                    damaged = True
+                    continue
+                good_offset += len(line)
+                self._log_records += 1
+                if record["seq"] <= snapshot_seq:
+                    continue
+                self._apply(record)
+                self._seq = record["seq"]
+
+        if damaged:
+            print(f"⚠️ Discarding the torn last journal record at byte {good_offset} of '{self.file_path}'.")
+            with open(self.file_path, "r+b") as file:
+                file.truncate(good_offset)
+
+    def _index_titles(self):
+        """
+        Rebuild the case-insensitive title lookup from the collection.
+        """
+        self._titles = {}
+        for title in self._movies:
+            self._titles.setdefault(title.lower(), []).append(title)
+
+    def _lookup(self, title):
+        """
+        Return the stored title, preferring an exact match over other spellings.
+
+        Args:
+            title (str): The title to look up
+
+        Returns:
+            str: The stored title, or None if there is no such movie
+        """
+        if title in self._movies:
+            return title
+        spellings = self._titles.get(title.lower())
+        return spellings[0] if spellings else None
+
+    def _apply(self, record):
+        """
+        Apply one journal record to the in-memory collection.
+
+        Args:
+            record (dict): Journal record with "op", "title" and operation data
+        """
+        op = record["op"]
+        title = record["title"]
+        if op == "add":
+            if title not in self._movies:
+                self._titles.setdefault(title.lower(), []).append(title)
+            self._movies[title] = record["details"]
+        elif op == "delete":
+            if self._movies.pop(title, None) is not None:
+                spellings = self._titles[title.lower()]
+                spellings.remove(title)
+                if not spellings:
+                    del self._titles[title.lower()]
+        elif op == "update":
+            if title in self._movies:
+                self._movies[title]["rating"] = record["rating"]
+
+    def _append(self, record):
+        """
+        Append a record to the log and apply it, compacting if the log is too long.
+
+        Inside batch() the record is only applied and buffered.
+
+        Args:
+            record (dict): Journal record without a sequence number
+        """
+        record["seq"] = self._seq + 1
+        self._seq = record["seq"]
+        self._apply(record)
+        if self._batch_records is not None:
+            self._batch_records.append(record)
+            return
+        self._write_records([record])
+
+    def _write_records(self, records):
+        """
+        Append records to the log with one write and one fsync, compacting if the log is too long.
+
+        Args:
+            records (list): Journal records with sequence numbers
+        """
+        if self._log_file is None:
+            self._log_file = open(self.file_path, "a", encoding="utf-8")
+        self._log_file.write("".join(json.dumps(record) + "\n" for record in records))
+        self._log_file.flush()
+        if self.fsync:
+            os.fsync(self._log_file.fileno())
+
+        self._log_records += len(records)
+        if self._log_records >= self.compact_threshold:
+            self.compact()
+
+    def _begin_batch(self):
+        """
+        Start buffering journal records.
+
+        Returns:
+            dict: The in-memory collection
+        """
+        self._batch_records = []
+        return self._movies
+
+    def _commit_batch(self, movies, changed):
+        """
+        Append the buffered records, or write a new snapshot if the whole collection
+        was replaced through _store_changes().
+
+        Args:
+            movies (dict): The batch's collection
+            changed (bool): Whether the collection was changed outside of the journal records
+        """
+        records, self._batch_records = self._batch_records, None
+        if changed:
+            self._save_movies(movies)
+        elif records:
+            self._write_records(records)
+
+    def _rollback_batch(self):
+        """
+        Drop the buffered records and rebuild the collection from the snapshot and the log.
+        """
+        self._batch_records = None
+        self._movies = {}
+        self._log_records = 0
+        self._replay()
+        super()._rollback_batch()
+
+    def compact(self):
+        """
+        Write the current collection to a new snapshot and empty the log.
+        """
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"seq": self._seq, "movies": self._movies}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+        with open(self.file_path, "w", encoding="utf-8"):
+            pass
+        self._log_records = 0
+
+    def _load_movies(self):
+        """
+        Return the in-memory collection rebuilt from the journal, without copying it.
+
+        Returns:
+            JournalMovies: Read-only view of the movie information
+        """
+        return JournalMovies(self._movies)
+
+    def _save_movies(self, movies):
+        """
+        Replace the whole collection and store it as a new snapshot.
+
+        Args:
+            movies (dict): Dictionary of movie information to save
+        """
+        self._movies = {title: dict(details) for title, details in movies.items()}
+        self._index_titles()
+        self.compact()
+
+    def add_movie(self, title, year, rating, poster, link=None):
+        """
+        Adds a movie by appending an "add" record to the journal.
+
+        Args:
+            title (str): The title of the movie
+            year (str): The release year of the movie
+            rating (float): The rating of the movie (1-10)
+            poster (str): URL to the movie poster image
+            link (str, optional): The movie's IMDb page, an IMDb search for the title by default
+
+        Returns:
+            bool: True if movie was added successfully, False otherwise
+        """
+        if title in self._movies:
+            return False
+        self._append({
+            "op": "add",
+            "title": title,
+            "details": {
+                "year": year,
+                "rating": rating,
+                "poster": poster,
+                "link": link or f"https://www.imdb.com/find?q={quote_plus(title)}"
+            }
+        })
+        self._notify("movie_added", title, self._movies[title])
+        return True
+
+    def delete_movie(self, title):
+        """
+        Deletes a movie by appending a "delete" record to the journal.
+
+        Args:
+            title (str): The title of the movie to delete
+
+        Returns:
+            bool: True if movie was deleted successfully, False otherwise
+        """
+        actual_title = self._lookup(title)
+        if actual_title is None:
+            return False
+        details = self._movies[actual_title]
+        self._append({"op": "delete", "title": actual_title})
+        self._notify("movie_deleted", actual_title, details)
+        return True
+
+    def update_movie(self, title, rating):
+        """
+        Updates a movie's rating by appending an "update" record to the journal.
+
+        Args:
+            title (str): The title of the movie
+            rating (float): The new rating for the movie
+
+        Returns:
+            bool: True if movie was updated successfully, False otherwise
+        """
+        actual_title = self._lookup(title)
+        if actual_title is None:
+            return False
+        old_details = dict(self._movies[actual_title])
+        self._append({"op": "update", "title": actual_title, "rating": rating})
+        self._notify("movie_updated", actual_title, old_details, self._movies[actual_title])
+        return True
+
+    def close(self):
+        """
+        Close the log file handle.
+        """
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
@@ -1,56 +1,122 @@
 from .istorage import IStorage  # ✅ Uses relative import
+from .compact import CompactMovies, load_json
+from .locking import SharedFile
+from contextlib import nullcontext
 import os
 import json
-import requests
-from urllib.parse import quote_plus
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
 
 class StorageJson(IStorage):
     """
     Storage class using JSON with API integration to fetch movie details.
+
+    The file may be shared with other processes: it is read under a shared lock,
+    each change is made under an exclusive one, and saves atomically replace the
+    file. Saving a collection (e.g. at the end of a batch) that was loaded before
+    another process changed the file raises StorageConflictError.
     """
-    API_URL = "http://www.omdbapi.com/?apikey={}&t={}"  # API endpoint
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, compact=False):
+        """
+        Initialize the JSON storage.
+
+        Args:
+            file_path (str): Path to the JSON file
+            compact (bool): Hold the loaded collection in a memory-efficient
+                CompactMovies instead of a dict of dicts
+        """
         self.file_path = file_path
-        # Get API key from environment variable
-        self.api_key = os.getenv("OMDB_API_KEY", "")
-        if not self.api_key:
-            print("⚠️ Warning: OMDB_API_KEY environment variable not set.")
+        self.compact = compact
+        self._file = SharedFile(file_path)
+        self._api_key = None
+
+    @property
+    def api_key(self):
+        """
+        The OMDb API key, read from the environment (or .env file) the first time
+        a movie is looked up rather than when the storage is opened.
+
+        Returns:
+            str: The key, empty if it is not set
+        """
+        if self._api_key is None:
+            from omdb import getenv
+            self._api_key = getenv("OMDB_API_KEY", "")
+            if not self._api_key:
+                print("⚠️ Warning: OMDB_API_KEY environment variable not set.")
+        return self._api_key
 
     def _load_movies(self):
         """
         Load movies from JSON file correctly.
 
+        In compact mode each movie is packed as soon as it is parsed (see
+        compact.load_json), so the whole file never exists as a dict of dicts.
+
         Returns:
-            dict: Dictionary of movie information
+            dict: Dictionary of movie information (a CompactMovies in compact mode)
         """
+        movies = {}
         try:
-            if os.path.exists(self.file_path):
-                with open(self.file_path, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-                    if "movies" in data:  # ✅ Fix: Extract movies correctly
-                        return data["movies"]
-                    return data
-            else:
-                print("⚠️ No movies.json file found, starting with an empty collection.")
-                return {}
+            with self._file.loading():
+                if os.path.exists(self.file_path):
+                    with open(self.file_path, "r", encoding="utf-8") as file:
+                        if self.compact:
+                            return load_json(file.read())
+                        data = json.load(file)
+                        movies = data["movies"] if "movies" in data else data  # ✅ Fix: Extract movies correctly
+                else:
+                    print("⚠️ No movies.json file found, starting with an empty collection.")
         except json.JSONDecodeError as e:
             print(f"❌ Error loading JSON file: {e}")
-            return {}
+        return CompactMovies(movies) if self.compact else movies
 
     def _save_movies(self, movies):
         """
-        Save movies to JSON file.
+        Save movies to JSON file, atomically replacing it.
 
         Args:
             movies (dict): Dictionary of movie information to save
+
+        Raises:
+            StorageConflictError: If another process changed the file since it was loaded
+        """
+        def write(file):
+            if isinstance(movies, dict):
+                json.dump({"movies": movies}, file, indent=4)
+            else:
+                self._dump_mapping(movies, file)
+
+        self._file.replace(write)
+
+    def _write_lock(self):
         """
-        with open(self.file_path, 'w', encoding="utf-8") as file:
-            json.dump({"movies": movies}, file, indent=4)
+        Hold an exclusive lock on the file around a single change.
+
+        Returns:
+            contextmanager: The file lock, or a no-op inside a batch
+        """
+        return nullcontext() if self._in_batch() else self._file.exclusive()
+
+    @staticmethod
+    def _dump_mapping(movies, file):
+        """
+        Write a non-dict collection (e.g. CompactMovies) in the same layout as
+        json.dump(indent=4), one movie at a time instead of converting it to a dict first.
+
+        Args:
+            movies (Mapping): Movie collection to save
+            file (file): Open text file to write to
+        """
+        if not movies:
+            file.write('{\n    "movies": {}\n}')
+            return
+        file.write('{\n    "movies": {')
+        separator = "\n        "
+        for title, details in movies.items():
+            body = json.dumps(dict(details), indent=4).replace("\n", "\n        ")
+            file.write(f"{separator}{json.dumps(title)}: {body}")
+            separator = ",\n        "
+        file.write("\n    }\n}")
 
     def fetch_movie_data(self, title):
         """
@@ -62,21 +128,13 @@ class StorageJson(IStorage):
         Returns:
             dict: Movie details if found, None otherwise
         """
+        import requests
+        from omdb import get_default_client, movie_from_payload
         try:
-            response = requests.get(
-                self.API_URL.format(self.api_key, title.replace(" ", "+")),
-                timeout=10  # Add timeout to prevent hanging indefinitely
-            )
-            response.raise_for_status()  # Raise exception for HTTP errors
-            data = response.json()
+            data, _ = get_default_client().lookup(title)
 
             if data.get("Response") == "True":
-                return {
-                    "year": int(data.get("Year", 0)),
-                    "rating": float(data.get("imdbRating", 0.0)),
-                    "poster": data.get("Poster", "https://via.placeholder.com/150"),
-                    "link": f"https://www.imdb.com/title/{data.get('imdbID', '')}"
-                }
+                return movie_from_payload(data)
             else:
                 print(f"❌ Movie '{title}' not found in OMDb API.")
                 return None
@@ -87,7 +145,7 @@ class StorageJson(IStorage):
             print(f"❌ Error fetching movie data: {e}")
             return None
 
-    def add_movie(self, title, year=None, rating=None, poster=None):
+    def add_movie(self, title, year=None, rating=None, poster=None, link=None):
         """
         Adds a movie to the storage. If only title is provided, attempts to fetch other details.
 
@@ -96,6 +154,7 @@ class StorageJson(IStorage):
             year (str, optional): The release year of the movie
             rating (float, optional): The rating of the movie (1-10)
             poster (str, optional): URL to the movie poster image
+            link (str, optional): The movie's IMDb page, an IMDb search for the title by default
 
         Returns:
             bool: True if movie was added successfully, False otherwise
@@ -109,37 +168,26 @@ class StorageJson(IStorage):
                 poster = movie_data["poster"]
 
                 # Call the parent class implementation with the fetched data
-                movies = self._load_movies()
-
-                if title in movies:
-                    return False
-
-                movies[title] = {
-                    "year": year,
-                    "rating": rating,
-                    "poster": poster,
-                    "link": movie_data["link"]
-                }
-
-                self._save_movies(movies)
-                return True
+                with self._write_lock():
+                    movies = self._working_movies()
+
+                    if title in movies:
+                        return False
+
+                    movies[title] = {
+                        "year": year,
+                        "rating": rating,
+                        "poster": poster,
+                        "link": movie_data["link"]
+                    }
+
+                    self._store_changes(movies)
+                    self._notify("movie_added", title, movies[title])
+                    return True
             return False
 
         # If all details are provided, use parent class implementation
-        movies = self._load_movies()
-
-        if title in movies:
-            return False
-
-        movies[title] = {
-            "year": year,
-            "rating": rating,
-            "poster": poster,
-            "link": f"https://www.imdb.com/find?q={quote_plus(title)}"
-        }
-
-        self._save_movies(movies)
-        return True
+        return super().add_movie(title, year, rating, poster, link)
 
     def display_movies(self):
         """
@@ -0,0 +1,488 @@
+import math
+import mmap
+import os
+import struct
+from collections.abc import MutableMapping
+from .istorage import IStorage
+from .compact import default_link
+
+MAGIC = b"MVBN"
+FORMAT_VERSION = 1
+# magic, format version, flags, number of movies, heap offset, record table offset, title index offset
+HEADER = struct.Struct("<4sHHIQQQ")
+# title, year, poster and link as (offset, length) pairs into the string heap, then the rating
+RECORD = struct.Struct("<8Id")
+INDEX_ENTRY = struct.Struct("<I")
+MAX_HEAP_SIZE = 2 ** 32 - 1  # String offsets are 32-bit
+IMDB_FIND = "https://www.imdb.com/find?q="
+
+
+class Snapshot:
+    """
+    Read-only view of a binary snapshot file, mapped into memory with mmap.
+
+    The file starts with a fixed header, followed by a string heap, a table of
+    fixed-size records (one per movie, in collection order) and a title index:
+    record numbers sorted by lowercase title, searched with a binary search.
+    Opening a snapshot only reads the header; records are decoded when touched.
+    """
+
+    def __init__(self, file_path):
+        """
+        Map a snapshot file into memory.
+
+        Args:
+            file_path (str): Path to the snapshot file
+
+        Raises:
+            ValueError: If the file is not a snapshot of a supported version
+        """
+        with open(file_path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"'{file_path}' is not a movie snapshot file.")
+        magic, version, _, self.count, self._heap, self._records, self._index = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"'{file_path}' is not a movie snapshot file.")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"'{file_path}' uses snapshot format {version}, expected {FORMAT_VERSION}.")
+        self._years = {}  # Heap offset -> decoded year; every distinct year is stored once
+
+    def _string(self, offset, length):
+        """
+        Decode one string from the heap.
+        """
+        start = self._heap + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def _sorted(self, position):
+        """
+        Return the record number at a position of the title index.
+        """
+        return INDEX_ENTRY.unpack_from(self._map, self._index + position * INDEX_ENTRY.size)[0]
+
+    def title(self, number):
+        """
+        Return the title of a record.
+
+        Args:
+            number (int): Record number, in collection order
+
+        Returns:
+            str: The title
+        """
+        offset, length = struct.unpack_from("<2I", self._map, self._records + number * RECORD.size)
+        return self._string(offset, length)
+
+    def details(self, number):
+        """
+        Decode the details of a record.
+
+        Args:
+            number (int): Record number, in collection order
+
+        Returns:
+            dict: The movie's year, rating, poster and link
+        """
+        fields = RECORD.unpack_from(self._map, self._records + number * RECORD.size)
+        return self._decode(fields, self._string(fields[0], fields[1]))
+
+    def _decode(self, fields, title):
+        """
+        Build the details of a movie from the fields of its record.
+        """
+        _, _, year_offset, year_length, poster_offset, poster_length, link_offset, link_length, rating = fields
+        year = self._years.get(year_offset)
+        if year is None:
+            year = self._years[year_offset] = self._string(year_offset, year_length)
+        return {
+            "year": year,
+            "rating": None if math.isnan(rating) else rating,
+            "poster": self._string(poster_offset, poster_length),
+            "link": self._string(link_offset, link_length) if link_length else _default_link(title)
+        }
+
+    def items(self):
+        """
+        Decode all records in collection order, reading the record table in one pass.
+
+        Yields:
+            tuple: (title, details) pairs
+        """
+        table = memoryview(self._map)[self._records:self._records + self.count * RECORD.size]
+        try:
+            for fields in RECORD.iter_unpack(table):
+                title = self._string(fields[0], fields[1])
+                yield title, self._decode(fields, title)
+        finally:
+            table.release()
+
+    def find(self, title, ignore_case=False):
+        """
+        Binary search the title index.
+
+        Args:
+            title (str): The title to look up
+            ignore_case (bool): Also match other spellings of the title
+
+        Returns:
+            int: Record number of the title (an exact match wins over other
+                spellings), or None if it is not stored
+        """
+        lowered = title.lower()
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.title(self._sorted(middle)).lower() < lowered:
+                low = middle + 1
+            else:
+                high = middle
+        match = None
+        while low < self.count:
+            number = self._sorted(low)
+            stored = self.title(number)
+            if stored.lower() != lowered:
+                break
+            if stored == title:
+                return number
+            if ignore_case and (match is None or number < match):
+                match = number
+            low += 1
+        return match
+
+    def close(self):
+        """Unmap the file."""
+        self._map.close()
+
+
+def _default_link(title):
+    """
+    Return the default IMDb search link of a title.
+
+    Plain titles skip quote_plus, which otherwise dominates the cost of reading
+    and writing large snapshots.
+    """
+    if title.isascii() and title.replace(" ", "").isalnum():  # quote_plus only turns spaces into "+"
+        return IMDB_FIND + title.replace(" ", "+")
+    return default_link(title)
+
+
+def write_snapshot(file_path, movies):
+    """
+    Write movies to a binary snapshot file.
+
+    The file is written next to the target and atomically swapped in, so open
+    snapshots of the old file stay readable until they are closed.
+
+    Args:
+        file_path (str): Path to the snapshot file
+        movies (dict): Dictionary of movie information
+
+    Returns:
+        int: Number of movies written
+    """
+    tmp_path = file_path + ".tmp"
+    records = bytearray()
+    sort_keys = []
+    years = {}  # Years repeat a lot, so each distinct year is stored once
+    heap_size = 0
+
+    try:
+        with open(tmp_path, "wb") as file:
+            file.write(b"\0" * HEADER.size)
+            for title, details in movies.items():
+                year = "" if details.get("year") is None else str(details["year"])
+                link = details.get("link")
+                title_data = title.encode("utf-8")
+                poster_data = (details.get("poster") or "").encode("utf-8")
+                link_data = link.encode("utf-8") if link and link != _default_link(title) else b""
+                data = title_data + poster_data + link_data
+                if year not in years:
+                    years[year] = (heap_size + len(data), len(year.encode("utf-8")))
+                    data += year.encode("utf-8")
+                if heap_size + len(data) > MAX_HEAP_SIZE:
+                    raise ValueError("Collection is too large for a snapshot file (4 GiB of text).")
+
+                rating = details.get("rating")
+                poster_offset = heap_size + len(title_data)
+                link_offset = poster_offset + len(poster_data)
+                records += RECORD.pack(heap_size, len(title_data), *years[year],
+                                       poster_offset, len(poster_data),
+                                       link_offset if link_data else 0, len(link_data),
+                                       math.nan if rating is None else float(rating))
+                file.write(data)
+                heap_size += len(data)
+                sort_keys.append(title.lower())
+
+            count = len(sort_keys)
+            records_offset = HEADER.size + heap_size
+            file.write(records)
+            del records
+            index_offset = records_offset + count * RECORD.size
+            file.write(b"".join(map(INDEX_ENTRY.pack, sorted(range(count), key=sort_keys.__getitem__))))
+
+            file.seek(0)
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, count, HEADER.size, records_offset, index_offset))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+class SnapshotMovies(MutableMapping):
+    """
+    Movie collection backed by a Snapshot, decoding movies only when they are read.
+
+    Changes are kept in memory on top of the snapshot until the storage writes a
+    new one. A movie that is read is kept too, so changing its details in place
+    (`movies[title]["rating"] = 8.0`) works like with a dict.
+    """
+
+    def __init__(self, snapshot):
+        """
+        Args:
+            snapshot (Snapshot): The snapshot to read from, None for an empty collection
+        """
+        self._snapshot = snapshot
+        self._touched = {}   # title -> details read from or written over the snapshot
+        self._added = {}     # title -> details of movies not in the snapshot
+        self._deleted = set()
+
+    def _number(self, title):
+        """
+        Return the record number of a title in the snapshot, None if it is not there.
+        """
+        return self._snapshot.find(title) if self._snapshot is not None else None
+
+    def find_title(self, title):
+        """
+        Return the stored spelling of a title, ignoring case, without scanning the collection.
+
+        Args:
+            title (str): The title to look up
+
+        Returns:
+            str: The stored title, or None if there is no such movie
+        """
+        if title in self:
+            return title
+        if self._snapshot is not None:
+            number = self._snapshot.find(title, ignore_case=True)
+            if number is not None and self._snapshot.title(number) not in self._deleted:
+                return self._snapshot.title(number)
+        lowered = title.lower()
+        return next((key for key in self._added if key.lower() == lowered), None)
+
+    def __getitem__(self, title):
+        if title in self._added:
+            return self._added[title]
+        if title in self._touched:
+            return self._touched[title]
+        number = self._number(title)
+        if number is None or title in self._deleted:
+            raise KeyError(title)
+        details = self._touched[title] = self._snapshot.details(number)
+        return details
+
+    def __setitem__(self, title, details):
+        if title in self._added or self._number(title) is None:
+            self._added[title] = details
+        else:
+            self._touched[title] = details
+            self._deleted.discard(title)
+
+    def __delitem__(self, title):
+        if title in self._added:
+            del self._added[title]
+            return
+        if title in self._deleted or self._number(title) is None:
+            raise KeyError(title)
+        self._touched.pop(title, None)
+        self._deleted.add(title)
+
+    def __contains__(self, title):
+        if title in self._added:
+            return True
+        return title not in self._deleted and self._number(title) is not None
+
+    def __iter__(self):
+        if self._snapshot is not None:
+            for number in range(self._snapshot.count):
+                title = self._snapshot.title(number)
+                if title not in self._deleted:
+                    yield title
+        yield from self._added
+
+    def items(self):
+        """Iterate over (title, details) pairs, decoding each movie once."""
+        if self._snapshot is None:
+            return iter(self._added.items())
+        return self._iter_items()
+
+    def values(self):
+        """Iterate over the details of every movie, decoding each movie once."""
+        return (details for _, details in self.items())
+
+    def _iter_items(self):
+        """
+        Yield (title, details) pairs without keeping the decoded movies.
+        """
+        for title, details in self._snapshot.items():
+            if title in self._deleted:
+                continue
+            yield title, self._touched.get(title, details)
+        yield from self._added.items()
+
+    def __len__(self):
+        stored = self._snapshot.count if self._snapshot is not None else 0
+        return stored - len(self._deleted) + len(self._added)
+
+    def __repr__(self):
+        return f"SnapshotMovies({len(self)} movies)"
+
+
+class StorageMmap(IStorage):
+    """
+    Storage class using a memory-mapped binary snapshot file.
+
+    Opening the collection maps the file instead of parsing it, so startup time
+    does not depend on the number of movies; movies are decoded when they are read
+    and titles are found with a binary search. Every change writes a new snapshot.
+    """
+
+    def __init__(self, file_path):
+        """
+        Initialize the snapshot storage.
+
+        Args:
+            file_path (str): Path to the snapshot file, e.g. "movies.mbin"
+        """
+        self.file_path = file_path
+        self._snapshot = None
+        self._signature = None
+
+    def _file_signature(self):
+        """
+        Return the (mtime, size) pair of the snapshot file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _open_snapshot(self):
+        """
+        Return the mapped snapshot, remapping it if the file was replaced.
+
+        Returns:
+            Snapshot: The current snapshot, None if the file does not exist yet
+        """
+        signature = self._file_signature()
+        if signature != self._signature or (signature and self._snapshot is None):
+            self._snapshot = Snapshot(self.file_path) if signature else None
+            self._signature = signature
+        return self._snapshot
+
+    @staticmethod
+    def _find_title(movies, title):
+        """
+        Return the key under which a title is stored, ignoring case.
+
+        Uses the snapshot's title index instead of scanning the collection.
+        """
+        if isinstance(movies, SnapshotMovies):
+            return movies.find_title(title)
+        return IStorage._find_title(movies, title)
+
+    def _load_movies(self):
+        """
+        Map the snapshot file; movies are decoded when they are read.
+
+        Returns:
+            SnapshotMovies: The movie collection
+        """
+        return SnapshotMovies(self._open_snapshot())
+
+    def _save_movies(self, movies):
+        """
+        Write the collection to a new snapshot file and map it.
+
+        Args:
+            movies (dict): Dictionary of movie information to save
+        """
+        write_snapshot(self.file_path, movies)
+        self._snapshot = Snapshot(self.file_path)
+        self._signature = self._file_signature()
+
+    def iter_movies(self, where=None):
+        """
+        Iterate over the movies, decoding one record at a time.
+
+        Args:
+            where (callable, optional): Only yield movies for which
+                where(title, details) is true
+
+        Yields:
+            tuple: (title, details) pairs in collection order
+        """
+        for title, details in self.list_movies().items():
+            if where is None or where(title, details):
+                yield title, details
+
+    def import_file(self, file_path):
+        """
+        Replace the collection with the movies of a JSON or CSV file.
+
+        Args:
+            file_path (str): Path to a movies.json or movies.csv file
+
+        Returns:
+            int: Number of movies in the new snapshot
+        """
+        source = self._file_storage(file_path)
+        movies = source.list_movies()
+        self._save_movies(movies)
+        self._notify("reset", self._load_movies())
+        return len(movies)
+
+    def export_file(self, file_path):
+        """
+        Write the collection to a JSON or CSV file.
+
+        Args:
+            file_path (str): Path of the movies.json or movies.csv file to write
+
+        Returns:
+            int: Number of movies exported
+        """
+        movies = self._load_movies()
+        self._file_storage(file_path)._save_movies(movies)
+        return len(movies)
+
+    @staticmethod
+    def _file_storage(file_path):
+        """
+        Return the JSON or CSV storage for a file, chosen by its extension.
+        """
+        file_extension = os.path.splitext(file_path)[-1].lower()
+        if file_extension == ".json":
+            from .storage_json import StorageJson
+            return StorageJson(file_path)
+        if file_extension == ".csv":
+            from .storage_csv import StorageCsv
+            return StorageCsv(file_path)
+        raise ValueError(f"Cannot convert '{file_path}': use a JSON or CSV file.")
+
+    def close(self):
+        """
+        Drop the reference to the mapped snapshot.
+
+        Collections returned by list_movies() keep their own reference, so the file
+        is unmapped once the last of them is gone.
+        """
+        self._snapshot = None
+        self._signature = None
+
@@ -0,0 +1,276 @@
+import os
+import sqlite3
+from contextlib import contextmanager, nullcontext
+from urllib.parse import quote_plus
+from .istorage import IStorage
+
+
+class StorageSqlite(IStorage):
+    """
+    Storage class using an SQLite database.
+
+    Movies live in one table with indexes on the lowercase title, the year and the
+    rating, so lookups by title are single indexed queries instead of scans over
+    the whole collection.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS movies (
+            title TEXT PRIMARY KEY,
+            title_lower TEXT NOT NULL,
+            year TEXT,
+            rating REAL,
+            poster TEXT,
+            link TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_movies_title_lower ON movies (title_lower);
+        CREATE INDEX IF NOT EXISTS idx_movies_year ON movies (year);
+        CREATE INDEX IF NOT EXISTS idx_movies_rating ON movies (rating);
+    """
+
+    def __init__(self, file_path):
+        """
+        Initialize the SQLite storage, creating the database if needed.
+
+        Args:
+            file_path (str): Path to the database file, e.g. "movies.db"
+        """
+        self.file_path = file_path
+        # Not tied to the creating thread: the API server runs storage calls on a worker
+        # thread; callers must not use one storage from several threads at once
+        self._conn = sqlite3.connect(file_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        self._in_transaction = False
+
+    def _write(self):
+        """
+        Return the context a write runs in: its own transaction, or the batch's.
+
+        Returns:
+            contextmanager: Commits on success and rolls back on error outside a batch
+        """
+        return nullcontext() if self._in_transaction else self._conn
+
+    @contextmanager
+    def batch(self):
+        """
+        Apply many changes in one database transaction.
+
+        Changes are visible to reads inside the block and committed together when
+        it ends; if it raises, the transaction is rolled back and listeners are
+        reset to the stored collection.
+
+        Yields:
+            StorageSqlite: This storage
+        """
+        if self._in_transaction:
+            yield self
+            return
+        self._in_transaction = True
+        try:
+            with self._conn:
+                yield self
+        except BaseException:
+            self._in_transaction = False
+            self._rollback_batch()
+            raise
+        finally:
+            self._in_transaction = False
+
+    @staticmethod
+    def _row(title, details):
+        """
+        Convert a movie to a database row.
+
+        Args:
+            title (str): The title of the movie
+            details (dict): The movie's year, rating, poster and optional link
+
+        Returns:
+            tuple: Values for the movies table
+        """
+        return (
+            title,
+            title.lower(),
+            details.get("year"),
+            details.get("rating"),
+            details.get("poster"),
+            details.get("link") or f"https://www.imdb.com/find?q={quote_plus(title)}"
+        )
+
+    @staticmethod
+    def _details(year, rating, poster, link):
+        """
+        Convert database columns to the details of a movie.
+
+        Returns:
+            dict: The movie's year, rating, poster and link
+        """
+        return {"year": year, "rating": rating, "poster": poster, "link": link}
+
+    def iter_movies(self, where=None):
+        """
+        Stream movies from the database without materialising the whole collection.
+
+        Args:
+            where (callable, optional): Only yield movies for which
+                where(title, details) is true
+
+        Yields:
+            tuple: (title, details) pairs in insertion order
+        """
+        cursor = self._conn.execute("SELECT title, year, rating, poster, link FROM movies ORDER BY rowid")
+        for title, year, rating, poster, link in cursor:
+            details = self._details(year, rating, poster, link)
+            if where is None or where(title, details):
+                yield title, details
+
+    def _load_movies(self):
+        """
+        Load all movies from the database.
+
+        Returns:
+            dict: Dictionary of movie information
+        """
+        return dict(self.iter_movies())
+
+    def _save_movies(self, movies):
+        """
+        Replace the contents of the database with the given movies.
+
+        Args:
+            movies (dict): Dictionary of movie information to save
+        """
+        with self._write():
+            self._conn.execute("DELETE FROM movies")
+            self._conn.executemany(
+                "INSERT INTO movies VALUES (?, ?, ?, ?, ?, ?)",
+                (self._row(title, details) for title, details in movies.items())
+            )
+
+    def _find_movie(self, title):
+        """
+        Look up a movie by title, ignoring case. An exact match wins over
+        titles that only differ in case; among those the first one added is used.
+
+        Args:
+            title (str): The title to look up
+
+        Returns:
+            tuple: (title as stored, details), or (None, None) if there is no such movie
+        """
+        row = self._conn.execute(
+            "SELECT title, year, rating, poster, link FROM movies WHERE title_lower = ? "
+            "ORDER BY title = ? DESC, rowid LIMIT 1",
+            (title.lower(), title)
+        ).fetchone()
+        if row is None:
+            return None, None
+        return row[0], self._details(*row[1:])
+
+    def add_movie(self, title, year, rating, poster, link=None):
+        """
+        Adds a movie to the database.
+
+        Args:
+            title (str): The title of the movie
+            year (str): The release year of the movie
+            rating (float): The rating of the movie (1-10)
+            poster (str): URL to the movie poster image
+            link (str, optional): The movie's IMDb page, an IMDb search for the title by default
+
+        Returns:
+            bool: True if movie was added successfully, False otherwise
+        """
+        row = self._row(title, {"year": year, "rating": rating, "poster": poster, "link": link})
+        with self._write():
+            cursor = self._conn.execute("INSERT OR IGNORE INTO movies VALUES (?, ?, ?, ?, ?, ?)", row)
+        if cursor.rowcount != 1:
+            return False
+        self._notify("movie_added", title, self._details(*row[2:]))
+        return True
+
+    def delete_movie(self, title):
+        """
+        Deletes a movie from the database.
+
+        Args:
+            title (str): The title of the movie to delete
+
+        Returns:
+            bool: True if movie was deleted successfully, False otherwise
+        """
+        actual_title, details = self._find_movie(title)
+        if actual_title is None:
+            return False
+        with self._write():
+            self._conn.execute("DELETE FROM movies WHERE title = ?", (actual_title,))
+        self._notify("movie_deleted", actual_title, details)
+        return True
+
+    def update_movie(self, title, rating):
+        """
+        Updates a movie's rating in the database.
+
+        Args:
+            title (str): The title of the movie
+            rating (float): The new rating for the movie
+
+        Returns:
+            bool: True if movie was updated successfully, False otherwise
+        """
+        actual_title, old_details = self._find_movie(title)
+        if actual_title is None:
+            return False
+        with self._write():
+            self._conn.execute("UPDATE movies SET rating = ? WHERE title = ?", (rating, actual_title))
+        self._notify("movie_updated", actual_title, old_details, dict(old_details, rating=rating))
+        return True
+
+    def import_movies(self, movies):
+        """
+        Bulk insert movies in a single transaction, skipping titles already stored.
+
+        Args:
+            movies (dict): Dictionary of movie information to import
+
+        Returns:
+            int: Number of movies imported
+        """
+        with self._write():
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO movies VALUES (?, ?, ?, ?, ?, ?)",
+                (self._row(title, details) for title, details in movies.items())
+            )
+            imported = self._conn.total_changes - before
+        if imported and self.__dict__.get("_listeners"):
+            self._notify("reset", self._load_movies())
+        return imported
+
+    def import_file(self, file_path):
+        """
+        Bulk import an existing JSON or CSV movie file.
+
+        Args:
+            file_path (str): Path to a movies.json or movies.csv file
+
+        Returns:
+            int: Number of movies imported
+        """
+        file_extension = os.path.splitext(file_path)[-1].lower()
+        if file_extension == ".json":
+            from .storage_json import StorageJson
+            source = StorageJson(file_path)
+        elif file_extension == ".csv":
+            from .storage_csv import StorageCsv
+            source = StorageCsv(file_path)
+        else:
+            raise ValueError(f"Cannot import '{file_path}': use a JSON or CSV file.")
+        return self.import_movies(source.list_movies())
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self._conn.close()
@@ -0,0 +1,33 @@
+import pytest
+from storage import StorageCached, StorageCsv, StorageJournal, StorageJson, StorageMmap, StorageSqlite
+
+# name -> (file name, factory)
+BACKENDS = {
+    "json": ("movies.json", StorageJson),
+    "csv": ("movies.csv", StorageCsv),
+    "journal": ("movies.mlog", StorageJournal),
+    "sqlite": ("movies.db", StorageSqlite),
+    "mmap": ("movies.mbin", StorageMmap),
+    "cached": ("movies.json", lambda path: StorageCached(StorageJson(path)))
+}
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def open_storage(request, tmp_path):
+    """
+    Return a function opening the test collection with one backend; every call
+    opens a new instance on the same file, like a second process would.
+    """
+    file_name, factory = BACKENDS[request.param]
+    path = str(tmp_path / file_name)
+    opened = []
+
+    def open_storage():
+        storage = factory(path)
+        opened.append(storage)
+        return storage
+
+    open_storage.backend = request.param
+    yield open_storage
+    for storage in opened:
+        storage.close()
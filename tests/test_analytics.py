@@ -0,0 +1,59 @@
+import pytest
+from indexes import RatingAnalytics, StatsEngine
+from indexes.analytics import HAS_NUMPY
+
+MOVIES = {
+    "Heat": {"year": "1995", "rating": 8.3},
+    "Alien": {"year": "1979", "rating": 8.5},
+    "Up": {"year": "2009", "rating": 8.3},
+    "Cats": {"year": "2019", "rating": 2.8},
+    "Unrated": {"year": "N/A", "rating": None},
+    "Aliens": {"year": "1986", "rating": 8.5},
+    "Jaws": {"year": "1975", "rating": 10.0},
+    "Taxi": {"year": "2004", "rating": 8.3},
+}
+
+
+def analytics(use_numpy):
+    engine = RatingAnalytics(use_numpy=use_numpy)
+    engine.reset(MOVIES)
+    return engine
+
+
+def test_pure_python_matches_the_stats_engine():
+    engine, stats = analytics(False), StatsEngine()
+    stats.reset(MOVIES)
+
+    for key in ("count", "average", "median", "best", "worst"):
+        assert engine.summary()[key] == pytest.approx(getattr(stats, key))
+    assert [engine.title(position) for position in engine.ranking()] == \
+        ["Jaws", "Alien", "Aliens", "Heat", "Up", "Taxi", "Cats", "Unrated"]
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="NumPy is not installed")
+def test_numpy_matches_pure_python():
+    vectorised, plain = analytics(True), analytics(False)
+
+    assert vectorised.summary() == pytest.approx(plain.summary())
+    assert vectorised.histogram() == pytest.approx(plain.histogram())
+    assert vectorised.histogram(bins=4, low=2.0, high=10.0) == pytest.approx(plain.histogram(bins=4, low=2.0, high=10.0))
+    decades = plain.decades()
+    assert list(vectorised.decades()) == list(decades)
+    for decade, aggregate in vectorised.decades().items():
+        assert aggregate == pytest.approx(decades[decade])
+    assert vectorised.ranking() == plain.ranking()
+    assert vectorised.ranking(3) == plain.ranking(3)
+
+
+@pytest.mark.skipif(HAS_NUMPY, reason="NumPy is installed")
+def test_numpy_cannot_be_forced_without_it():
+    with pytest.raises(ValueError):
+        RatingAnalytics(use_numpy=True)
+
+
+def test_empty_collection():
+    engine = analytics(False)
+    engine.reset({})
+
+    assert engine.summary()["average"] is None
+    assert engine.ranking() == []
@@ -0,0 +1,96 @@
+import http.client
+import json
+import socket
+from urllib.parse import urlsplit
+import pytest
+from api.server import start_api_server
+from storage import StorageJson, StorageSqlite
+
+
+@pytest.fixture(params=[("movies.json", StorageJson), ("movies.db", StorageSqlite)], ids=["json", "sqlite"])
+def api(request, tmp_path):
+    """Start the API on a free port over a collection of 25 movies; yields (host, port)."""
+    file_name, storage_class = request.param
+    storage = storage_class(str(tmp_path / file_name))  # Opened here, used from the server's worker thread
+    with storage.batch():
+        for number in range(1, 26):
+            storage.add_movie(f"Movie {number}", str(1990 + number % 3), float(number % 10 + 1), "")
+    server, url = start_api_server(storage)
+    parts = urlsplit(url)
+    yield parts.hostname, parts.port
+    server.shutdown()
+    storage.close()
+
+
+def call(api, method, path, body=None, headers=None):
+    """Send one request and return (status, headers, parsed JSON body or None)."""
+    connection = http.client.HTTPConnection(*api, timeout=5)
+    try:
+        connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers or {})
+        response = connection.getresponse()
+        data = response.read()
+        return response.status, dict(response.getheaders()), json.loads(data) if data else None
+    finally:
+        connection.close()
+
+
+def send_raw(api, data):
+    """Send raw bytes and return the status code of the response."""
+    with socket.create_connection(api, timeout=5) as sock:
+        sock.sendall(data)
+        return int(sock.makefile("rb").readline().split()[1])
+
+
+def test_pages(api):
+    status, _, page = call(api, "GET", "/movies?page=3&size=10")
+    assert status == 200
+    assert (page["page"], page["total"], page["pages"]) == (3, 25, 3)
+    assert [movie["title"] for movie in page["movies"]] == [f"Movie {number}" for number in range(21, 26)]
+
+    _, _, page = call(api, "GET", "/movies?page=1&size=3&by=rating")
+    assert [movie["rating"] for movie in page["movies"]] == [10.0, 10.0, 9.0]
+    assert call(api, "GET", "/movies?page=1&by=title")[0] == 400
+
+    _, _, listing = call(api, "GET", "/movies")
+    assert listing["count"] == 25
+    assert len(listing["movies"]) == 25
+
+
+def test_crud(api):
+    status, headers, movie = call(api, "POST", "/movies", {"title": "Heat", "year": "1995", "rating": 8.3})
+    assert status == 201
+    assert headers["Location"] == "/movies/Heat"
+    assert movie["link"] == "https://www.imdb.com/find?q=Heat"
+    assert call(api, "POST", "/movies", {"title": "Heat", "rating": 5})[0] == 409
+    assert call(api, "POST", "/movies", {"title": "Up", "rating": 11})[0] == 400
+
+    status, _, movie = call(api, "PUT", "/movies/heat", {"rating": 9})
+    assert (status, movie["title"], movie["rating"]) == (200, "Heat", 9.0)
+    assert call(api, "GET", "/movies/HEAT")[2]["rating"] == 9.0
+    assert call(api, "GET", "/search?q=hea")[2]["movies"][0]["title"] == "Heat"
+
+    assert call(api, "DELETE", "/movies/Heat")[0] == 204
+    assert call(api, "GET", "/movies/Heat")[0] == 404
+    assert call(api, "DELETE", "/movies/Heat")[0] == 404
+    assert call(api, "GET", "/stats")[2]["count"] == 25
+
+
+def test_etag_revalidation(api):
+    status, headers, _ = call(api, "GET", "/stats")
+    etag = headers["ETag"]
+    assert call(api, "GET", "/stats", headers={"If-None-Match": etag})[0] == 304
+
+    assert call(api, "PUT", "/movies/Movie%201", {"rating": 5}, headers={"If-Match": '"stale"'})[0] == 412
+    status, headers, _ = call(api, "PUT", "/movies/Movie%201", {"rating": 5}, headers={"If-Match": etag})
+    assert status == 200
+    assert headers["ETag"] != etag
+    assert call(api, "GET", "/stats", headers={"If-None-Match": etag})[0] == 200
+
+
+def test_malformed_requests(api):
+    assert send_raw(api, b"GET /stats HTTP/1.1\r\nX-Long: " + b"a" * 100_000 + b"\r\n\r\n") == 431
+    assert send_raw(api, b"GET /" + b"a" * 100_000 + b" HTTP/1.1\r\n\r\n") == 431
+    assert send_raw(api, b"POST /movies HTTP/1.1\r\nContent-Length: -5\r\n\r\n") == 400
+    assert send_raw(api, b"POST /movies HTTP/1.1\r\nContent-Length: many\r\n\r\n") == 400
+    assert send_raw(api, b"NONSENSE\r\n\r\n") == 400
+    assert call(api, "GET", "/stats")[0] == 200  # The server is still answering
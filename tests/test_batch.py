@@ -0,0 +1,77 @@
+import pytest
+from bulk_import import BulkImporter, parse_titles
+from indexes import StatsEngine
+from omdb.client import ClientMetrics
+from storage import StorageJson
+
+
+def test_batch_saves_once_and_rolls_back(open_storage):
+    storage = open_storage()
+    with storage.batch():
+        for number in range(5):
+            storage.add_movie(f"Movie {number}", "2000", float(number + 1), "")
+        storage.delete_movie("Movie 0")
+        storage.update_movie("movie 1", 9.5)
+        assert len(storage.list_movies()) == 4
+        assert open_storage().list_movies() == {}  # Nothing is written before the block ends
+    movies = open_storage().list_movies()
+    assert sorted(movies) == ["Movie 1", "Movie 2", "Movie 3", "Movie 4"]
+    assert movies["Movie 1"]["rating"] == 9.5
+
+    with pytest.raises(RuntimeError):
+        with storage.batch():
+            storage.delete_movie("Movie 2")
+            raise RuntimeError("stop")
+    assert "Movie 2" in open_storage().list_movies()
+    assert "Movie 2" in storage.list_movies()
+
+
+def test_failed_batch_resets_listeners(open_storage):
+    storage = open_storage()
+    with storage.batch():
+        for number in range(1, 6):
+            storage.add_movie(f"Movie {number}", "2000", float(number), "")
+    stats = StatsEngine()
+    storage.add_listener(stats)
+
+    with pytest.raises(RuntimeError):
+        with storage.batch():
+            storage.delete_movie("Movie 5")
+            raise RuntimeError("stop")
+
+    assert stats.count == 5
+    assert stats.best == ("Movie 5", 5.0)
+
+
+class FakeClient:
+    """Answers lookups from a dict of titles instead of OMDb."""
+
+    def __init__(self, movies):
+        self.movies = movies
+        self.metrics = ClientMetrics()
+
+    def lookup(self, title, year=None):
+        if title == "Broken":
+            raise ValueError("bad answer")
+        if title not in self.movies:
+            return {"Response": "False", "Error": "Movie not found!"}, False
+        year, rating = self.movies[title]
+        return {"Response": "True", "Title": title, "Year": year, "imdbRating": rating, "Poster": "N/A",
+                "imdbID": "tt0113277"}, True
+
+
+def test_bulk_import_saves_once(tmp_path, monkeypatch):
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    storage.add_movie("Alien", "1979", 8.5, "")
+    saves = []
+    save = storage._save_movies
+    monkeypatch.setattr(storage, "_save_movies", lambda movies: saves.append(len(movies)) or save(movies))
+    client = FakeClient({"Heat": ("1995", "8.3"), "Alien": ("1979", "8.5")})
+
+    entries = parse_titles(["Heat (1995)", "Alien\t1979", "# comment", "", "Nowhere", "Broken"])
+    report = BulkImporter(storage, client, workers=4).run(entries)
+
+    assert (report["total"], report["imported"], report["duplicates"], report["not_found"]) == (4, 1, 1, 1)
+    assert [failure[0] for failure in report["failures"]] == ["Broken"]
+    assert saves == [2]
+    assert StorageJson(storage.file_path).list_movies()["Heat"]["rating"] == 8.3
@@ -0,0 +1,76 @@
+import atexit
+import pytest
+from storage import StorageCached, StorageConflictError, StorageCsv, StorageJson
+
+
+@pytest.fixture(params=[("movies.json", StorageJson), ("movies.csv", StorageCsv)], ids=["json", "csv"])
+def storage_file(request, tmp_path):
+    """Return (path, storage class) of a collection holding Heat and Alien."""
+    file_name, storage_class = request.param
+    path = str(tmp_path / file_name)
+    storage = storage_class(path)
+    storage.add_movie("Heat", "1995", 8.3, "")
+    storage.add_movie("Alien", "1979", 8.5, "")
+    return path, storage_class
+
+
+def test_write_through(storage_file):
+    path, storage_class = storage_file
+    cached = StorageCached(storage_class(path))
+    cached.add_movie("Up", "2009", 8.3, "")
+    cached.update_movie("heat", 9.0)
+
+    movies = storage_class(path).list_movies()
+    assert sorted(movies) == ["Alien", "Heat", "Up"]
+    assert movies["Heat"]["rating"] == 9.0
+    assert cached.pending_changes == 0
+
+
+def test_reloads_outside_changes(storage_file):
+    path, storage_class = storage_file
+    cached = StorageCached(storage_class(path))
+    assert sorted(cached.list_movies()) == ["Alien", "Heat"]
+
+    storage_class(path).delete_movie("Alien")
+    assert list(cached.list_movies()) == ["Heat"]
+
+
+@pytest.mark.parametrize("flush_policy", [StorageCached.FLUSH_BATCH, StorageCached.FLUSH_EXIT])
+def test_pending_changes_are_applied_to_outside_changes(storage_file, flush_policy):
+    path, storage_class = storage_file
+    cached = StorageCached(storage_class(path), flush_policy, flush_every=10)
+    cached.delete_movie("Heat")
+    cached.add_movie("Up", "2009", 8.3, "")
+
+    storage_class(path).add_movie("Blow", "2001", 7.6, "")
+    storage_class(path).update_movie("Alien", 9.0)
+    assert sorted(cached.list_movies()) == ["Alien", "Blow", "Up"]  # Seen before flushing
+    assert cached.pending_changes == 2
+
+    cached.close()
+    movies = storage_class(path).list_movies()
+    assert sorted(movies) == ["Alien", "Blow", "Up"]
+    assert movies["Alien"]["rating"] == 9.0
+
+
+def test_whole_collection_save_conflicts(storage_file):
+    path, storage_class = storage_file
+    cached = StorageCached(storage_class(path), StorageCached.FLUSH_EXIT)
+    movies = cached.list_movies()
+    movies.pop("Heat")
+    cached._store_changes(movies)  # Not a recorded change, so it cannot be applied again
+    storage_class(path).add_movie("Blow", "2001", 7.6, "")
+
+    with pytest.raises(StorageConflictError):
+        cached.flush()
+    assert sorted(storage_class(path).list_movies()) == ["Alien", "Blow", "Heat"]
+    atexit.unregister(cached.flush)  # Do not try again at exit
+
+
+def test_close_unregisters_the_exit_flush(storage_file, monkeypatch):
+    path, storage_class = storage_file
+    unregistered = []
+    monkeypatch.setattr("atexit.unregister", unregistered.append)
+    cached = StorageCached(storage_class(path), StorageCached.FLUSH_EXIT)
+    cached.close()
+    assert unregistered == [cached.flush]
@@ -0,0 +1,105 @@
+import io
+import json
+import os
+from argparse import Namespace
+import pytest
+from cli import EXIT_CONFLICT, EXIT_FAILURES, EXIT_OK, CommandRunner
+from storage import StorageCsv, StorageJournal, StorageJson, StorageSqlite
+
+
+def run(storage, command, lines=(), **options):
+    """Run a CLI command and return its exit status and parsed output records."""
+    output = io.StringIO()
+    status = CommandRunner(storage, output, Namespace(**options)).run(command, lines)
+    return status, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def records(*values):
+    """Return JSON Lines input for the given records."""
+    return [json.dumps(value) + "\n" for value in values]
+
+
+@pytest.mark.parametrize("file_name, storage_class", [
+    ("movies.json", StorageJson), ("movies.mlog", StorageJournal), ("movies.db", StorageSqlite)
+], ids=["json", "journal", "sqlite"])
+def test_add_update_delete(tmp_path, file_name, storage_class):
+    storage = storage_class(str(tmp_path / file_name))
+
+    status, results = run(storage, "add", records(
+        {"title": "Up", "year": "2009", "rating": 8.3, "poster": "p"},
+        {"title": "UP", "year": "2010", "rating": 5, "poster": "q", "link": "https://www.imdb.com/title/tt1"},
+        {"title": "Up", "rating": 1, "poster": ""}
+    ) + ["not json\n"])
+    assert status == EXIT_FAILURES
+    assert [result["status"] for result in results] == ["added", "added", "exists", "invalid"]
+
+    status, results = run(storage, "update", records({"title": "up", "rating": 9}, {"title": "Gone", "rating": 5}))
+    assert [(result["status"], result.get("title")) for result in results] == [("updated", "Up"), ("missing", "Gone")]
+
+    status, results = run(storage, "delete", records("Up"))
+    assert status == EXIT_OK
+    assert results[0] == {"line": 1, "status": "deleted", "ok": True, "title": "Up"}
+
+    storage.close()
+    movies = storage_class(storage.file_path).list_movies()
+    assert list(movies) == ["UP"]
+    assert movies["UP"]["link"] == "https://www.imdb.com/title/tt1"
+
+
+def test_journal_changes_are_appended(tmp_path):
+    path = str(tmp_path / "movies.mlog")
+    journal = StorageJournal(path)
+    run(journal, "add", records({"title": "Heat", "year": "1995", "rating": 8.3, "poster": ""}))
+    run(journal, "update", records({"title": "Heat", "rating": 9}))
+    journal.close()
+
+    with open(path, encoding="utf-8") as file:
+        assert [json.loads(line)["op"] for line in file] == ["add", "update"]
+    assert not os.path.exists(journal.snapshot_path)  # Not compacted for a single change
+
+
+def test_conflict_saves_nothing(tmp_path):
+    path = str(tmp_path / "movies.json")
+    StorageJson(path).add_movie("Heat", "1995", 8.3, "")
+    storage = StorageJson(path)
+
+    def lines():
+        yield from records("Heat")
+        StorageJson(path).add_movie("Alien", "1979", 8.5, "")  # Another process writes meanwhile
+        yield from records("Alien")
+
+    status, results = run(storage, "delete", lines())
+
+    assert status == EXIT_CONFLICT
+    assert results[-1]["status"] == "conflict"
+    assert sorted(StorageJson(path).list_movies()) == ["Alien", "Heat"]
+
+
+def test_stats_and_search(tmp_path):
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    storage.add_movie("Heat", "1995", 8.0, "")
+    storage.add_movie("Alien", "1979", 9.0, "")
+
+    _, (summary,) = run(storage, "stats")
+    assert summary["count"] == 2
+    assert summary["average"] == 8.5
+
+    _, results = run(storage, "search", records("alien", "xyz"), limit=None)
+    assert results[0]["status"] == "found"
+    assert results[0]["results"][0]["title"] == "Alien"
+    assert results[1]["status"] == "no_match"
+
+
+def test_list_limit_and_export(tmp_path):
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    for number in range(5):
+        storage.add_movie(f"Movie {number}", "2000", float(number), "")
+
+    status, results = run(storage, "list", limit=2)
+    assert status == EXIT_OK
+    assert [result["title"] for result in results] == ["Movie 0", "Movie 1"]
+
+    output_file = str(tmp_path / "movies.csv")
+    status, _ = run(storage, "export", output_file=output_file)
+    assert status == EXIT_OK
+    assert list(StorageCsv(output_file).list_movies()) == [f"Movie {number}" for number in range(5)]
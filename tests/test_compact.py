@@ -0,0 +1,70 @@
+import json
+import pickle
+import pytest
+from storage import StorageJson
+from storage.compact import CompactMovies, load_json
+
+MOVIES = {
+    "Heat": {"year": "1995", "rating": 8.3, "poster": "https://m.media-amazon.com/images/M/heat.jpg",
+             "link": "https://www.imdb.com/title/tt0113277/"},
+    "Alien": {"year": "1979–", "rating": None, "poster": "N/A", "link": "https://www.imdb.com/find?q=Alien"},
+}
+
+
+def test_compact_json_load_matches_the_plain_one(tmp_path):
+    path = tmp_path / "movies.json"
+    path.write_text(json.dumps({"movies": MOVIES}, indent=4), encoding="utf-8")
+
+    movies = StorageJson(str(path), compact=True).list_movies()
+
+    assert isinstance(movies, CompactMovies)
+    assert {title: dict(details) for title, details in movies.items()} == \
+        StorageJson(str(path)).list_movies()
+
+
+def test_compact_json_round_trip(tmp_path):
+    path = str(tmp_path / "movies.json")
+    storage = StorageJson(path, compact=True)
+    storage.add_movie("Heat", "1995", 8.3, "", link="https://www.imdb.com/title/tt0113277/")
+    storage.update_movie("heat", 9.0)
+
+    assert json.load(open(path, encoding="utf-8"))["movies"]["Heat"]["rating"] == 9.0
+    assert dict(StorageJson(path, compact=True).list_movies()["Heat"])["link"] == \
+        "https://www.imdb.com/title/tt0113277/"
+
+
+@pytest.mark.parametrize("text", [
+    '{"Heat": {"year": "1995", "rating": 8.3}}',
+    ' {"version": 2, "movies": {"Heat": {"year": "1995", "rating": 8.3}}} \n',
+])
+def test_load_json_accepts_both_layouts(text):
+    movies = load_json(text)
+
+    assert list(movies) == ["Heat"]
+    assert movies["Heat"]["rating"] == pytest.approx(8.3)
+
+
+@pytest.mark.parametrize("text", ['{"movies": {"Heat": {}}', '{"Heat" {}}', '{"Heat": {}} x', "[]"])
+def test_load_json_rejects_malformed_documents(text):
+    with pytest.raises(json.JSONDecodeError):
+        load_json(text)
+
+
+def test_urls_ending_in_a_slash_share_their_prefix():
+    movies = CompactMovies({f"Movie {number}": {"year": "2000", "rating": 5.0, "poster": "",
+                                                "link": f"https://www.imdb.com/title/tt{number:07d}/"}
+                            for number in range(70_000)})
+
+    assert movies["Movie 69999"]["link"] == "https://www.imdb.com/title/tt0069999/"
+    assert len(movies._prefixes) == 2
+
+
+def test_compact_records_pickle_without_their_collection():
+    movies = CompactMovies({f"Movie {number}": {"year": "2000", "rating": 5.0, "poster": "", "link": None}
+                            for number in range(10_000)})
+    record = movies["Movie 1"]
+
+    copy = pickle.loads(pickle.dumps(record))
+
+    assert copy == {"year": "2000", "rating": 5.0, "poster": "", "link": "https://www.imdb.com/find?q=Movie+1"}
+    assert len(pickle.dumps(record)) < 1_000
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_modules(statement):
+    """Run a statement in a fresh interpreter and return the names of the modules it loaded."""
+    code = f"import sys\n{statement}\nprint('\\n'.join(sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return set(output.split())
+
+
+@pytest.mark.parametrize("statement, lazy", [
+    ("import storage.storage_sqlite", {"storage.storage_json", "storage.storage_csv", "omdb"}),
+    ("import storage.storage_mmap", {"storage.storage_json", "storage.storage_csv", "omdb"}),
+    ("import storage.storage_json", {"omdb", "requests"}),
+    ("import cli", {"omdb", "requests", "indexes", "website", "sqlite3"}),
+    ("import main", {"cli", "omdb", "indexes", "movie_app", "sqlite3"}),
+])
+def test_modules_are_imported_on_first_use(statement, lazy):
+    assert not lazy & loaded_modules(statement)
@@ -0,0 +1,101 @@
+import pytest
+from storage import StorageCached, StorageJournal
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "movies.mlog")
+    journal = StorageJournal(path)
+    assert journal.add_movie("Heat", "1995", 8.3, "https://example.com/heat.jpg")
+    assert journal.add_movie("Alien", "1979", 8.5, "", link="https://www.imdb.com/title/tt0078748")
+    assert not journal.add_movie("Heat", "1995", 1.0, "")
+    assert journal.update_movie("heat", 9.0)
+    assert journal.delete_movie("ALIEN")
+    assert not journal.delete_movie("Alien")
+    journal.close()
+
+    with open(path, encoding="utf-8") as file:
+        assert len(file.readlines()) == 4  # One appended record per change
+
+    assert StorageJournal(path).list_movies() == {
+        "Heat": {"year": "1995", "rating": 9.0, "poster": "https://example.com/heat.jpg",
+                 "link": "https://www.imdb.com/find?q=Heat"}
+    }
+
+
+def test_compaction_keeps_the_collection(tmp_path):
+    path = str(tmp_path / "movies.mlog")
+    journal = StorageJournal(path, compact_threshold=3)
+    for number in range(5):
+        journal.add_movie(f"Movie {number}", "2000", 5.0, "")
+    journal.close()
+
+    with open(path, encoding="utf-8") as file:
+        assert len(file.readlines()) == 2  # Compacted after the third record
+    assert sorted(StorageJournal(path).list_movies()) == [f"Movie {number}" for number in range(5)]
+
+
+def test_titles_differing_in_case(tmp_path):
+    path = str(tmp_path / "movies.mlog")
+    journal = StorageJournal(path)
+    journal.add_movie("Up", "2009", 8.3, "")
+    journal.add_movie("UP", "2010", 5.0, "")
+    assert journal.update_movie("UP", 6.0)
+    assert journal.delete_movie("Up")
+    assert list(journal.list_movies()) == ["UP"]
+    journal.close()
+
+    replayed = StorageJournal(path)
+    assert replayed.list_movies()["UP"]["rating"] == 6.0
+    replayed.add_movie("Up", "2009", 8.3, "")
+    assert replayed.delete_movie("UP")
+    assert replayed.update_movie("up", 7.0)  # Falls back to the remaining spelling
+    assert dict(replayed.list_movies()["Up"])["rating"] == 7.0
+
+
+def test_torn_last_record_is_discarded(tmp_path):
+    path = tmp_path / "movies.mlog"
+    journal = StorageJournal(str(path))
+    journal.add_movie("Heat", "1995", 8.3, "")
+    journal.close()
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"op": "add", "title": "Al')
+
+    assert list(StorageJournal(str(path)).list_movies()) == ["Heat"]
+    assert path.read_text(encoding="utf-8").count("\n") == 1
+
+
+def test_damaged_record_in_the_middle_is_kept(tmp_path):
+    path = tmp_path / "movies.mlog"
+    journal = StorageJournal(str(path))
+    journal.add_movie("Heat", "1995", 8.3, "")
+    journal.add_movie("Alien", "1979", 8.5, "")
+    journal.close()
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    damaged = lines[0][:10] + "\n" + lines[1]
+    path.write_text(damaged, encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        StorageJournal(str(path))
+    assert path.read_text(encoding="utf-8") == damaged
+
+
+def test_collection_is_read_only(tmp_path):
+    journal = StorageJournal(str(tmp_path / "movies.mlog"))
+    journal.add_movie("Heat", "1995", 8.3, "")
+    movies = journal.list_movies()
+
+    with pytest.raises(TypeError):
+        movies["Alien"] = {"year": "1979", "rating": 8.5, "poster": ""}
+    with pytest.raises(TypeError):
+        movies["Heat"]["rating"] = 1.0
+    assert journal.list_movies()["Heat"]["rating"] == 8.3
+
+
+def test_cached_journal(tmp_path):
+    path = str(tmp_path / "movies.mlog")
+    cached = StorageCached(StorageJournal(path))
+    cached.add_movie("Heat", "1995", 8.3, "")
+    cached.update_movie("Heat", 9.0)
+    cached.close()
+
+    assert StorageJournal(path).list_movies()["Heat"]["rating"] == 9.0
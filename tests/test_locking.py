@@ -0,0 +1,58 @@
+import os
+import threading
+import pytest
+from storage import StorageConflictError, StorageCsv, StorageJson
+
+
+@pytest.fixture(params=[("movies.json", StorageJson), ("movies.csv", StorageCsv)], ids=["json", "csv"])
+def storage_file(request, tmp_path):
+    """Return (path, storage class) of a collection holding two movies."""
+    file_name, storage_class = request.param
+    path = str(tmp_path / file_name)
+    storage = storage_class(path)
+    storage.add_movie("Heat", "1995", 8.3, "")
+    storage.add_movie("Alien", "1979", 8.5, "")
+    return path, storage_class
+
+
+def test_batch_conflict_keeps_the_other_change(storage_file):
+    path, storage_class = storage_file
+    mine, theirs = storage_class(path), storage_class(path)
+
+    with pytest.raises(StorageConflictError):
+        with mine.batch():
+            mine.delete_movie("Heat")
+            theirs.delete_movie("Alien")
+
+    assert list(storage_class(path).list_movies()) == ["Heat"]
+
+
+def test_single_changes_reload_between_processes(storage_file):
+    path, storage_class = storage_file
+    first, second = storage_class(path), storage_class(path)
+    first.list_movies()
+    second.add_movie("Up", "2009", 8.3, "")
+    first.update_movie("Heat", 9.0)
+
+    movies = storage_class(path).list_movies()
+    assert sorted(movies) == ["Alien", "Heat", "Up"]
+    assert movies["Heat"]["rating"] == 9.0
+
+
+def test_concurrent_writers_lose_nothing(storage_file):
+    path, storage_class = storage_file
+
+    def add_movies(prefix):
+        storage = storage_class(path)
+        for number in range(20):
+            storage.add_movie(f"{prefix} {number}", "2000", 5.0, "")
+            storage.update_movie("Heat", float(number % 10))
+
+    threads = [threading.Thread(target=add_movies, args=(prefix,)) for prefix in ("First", "Second", "Third")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(storage_class(path).list_movies()) == 62
+    assert not [name for name in os.listdir(os.path.dirname(path)) if name.endswith(".tmp")]
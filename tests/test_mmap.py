@@ -0,0 +1,50 @@
+import pytest
+from storage import StorageCsv, StorageJson, StorageMmap
+from storage.convert import convert_file
+
+
+def make_json(tmp_path):
+    source = StorageJson(str(tmp_path / "movies.json"))
+    source.add_movie("Heat", "1995", 8.3, "https://example.com/heat.jpg")
+    source.add_movie("Alien", "1979", 8.5, "", link="https://www.imdb.com/title/tt0078748/")
+    source.add_movie("Amélie", "N/A", 8.3, "")
+    return source
+
+
+def test_convert_json_to_snapshot_and_back(tmp_path):
+    source = make_json(tmp_path)
+
+    snapshot = StorageMmap(str(tmp_path / "movies.mbin"))
+    assert snapshot.import_file(source.file_path) == 3
+    assert snapshot.list_movies()["Heat"]["poster"] == "https://example.com/heat.jpg"
+    assert snapshot.export_file(str(tmp_path / "copy.json")) == 3
+    snapshot.close()
+
+    assert StorageJson(str(tmp_path / "copy.json")).list_movies() == source.list_movies()
+
+
+def test_convert_through_csv(tmp_path):
+    source = make_json(tmp_path)
+    snapshot, copy = str(tmp_path / "movies.mbin"), str(tmp_path / "movies.csv")
+
+    assert convert_file(source.file_path, snapshot) == 3
+    assert convert_file(snapshot, copy) == 3
+    assert StorageCsv(copy).list_movies()["Amélie"]["year"] == "N/A"
+    with pytest.raises(ValueError):
+        convert_file(source.file_path, copy)
+
+
+def test_changes_are_saved_in_the_snapshot(tmp_path):
+    storage = StorageMmap(str(tmp_path / "movies.mbin"))
+    storage.import_file(make_json(tmp_path).file_path)
+    assert storage.update_movie("heat", 9.0)
+    assert storage.delete_movie("Alien")
+    assert storage.add_movie("Up", "2009", 8.3, "")
+    storage.close()
+
+    reopened = StorageMmap(storage.file_path)
+    movies = reopened.list_movies()
+    assert list(movies) == ["Heat", "Amélie", "Up"]
+    assert movies["Heat"]["rating"] == 9.0
+    assert [title for title, _ in reopened.iter_movies(where=lambda title, details: details["rating"] > 8.5)] == ["Heat"]
+    reopened.close()
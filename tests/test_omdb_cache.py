@@ -0,0 +1,95 @@
+import pytest
+from omdb import OmdbCache
+
+FOUND = {"Response": "True", "Title": "Heat", "Year": "1995", "imdbRating": "8.3"}
+NOT_FOUND = {"Response": "False", "Error": "Movie not found!"}
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def open_cache(tmp_path, clock):
+    """Return a function opening a cache in a temporary database with the fake clock."""
+    caches = []
+
+    def open_cache(**options):
+        cache = OmdbCache(str(tmp_path / "cache.db"), clock=clock, **options)
+        caches.append(cache)
+        return cache
+
+    yield open_cache
+    for cache in caches:
+        cache.close()
+
+
+def test_keys_ignore_case_and_whitespace(open_cache):
+    cache = open_cache()
+    cache.put("Heat", "1995", FOUND)
+    assert cache.get("  heat ", "1995") == FOUND
+    assert cache.get("Heat") is None  # The year is part of the key
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_found_movies_expire_after_the_ttl(open_cache, clock):
+    cache = open_cache(ttl=100)
+    cache.put("Heat", None, FOUND)
+    clock.now += 99
+    assert cache.get("Heat") == FOUND
+    clock.now += 1
+    assert cache.get("Heat") is None
+
+
+def test_not_found_answers_use_the_negative_ttl(open_cache, clock):
+    cache = open_cache(ttl=100, negative_ttl=10)
+    cache.put("Nothing", None, NOT_FOUND)
+    assert cache.get("Nothing") == NOT_FOUND
+    clock.now += 10
+    assert cache.get("Nothing") is None
+
+
+def test_other_errors_are_not_cached(open_cache):
+    cache = open_cache()
+    cache.put("Heat", None, {"Response": "False", "Error": "Request limit reached!"})
+    assert cache.get("Heat") is None
+
+
+def test_least_recently_used_entries_are_evicted(open_cache, clock):
+    cache = open_cache(max_entries=2)
+    cache.put("A", None, FOUND)
+    clock.now += 1
+    cache.put("B", None, FOUND)
+    clock.now += 1
+    assert cache.get("A") == FOUND  # A is now used more recently than B
+    clock.now += 1
+    cache.put("C", None, FOUND)
+
+    assert cache.get("A") == FOUND
+    assert cache.get("B") is None
+    assert cache.get("C") == FOUND
+
+
+def test_entries_persist_and_expired_ones_are_purged(open_cache, clock):
+    cache = open_cache(ttl=100, negative_ttl=10)
+    cache.put("Heat", None, FOUND)
+    cache.put("Nothing", None, NOT_FOUND)
+    cache.close()
+
+    reopened = open_cache(ttl=100, negative_ttl=10)
+    assert reopened.get("Heat") == FOUND
+    clock.now += 50
+    assert reopened.purge_expired() == 1
+    assert reopened.get("Nothing") is None
+    assert reopened.get("Heat") == FOUND
@@ -0,0 +1,145 @@
+import socket
+import threading
+import time
+import pytest
+import requests
+from omdb import OmdbCache, OmdbClient, movie_from_payload
+from omdb.client import RateLimiter
+from omdb.stub_server import StubHandler, fake_movie, start_stub_server
+
+
+class FlakyHandler(StubHandler):
+    """Answers the first `failures` requests with the status `status`, then like the stub."""
+    failures = 0
+    status = 503
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            fail = FlakyHandler.failures > 0
+            FlakyHandler.failures -= fail
+        if fail:
+            self._send(self.status, {"Response": "False", "Error": "Try again"})
+        else:
+            super().do_GET()
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    """Start one stub server for the module; yields its URL."""
+    server, url = start_stub_server(handler=FlakyHandler)
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def flaky_server(stub_url):
+    """Return the URL of the stub server, with no failures scheduled."""
+    FlakyHandler.failures, FlakyHandler.status = 0, 503
+    return stub_url
+
+
+def make_client(url, **options):
+    options.setdefault("backoff", 0.001)
+    return OmdbClient("stub", base_url=url, timeout=2, **options)
+
+
+def test_lookup_against_the_stub(flaky_server):
+    client = make_client(flaky_server)
+    assert client.fetch("Heat", "1995") == fake_movie("Heat", "1995")
+    assert client.fetch("missing movie")["Error"] == "Movie not found!"
+    assert client.metrics.summary()["requests"] == 2
+    client.close()
+
+
+@pytest.mark.parametrize("status", OmdbClient.RETRY_STATUSES)
+def test_retries_transient_statuses(flaky_server, status):
+    FlakyHandler.failures, FlakyHandler.status = 2, status
+    client = make_client(flaky_server, retries=3)
+
+    assert client.fetch("Heat")["Response"] == "True"
+    summary = client.metrics.summary()
+    assert (summary["requests"], summary["failures"], summary["retries"]) == (3, 2, 2)
+    client.close()
+
+
+def test_gives_up_after_the_last_retry(flaky_server):
+    FlakyHandler.failures = 10
+    client = make_client(flaky_server, retries=2, backoff=0.02)
+
+    start = time.perf_counter()
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.fetch("Heat")
+    assert time.perf_counter() - start >= 0.02 + 0.04  # Backoff doubles per retry
+    assert client.metrics.retries == 2
+    assert FlakyHandler.failures == 7
+    client.close()
+
+
+def test_client_errors_are_not_retried(flaky_server):
+    FlakyHandler.failures, FlakyHandler.status = 1, 401
+    client = make_client(flaky_server, retries=3)
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.fetch("Heat")
+    assert client.metrics.retries == 0
+    client.close()
+
+
+def test_retries_connection_errors():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        url = f"http://127.0.0.1:{sock.getsockname()[1]}/"  # Nothing listens here
+    client = make_client(url, retries=2)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.fetch("Heat")
+    assert (client.metrics.requests, client.metrics.retries) == (3, 2)
+    client.close()
+
+
+def test_lookup_uses_the_cache(flaky_server, tmp_path):
+    cache = OmdbCache(str(tmp_path / "cache.db"))
+    client = make_client(flaky_server, cache=cache)
+
+    assert client.lookup("Heat") == (fake_movie("Heat"), False)
+    assert client.lookup("heat") == (fake_movie("Heat"), True)
+    assert client.metrics.requests == 1
+    client.close()
+    cache.close()
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(rate=50)
+    start = time.perf_counter()
+    for _ in range(6):
+        limiter.wait()
+    assert time.perf_counter() - start >= 5 / 50 * 0.9
+
+    unlimited = RateLimiter()
+    start = time.perf_counter()
+    for _ in range(1000):
+        unlimited.wait()
+    assert time.perf_counter() - start < 0.05
+
+
+def test_rate_limiter_is_shared_between_threads():
+    limiter = RateLimiter(rate=100)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=limiter.wait) for _ in range(11)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - start >= 10 / 100 * 0.9
+
+
+def test_movie_from_payload():
+    payload = {"Title": "Heat", "Year": "1995", "imdbRating": "8.3", "Poster": "https://example.com/heat.jpg",
+               "imdbID": "tt0113277", "Response": "True"}
+    assert movie_from_payload(payload) == {
+        "year": "1995", "rating": 8.3, "poster": "https://example.com/heat.jpg",
+        "link": "https://www.imdb.com/title/tt0113277"
+    }
+    unrated = movie_from_payload({"Title": "New", "imdbRating": "N/A", "Response": "True"})
+    assert unrated["rating"] == 0.0
+    assert unrated["poster"] == "N/A"
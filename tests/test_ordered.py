@@ -0,0 +1,52 @@
+import os
+from indexes import OrderedIndex
+from movie_app import MovieApp
+from storage import StorageJson
+
+
+def make_storage(tmp_path):
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    with storage.batch():
+        for number in range(1, 6):
+            storage.add_movie(f"Movie {number}", str(2000 + number), float(number), "")
+    return storage
+
+
+def touch_later(path):
+    """Move a file's modification time forward, so a same-size rewrite still counts as a change."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_ordered_index_follows_changes(tmp_path):
+    storage = make_storage(tmp_path)
+    ordered = OrderedIndex()
+    storage.add_listener(ordered)
+
+    storage.add_movie("Heat", "1995", 9.5, "")
+    storage.update_movie("Movie 1", 6.0)
+    storage.delete_movie("Movie 5")
+
+    assert len(ordered) == 5
+    assert ordered.top(2) == ["Heat", "Movie 1"]
+    assert ordered.rated_between(3.0, 4.0) == ["Movie 4", "Movie 3"]
+    assert ordered.from_year("2005") == []
+    assert ordered.page(1, 2, by="year") == ["Heat", "Movie 1"]
+
+
+def test_app_notices_changes_by_another_program(tmp_path, monkeypatch, capsys):
+    storage = make_storage(tmp_path)
+    app = MovieApp(storage)
+
+    StorageJson(storage.file_path).delete_movie("Movie 5")
+    touch_later(storage.file_path)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "q")
+
+    app._command_sorted_movies()
+    for _ in range(10):
+        app._command_random_movie()
+    app._command_movie_stats()
+
+    output = capsys.readouterr().out
+    assert "Movie 5" not in output
+    assert "Highest Rated: Movie 4 (4.0/10)" in output
@@ -0,0 +1,133 @@
+import os
+import shutil
+import pytest
+import website.posters
+from website.posters import PosterCache
+from website.stub_server import start_stub_server
+
+
+@pytest.fixture(scope="module")
+def stub():
+    """Start one image stub server for the module; yields (server, base URL)."""
+    server, url = start_stub_server()
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def counts(stub):
+    """Return a function giving the stub's request counts since the test started."""
+    server, _ = stub
+    start = dict(server.counts)
+    return lambda: {name: server.counts[name] - start[name] for name in start}
+
+
+def urls(stub, *names):
+    return [stub[1] + name for name in names]
+
+
+def test_download_and_skip_cached_posters(tmp_path, stub, counts):
+    posters = PosterCache(str(tmp_path / "posters"), workers=4)
+    wanted = urls(stub, "a.png", "b.png", "missing.png") + ["N/A", "", None]
+
+    stats = posters.prefetch(wanted + urls(stub, "a.png"))
+    assert (stats["posters"], stats["downloaded"], stats["failed"], stats["cached"]) == (3, 2, 1, 0)
+    assert stats["failures"][0]["url"].endswith("missing.png")
+    assert stats["bytes"] == sum(os.path.getsize(tmp_path / "posters" / posters.local_path(url))
+                                 for url in urls(stub, "a.png", "b.png"))
+    assert posters.local_path(urls(stub, "missing.png")[0]) is None
+    assert counts()["images"] == 2
+
+    reopened = PosterCache(str(tmp_path / "posters"))
+    stats = reopened.prefetch(wanted)
+    assert (stats["cached"], stats["downloaded"]) == (2, 0)
+    assert counts()["requests"] == 4  # Only the missing poster was asked for again
+
+
+def test_stale_posters_are_revalidated(tmp_path, stub, counts):
+    PosterCache(str(tmp_path / "posters")).prefetch(urls(stub, "a.png", "b.png"))
+
+    stats = PosterCache(str(tmp_path / "posters"), max_age=0).prefetch(urls(stub, "a.png", "b.png"))
+
+    assert (stats["revalidated"], stats["downloaded"], stats["bytes"]) == (2, 0, 0)
+    assert counts() == {"requests": 4, "images": 2, "not_modified": 2}
+
+
+def test_poster_removed_by_hand_is_downloaded_again(tmp_path, stub):
+    posters = PosterCache(str(tmp_path / "posters"))
+    url, = urls(stub, "a.png")
+    posters.prefetch([url])
+    os.remove(tmp_path / "posters" / posters.local_path(url))
+
+    assert PosterCache(str(tmp_path / "posters")).prefetch([url])["downloaded"] == 1
+
+
+def test_localize_points_cards_at_cached_copies(tmp_path, stub):
+    posters = PosterCache(str(tmp_path / "posters"))
+    cached, remote = urls(stub, "a.png", "missing.png")
+    posters.prefetch([cached, remote])
+
+    movies = dict(posters.localize([("A", {"poster": cached}), ("B", {"poster": remote})], str(tmp_path / "site")))
+
+    assert movies["A"]["local_poster"] == "../posters/" + posters.local_path(cached)
+    assert "local_poster" not in movies["B"]
+
+
+def fake_thumbnail(source_path, thumbnail_path, width):
+    shutil.copyfile(source_path, thumbnail_path)
+
+
+class BrokenImage(Exception):
+    """Stands in for errors such as PIL.Image.DecompressionBombError."""
+
+
+def broken_thumbnail(source_path, thumbnail_path, width):
+    raise BrokenImage("too many pixels")
+
+
+def test_thumbnails(tmp_path, stub, monkeypatch):
+    monkeypatch.setattr(website.posters, "HAS_PILLOW", True)
+    monkeypatch.setattr(website.posters, "make_thumbnail", fake_thumbnail)
+    url, = urls(stub, "a.png")
+
+    posters = PosterCache(str(tmp_path / "posters"), thumbnail_width=100)
+    posters.prefetch([url])
+    assert posters.local_path(url).startswith("thumbs/")
+    assert posters.local_path(url).endswith("-100.jpg")
+
+    wider = PosterCache(str(tmp_path / "posters"), thumbnail_width=200)
+    assert wider.prefetch([url])["cached"] == 1  # Thumbnails of cached posters are made without a request
+    assert wider.local_path(url).endswith("-200.jpg")
+
+
+def test_failed_thumbnail_falls_back_to_the_poster(tmp_path, stub, monkeypatch):
+    monkeypatch.setattr(website.posters, "HAS_PILLOW", True)
+    monkeypatch.setattr(website.posters, "make_thumbnail", broken_thumbnail)
+    url, = urls(stub, "a.png")
+    PosterCache(str(tmp_path / "posters")).prefetch([url])
+
+    posters = PosterCache(str(tmp_path / "posters"), thumbnail_width=100)
+    stats = posters.prefetch([url])
+    assert (stats["cached"], stats["failed"]) == (1, 0)
+    assert posters.local_path(url).endswith(".png")
+
+    stats = PosterCache(str(tmp_path / "other"), thumbnail_width=100).prefetch([url])
+    assert (stats["downloaded"], stats["failed"]) == (1, 0)
+
+
+@pytest.mark.skipif(website.posters.HAS_PILLOW, reason="Pillow is installed")
+def test_thumbnails_need_pillow(tmp_path):
+    with pytest.raises(ValueError):
+        PosterCache(str(tmp_path / "posters"), thumbnail_width=100)
+
+
+def test_pillow_thumbnail(tmp_path, stub):
+    pytest.importorskip("PIL")
+    url, = urls(stub, "a.png")
+    posters = PosterCache(str(tmp_path / "posters"), thumbnail_width=100)
+    posters.prefetch([url])
+
+    from PIL import Image
+    with Image.open(tmp_path / "posters" / posters.local_path(url)) as image:
+        assert image.size == (100, 150)
@@ -0,0 +1,44 @@
+import os
+from indexes import SearchIndex
+from storage import StorageJson
+
+MOVIES = {title: {"year": "2000", "rating": 5.0, "poster": "", "link": ""}
+          for title in ("The Godfather", "The Godfather Part II", "Heat", "Alien", "Aliens", "Up")}
+
+
+def test_substring_and_fuzzy_search():
+    index = SearchIndex()
+    index.reset(MOVIES)
+
+    assert index.search("godfather") == ["The Godfather", "The Godfather Part II"]
+    assert index.search("ALIEN") == ["Alien", "Aliens"]
+    assert index.search("up") == ["Up"]
+    assert index.search("xyz") == []
+    assert index.fuzzy_search("godfathr")[0][0] == "The Godfather"
+    assert index.find("heat") == "Heat"
+
+
+def test_search_follows_changes(tmp_path):
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    storage.add_movie("Heat", "1995", 8.3, "")
+    index = SearchIndex()
+    storage.add_listener(index)
+
+    storage.add_movie("Alien", "1979", 8.5, "")
+    storage.delete_movie("Heat")
+
+    assert index.search("alien") == ["Alien"]
+    assert index.search("heat") == []
+
+
+def test_saved_index_is_only_loaded_for_the_same_file(tmp_path):
+    path = str(tmp_path / "search.idx")
+    index = SearchIndex()
+    index.reset(MOVIES)
+    index.save(path, [1, 2])
+
+    loaded = SearchIndex()
+    assert loaded.load(path, [1, 2])
+    assert loaded.search("heat") == ["Heat"]
+    assert not SearchIndex().load(path, [1, 3])
+    assert os.path.exists(path)
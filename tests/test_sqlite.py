@@ -0,0 +1,44 @@
+from storage import StorageSqlite
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "movies.db")
+    storage = StorageSqlite(path)
+    assert storage.add_movie("Heat", "1995", 8.3, "https://example.com/heat.jpg")
+    assert storage.add_movie("Alien", "1979", 8.5, "", link="https://www.imdb.com/title/tt0078748")
+    assert not storage.add_movie("Heat", "1995", 1.0, "")
+    assert storage.update_movie("heat", 9.0)
+    assert not storage.update_movie("Missing", 5.0)
+    assert storage.delete_movie("ALIEN")
+    storage.close()
+
+    reopened = StorageSqlite(path)
+    assert reopened.list_movies() == {
+        "Heat": {"year": "1995", "rating": 9.0, "poster": "https://example.com/heat.jpg",
+                 "link": "https://www.imdb.com/find?q=Heat"}
+    }
+    assert [title for title, _ in reopened.iter_movies(where=lambda title, details: details["rating"] > 8)] == ["Heat"]
+    reopened.close()
+
+
+def test_exact_title_wins_over_case_variants(tmp_path):
+    storage = StorageSqlite(str(tmp_path / "movies.db"))
+    storage.add_movie("UP", "2010", 5.0, "")
+    storage.add_movie("Up", "2009", 8.3, "")
+
+    assert storage.update_movie("Up", 9.0)
+    assert storage.list_movies()["UP"]["rating"] == 5.0
+    assert storage.delete_movie("up")  # No exact match: the first one added
+    assert list(storage.list_movies()) == ["Up"]
+    storage.close()
+
+
+def test_import_file(tmp_path):
+    storage = StorageSqlite(str(tmp_path / "movies.db"))
+    json_path = tmp_path / "movies.json"
+    json_path.write_text('{"Heat": {"year": "1995", "rating": 8.3, "poster": ""}}', encoding="utf-8")
+
+    assert storage.import_file(str(json_path)) == 1
+    assert storage.import_file(str(json_path)) == 0  # Titles already stored are skipped
+    assert list(storage.list_movies()) == ["Heat"]
+    storage.close()
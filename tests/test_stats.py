@@ -0,0 +1,30 @@
+import statistics
+from indexes import StatsEngine
+from storage import StorageJson
+
+
+def make_storage(tmp_path):
+    storage = StorageJson(str(tmp_path / "movies.json"))
+    with storage.batch():
+        for number in range(1, 6):
+            storage.add_movie(f"Movie {number}", str(2000 + number % 2), float(number), "")
+    return storage
+
+
+def test_stats_follow_changes(tmp_path):
+    storage = make_storage(tmp_path)
+    stats = StatsEngine()
+    storage.add_listener(stats)
+
+    storage.add_movie("Heat", "1995", 9.5, "")
+    storage.update_movie("Movie 1", 6.0)
+    storage.delete_movie("Movie 5")
+
+    fresh = StatsEngine()
+    fresh.reset(storage.list_movies())
+    assert stats.summary() == fresh.summary()
+    assert stats.year_histogram() == fresh.year_histogram()
+    assert stats.best == ("Heat", 9.5)
+    assert stats.worst == ("Movie 2", 2.0)
+    assert stats.median == statistics.median([6.0, 2.0, 3.0, 4.0, 9.5])
+
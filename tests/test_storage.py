@@ -0,0 +1,35 @@
+def test_round_trip(open_storage):
+    storage = open_storage()
+    assert storage.add_movie("Heat", "1995", 8.3, "https://example.com/heat.jpg")
+    assert storage.add_movie("Alien", "1979", 8.5, "https://example.com/alien.jpg",
+                             link="https://www.imdb.com/title/tt0078748")
+    assert not storage.add_movie("Heat", "1995", 1.0, "")
+    assert storage.update_movie("heat", 9.0)
+    assert not storage.update_movie("Missing", 5.0)
+
+    movies = open_storage().list_movies()
+    assert sorted(movies) == ["Alien", "Heat"]
+    assert movies["Heat"]["rating"] == 9.0
+    assert str(movies["Heat"]["year"]) == "1995"
+    assert movies["Heat"]["poster"] == "https://example.com/heat.jpg"
+    assert movies["Heat"]["link"] == "https://www.imdb.com/find?q=Heat"
+    if open_storage.backend != "csv":  # CSV rows have no link column
+        assert movies["Alien"]["link"] == "https://www.imdb.com/title/tt0078748"
+
+    assert storage.delete_movie("ALIEN")
+    assert not storage.delete_movie("Alien")
+    assert list(open_storage().list_movies()) == ["Heat"]
+    assert [title for title, _ in open_storage().iter_movies()] == ["Heat"]
+
+
+def test_titles_differing_in_case(open_storage):
+    storage = open_storage()
+    storage.add_movie("Up", "2009", 8.3, "")
+    storage.add_movie("UP", "2010", 5.0, "")
+
+    assert storage.update_movie("UP", 6.0)
+    assert storage.delete_movie("Up")
+
+    movies = open_storage().list_movies()
+    assert list(movies) == ["UP"]
+    assert movies["UP"]["rating"] == 6.0
@@ -0,0 +1,63 @@
+import threading
+from storage import StorageCsv
+
+ROWS = "title,year,rating,poster\r\nHeat,1995,8.3,\r\nAlien,1979,8.5,\r\nheat,2020,5.0,\r\n"
+
+
+def make_storage(tmp_path):
+    path = tmp_path / "movies.csv"
+    path.write_text(ROWS, encoding="utf-8", newline="")
+    return StorageCsv(str(path))
+
+
+def in_thread(function):
+    """Run function in another thread and report whether it finished within five seconds."""
+    thread = threading.Thread(target=function, daemon=True)
+    thread.start()
+    thread.join(5)
+    return not thread.is_alive()
+
+
+def test_round_trip(tmp_path):
+    storage = StorageCsv(str(tmp_path / "movies.csv"))
+    assert storage.add_movie("Heat", "1995", 8.3, "https://example.com/heat.jpg")
+    assert not storage.add_movie("Heat", "1995", 8.3, "")
+    assert storage.add_movie("Alien, the \"first\"", "1979", 8.5, "")
+
+    movies = StorageCsv(storage.file_path).list_movies()
+    assert movies["Heat"] == {"year": "1995", "rating": 8.3, "poster": "https://example.com/heat.jpg",
+                              "link": "https://www.imdb.com/find?q=Heat"}
+    assert movies['Alien, the "first"']["rating"] == 8.5
+
+
+def test_exact_title_and_first_duplicate_row_win(tmp_path):
+    storage = make_storage(tmp_path)
+
+    assert storage.update_movie("heat", 6.0)
+    assert storage.list_movies()["heat"]["rating"] == 6.0
+    assert storage.list_movies()["Heat"]["rating"] == 8.3
+    assert storage.delete_movie("HEAT")
+    assert list(storage.list_movies()) == ["Alien", "heat"]
+
+
+def test_paused_iteration_does_not_block_writers(tmp_path):
+    storage = make_storage(tmp_path)
+    movies = storage.iter_movies()
+    assert next(movies)[0] == "Heat"
+
+    other = StorageCsv(storage.file_path)
+    assert in_thread(lambda: other.add_movie("Up", "2009", 8.3, ""))
+    assert in_thread(lambda: other.delete_movie("Alien"))
+
+    assert [title for title, _ in movies] == ["Alien", "heat"]  # The version the iteration started on
+    assert list(dict(storage.iter_movies())) == ["Heat", "heat", "Up"]
+
+
+def test_iteration_stops_at_the_rows_present_when_it_started(tmp_path):
+    storage = make_storage(tmp_path)
+    movies = storage.iter_movies()
+    next(movies)
+
+    StorageCsv(storage.file_path).add_movie("Up", "2009", 8.3, "")
+
+    assert [title for title, _ in movies] == ["Alien", "heat"]
@@ -0,0 +1,67 @@
+import pytest
+from website import build_paginated_site
+
+TEMPLATE = "<html><body>\n<!-- MOVIE_CARDS_PLACEHOLDER -->\n</body></html>\n"
+
+
+@pytest.fixture
+def build(tmp_path):
+    """Return a function building a paginated site of the given movies into tmp_path/site."""
+    template = tmp_path / "template.html"
+    template.write_text(TEMPLATE, encoding="utf-8")
+
+    def build(movies, **options):
+        options.setdefault("page_size", 10)
+        return build_paginated_site(movies.items(), str(tmp_path / "site"), template_path=str(template), **options)
+
+    return build
+
+
+def make_movies(count):
+    return {f"Movie {number:03d}": {"year": "2000", "rating": 5.0, "poster": "", "link": ""}
+            for number in range(count)}
+
+
+def test_pages_and_index(build, tmp_path):
+    stats = build(make_movies(25))
+
+    assert (stats["pages"], stats["written"], stats["unchanged"]) == (4, 4, 0)  # 3 pages and the index
+    site = tmp_path / "site"
+    assert sorted(path.name for path in site.iterdir()) == [
+        "index.html", "manifest.json", "movies-1.html", "movies-2.html", "movies-3.html"
+    ]
+    assert (site / "movies-3.html").read_text(encoding="utf-8").count('class="movie-card"') == 5
+    assert 'href="movies-2.html"' in (site / "index.html").read_text(encoding="utf-8")
+
+
+def test_unchanged_pages_are_not_rewritten(build, tmp_path):
+    movies = make_movies(25)
+    build(movies)
+    page_1 = tmp_path / "site" / "movies-1.html"
+    page_2 = tmp_path / "site" / "movies-2.html"
+    modified = page_1.stat().st_mtime_ns
+
+    movies["Movie 015"]["rating"] = 9.0
+    stats = build(movies)
+
+    assert (stats["written"], stats["unchanged"]) == (1, 3)
+    assert page_1.stat().st_mtime_ns == modified
+    assert "9.0/10" in page_2.read_text(encoding="utf-8")
+
+
+def test_full_rebuild_and_removed_pages(build, tmp_path):
+    build(make_movies(25))
+    assert build(make_movies(25), incremental=False)["written"] == 4
+
+    stats = build(make_movies(15))
+    assert stats["removed"] == 1
+    assert not (tmp_path / "site" / "movies-3.html").exists()
+
+
+def test_deleted_page_file_is_written_again(build, tmp_path):
+    movies = make_movies(25)
+    build(movies)
+    (tmp_path / "site" / "movies-2.html").unlink()
+
+    assert build(movies)["written"] == 1
+    assert (tmp_path / "site" / "movies-2.html").exists()
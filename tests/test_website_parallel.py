@@ -0,0 +1,23 @@
+from website import build_paginated_site
+
+TEMPLATE = "<html><body>\n<!-- MOVIE_CARDS_PLACEHOLDER -->\n</body></html>\n"
+
+
+def read_site(directory):
+    return {path.name: path.read_bytes() for path in directory.iterdir()}
+
+
+def test_parallel_build_writes_the_same_bytes(tmp_path):
+    template = tmp_path / "template.html"
+    template.write_text(TEMPLATE, encoding="utf-8")
+    movies = {f"Movie <{number}>": {"year": str(1950 + number % 70), "rating": number % 10 + 0.5,
+                                    "poster": f"https://example.com/{number}.jpg", "link": ""}
+              for number in range(1000)}
+
+    serial = build_paginated_site(movies.items(), str(tmp_path / "serial"), page_size=20, incremental=False,
+                                  template_path=str(template), workers=1)
+    parallel = build_paginated_site(movies.items(), str(tmp_path / "parallel"), page_size=20, incremental=False,
+                                    template_path=str(template), workers=3)
+
+    assert serial["pages"] == parallel["pages"] == 51
+    assert read_site(tmp_path / "parallel") == read_site(tmp_path / "serial")
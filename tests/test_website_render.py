@@ -0,0 +1,38 @@
+from website import render_card, write_site
+
+TEMPLATE = "<html><body>\n<!-- MOVIE_CARDS_PLACEHOLDER -->\n</body></html>\n"
+
+
+def test_movie_data_is_escaped():
+    html = render_card('<script>alert("x")</script>', {
+        "year": "<b>1995</b>",
+        "rating": "8\" onmouseover=\"x",
+        "poster": 'https://example.com/p.jpg" onerror="alert(1)',
+        "link": "javascript:alert(1)"
+    })
+
+    assert "<script>" not in html
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;" in html
+    assert "&lt;b&gt;1995&lt;/b&gt;" in html
+    assert 'src="https://example.com/p.jpg&quot; onerror=&quot;alert(1)"' in html
+    assert "javascript:" not in html  # Non-web links are dropped
+    assert "<a " not in html
+
+
+def test_missing_posters_are_left_out():
+    html = render_card("Heat", {"year": "1995", "rating": 8.3, "poster": "N/A", "link": ""})
+    assert "<img" not in html
+
+
+def test_write_site_streams_every_movie(tmp_path):
+    template = tmp_path / "template.html"
+    template.write_text(TEMPLATE, encoding="utf-8")
+    output = tmp_path / "out" / "movies.html"
+    movies = ((f"Movie {number}", {"year": "2000", "rating": 5.0, "poster": "", "link": ""}) for number in range(100))
+
+    assert write_site(movies, str(output), str(template)) == 100
+
+    html = output.read_text(encoding="utf-8")
+    assert html.startswith("<html><body>\n") and html.endswith("</body></html>\n")
+    assert html.count('class="movie-card"') == 100
+    assert not (tmp_path / "out" / "movies.html.tmp").exists()
@@ -0,0 +1,5 @@
+from .renderer import OUTPUT_PATH, render_card, render_site, write_site
+from .pagination import SITE_DIR, build_paginated_site
+from .posters import POSTER_DIR, PosterCache, print_poster_report
+
+__all__ = ["render_card", "render_site", "write_site", "SITE_DIR", "build_paginated_site", "OUTPUT_PATH", "POSTER_DIR", "PosterCache", "print_poster_report"]
\ No newline at end of file
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import time
+from html import escape
+from .renderer import TEMPLATE_PATH, load_template, render_site, write_file
+
+SITE_DIR = "data/site"
+MANIFEST_NAME = "manifest.json"
+INDEX_NAME = "index.html"
+DEFAULT_PAGE_SIZE = 50
+
+
+def page_filename(number):
+    """
+    Return the file name of a page.
+
+    Args:
+        number (int): Page number, starting at 1
+
+    Returns:
+        str: e.g. "movies-3.html"
+    """
+    return f"movies-{number}.html"
+
+
+def iter_pages(movies, page_size):
+    """
+    Split the collection into pages.
+
+    Args:
+        movies (iterable): (title, details) pairs
+        page_size (int): Number of movies per page
+
+    Yields:
+        tuple: (number, page_movies, has_next) for every page
+    """
+    number = 0
+    page = []
+    for item in movies:
+        if len(page) == page_size:
+            number += 1
+            yield number, page, True
+            page = []
+        page.append(item)
+    if page:
+        yield number + 1, page, False
+
+
+def render_nav(number, has_next):
+    """
+    Render the navigation bar of a page.
+
+    Only the neighbouring pages are linked, so adding a page at the end changes
+    no page but the previous last one.
+
+    Args:
+        number (int): Page number
+        has_next (bool): Whether there is a following page
+
+    Returns:
+        str: HTML of the navigation bar
+    """
+    links = []
+    if number > 1:
+        links.append(f'<a href="{page_filename(number - 1)}">← Previous</a>')
+    links.append(f'<a href="{INDEX_NAME}">Page {number}</a>')
+    if has_next:
+        links.append(f'<a href="{page_filename(number + 1)}">Next →</a>')
+    return f'\n        <nav class="pagination" style="width: 100%;">{" | ".join(links)}</nav>\n'
+
+
+def render_page(number, page_movies, has_next, head, tail):
+    """
+    Render one page of movie cards with navigation above and below.
+
+    Args:
+        number (int): Page number
+        page_movies (list): (title, details) pairs on this page
+        has_next (bool): Whether there is a following page
+        head (str): Template HTML before the movie cards
+        tail (str): Template HTML after the movie cards
+
+    Returns:
+        str: HTML of the page
+    """
+    nav = render_nav(number, has_next)
+    return "".join(render_site(page_movies, head + nav, nav + tail))
+
+
+def render_index(pages, head, tail):
+    """
+    Render the index page that links to every page.
+
+    Args:
+        pages (list): (number, first_title, last_title, count) for every page
+        head (str): Template HTML before the movie cards
+        tail (str): Template HTML after the movie cards
+
+    Returns:
+        str: HTML of the index page
+    """
+    items = "".join(
+        f'\n            <li><a href="{page_filename(number)}">Page {number}</a>: '
+        f'{escape(str(first))} … {escape(str(last))} ({count} movies)</li>'
+        for number, first, last, count in pages
+    )
+    return f'{head}\n        <ul class="page-index" style="width: 100%; text-align: left;">{items}\n        </ul>\n{tail}'
+
+
+def load_manifest(manifest_path):
+    """
+    Load the content hashes of the previous build.
+
+    Args:
+        manifest_path (str): Path to the manifest file
+
+    Returns:
+        dict: File name -> SHA-256 of its content, empty if there was no build
+    """
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            return json.load(file).get("pages", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+class SitePublisher:
+    """
+    Writes pages of a build and skips those whose content did not change since the last one.
+    """
+
+    def __init__(self, output_dir, incremental=True):
+        """
+        Args:
+            output_dir (str): Directory of the generated site
+            incremental (bool): Skip pages whose content hash matches the manifest
+        """
+        self.output_dir = output_dir
+        self.incremental = incremental
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.previous = load_manifest(self.manifest_path) if incremental else {}
+        self.current = {}
+        self.stats = {"pages": 0, "written": 0, "unchanged": 0, "removed": 0}
+
+    def publish(self, filename, html):
+        """
+        Write a page unless an identical copy is already on disk.
+
+        Args:
+            filename (str): File name inside the output directory
+            html (str): Content of the page
+        """
+        digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        path = os.path.join(self.output_dir, filename)
+        self.current[filename] = digest
+        self.stats["pages"] += 1
+        if self.incremental and self.previous.get(filename) == digest and os.path.exists(path):
+            self.stats["unchanged"] += 1
+            return
+        write_file(path, [html])
+        self.stats["written"] += 1
+
+    def finish(self):
+        """
+        Remove pages left over from a larger previous build and save the manifest.
+
+        Returns:
+            dict: Counts of pages built, written, unchanged and removed
+        """
+        for filename in set(self.previous) - set(self.current):
+            path = os.path.join(self.output_dir, filename)
+            if os.path.exists(path):
+                os.remove(path)
+                self.stats["removed"] += 1
+        write_file(self.manifest_path, [json.dumps({"pages": self.current}, indent=4)])
+        return self.stats
+
+
+def render_pages(pages, head, tail):
+    """
+    Render pages one after another in this process.
+
+    Args:
+        pages (iterable): (number, page_movies, has_next) tuples from iter_pages
+        head (str): Template HTML before the movie cards
+        tail (str): Template HTML after the movie cards
+
+    Yields:
+        tuple: (number, page_movies, html) for every page
+    """
+    for number, page_movies, has_next in pages:
+        yield number, page_movies, render_page(number, page_movies, has_next, head, tail)
+
+
+def build_paginated_site(movies, output_dir=SITE_DIR, page_size=DEFAULT_PAGE_SIZE,
+                         incremental=True, template_path=TEMPLATE_PATH, workers=1):
+    """
+    Generate the site as numbered pages of `page_size` movies plus an index page.
+
+    In incremental mode the content hash of every page is compared with the manifest
+    of the previous build and only changed pages are rewritten, so a single rating
+    update rewrites one page instead of the whole site. With more than one worker the
+    pages are rendered in a process pool; the output is byte-identical either way.
+
+    Args:
+        movies (iterable): (title, details) pairs
+        output_dir (str): Directory of the generated site
+        page_size (int): Number of movies per page
+        incremental (bool): Only rewrite pages whose content changed
+        template_path (str): Path to the HTML template
+        workers (int): Number of rendering processes, 0 for one per CPU core
+
+    Returns:
+        dict: Counts of pages built, written, unchanged and removed, plus the
+            wall time in "seconds" and the throughput in "pages_per_second"
+    """
+    start = time.perf_counter()
+    head, tail = load_template(template_path)
+    publisher = SitePublisher(output_dir, incremental)
+    pages = iter_pages(movies, max(1, int(page_size)))
+    if workers == 1:
+        rendered = render_pages(pages, head, tail)
+    else:
+        from .parallel import render_pages_parallel  # Imported here: parallel.py imports this module
+        rendered = render_pages_parallel(pages, head, tail, workers)
+
+    index = []
+    for number, page_movies, html in rendered:
+        publisher.publish(page_filename(number), html)
+        index.append((number, page_movies[0][0], page_movies[-1][0], len(page_movies)))
+    publisher.publish(INDEX_NAME, render_index(index, head, tail))
+
+    stats = publisher.finish()
+    stats["seconds"] = time.perf_counter() - start
+    stats["pages_per_second"] = stats["pages"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
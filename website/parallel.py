@@ -0,0 +1,77 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from .pagination import render_page
+
+# Template parts of the current build, set once per worker process
+_worker_template = None
+
+
+def _init_worker(head, tail):
+    """
+    Store the template in the worker process so it is not sent with every page.
+
+    Args:
+        head (str): Template HTML before the movie cards
+        tail (str): Template HTML after the movie cards
+    """
+    global _worker_template
+    _worker_template = (head, tail)
+
+
+def _render_job(job):
+    """
+    Render one page inside a worker process.
+
+    Args:
+        job (tuple): (number, page_movies, has_next)
+
+    Returns:
+        str: HTML of the page
+    """
+    number, page_movies, has_next = job
+    head, tail = _worker_template
+    return render_page(number, page_movies, has_next, head, tail)
+
+
+def resolve_workers(workers):
+    """
+    Turn a requested worker count into an actual one.
+
+    Args:
+        workers (int): Requested number of processes, 0 or None for one per CPU core
+
+    Returns:
+        int: Number of worker processes to use
+    """
+    return workers if workers and workers > 0 else (os.cpu_count() or 1)
+
+
+def render_pages_parallel(pages, head, tail, workers=None):
+    """
+    Render pages across a process pool, yielding them in their original order.
+
+    At most a few pages per worker are in flight at any time, so memory stays
+    bounded however large the collection is. The output is identical to rendering
+    the pages one after another with render_page.
+
+    Args:
+        pages (iterable): (number, page_movies, has_next) tuples from iter_pages
+        head (str): Template HTML before the movie cards
+        tail (str): Template HTML after the movie cards
+        workers (int, optional): Number of processes, one per CPU core by default
+
+    Yields:
+        tuple: (number, page_movies, html) for every page
+    """
+    workers = resolve_workers(workers)
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(head, tail)) as executor:
+        for job in pages:
+            in_flight.append((job, executor.submit(_render_job, job)))
+            if len(in_flight) >= workers * 4:
+                (number, page_movies, _), future = in_flight.popleft()
+                yield number, page_movies, future.result()
+        while in_flight:
+            (number, page_movies, _), future = in_flight.popleft()
+            yield number, page_movies, future.result()
@@ -0,0 +1,339 @@
+import hashlib
+import importlib.util
+import json
+import os
+import time
+from email.utils import formatdate
+from .renderer import safe_url, write_file
+
+POSTER_DIR = "data/posters"
+INDEX_NAME = "index.json"
+THUMBNAIL_DIR = "thumbs"
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_AGE = 7 * 24 * 3600  # Cached posters are revalidated with their server after a week
+MAX_POSTER_BYTES = 10 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif"}
+
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None  # Thumbnails need Pillow; it is imported on first use
+
+
+def poster_key(url):
+    """
+    Return the cache key of a poster URL.
+
+    Args:
+        url (str): Poster URL
+
+    Returns:
+        str: Hex digest naming the cached files of this URL
+    """
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def _extension(content_type, url):
+    """
+    Pick the file extension of a downloaded poster from its content type, or else its URL.
+    """
+    extension = EXTENSIONS.get((content_type or "").split(";")[0].strip().lower())
+    if extension:
+        return extension
+    extension = os.path.splitext(url.split("?", 1)[0])[1].lower()
+    return extension if extension in EXTENSIONS.values() else ".jpg"
+
+
+def make_thumbnail(source_path, thumbnail_path, width):
+    """
+    Write a downscaled JPEG copy of an image, keeping its aspect ratio.
+
+    Args:
+        source_path (str): The full-size image
+        thumbnail_path (str): Where to write the thumbnail
+        width (int): Maximum width in pixels; smaller images are not enlarged
+    """
+    from PIL import Image
+    with Image.open(source_path) as image:
+        image = image.convert("RGB")
+        image.thumbnail((width, width * 4))
+        tmp_path = thumbnail_path + ".tmp"
+        image.save(tmp_path, "JPEG", quality=85, optimize=True)
+    os.replace(tmp_path, thumbnail_path)
+
+
+class PosterCache:
+    """
+    Downloads posters into a local directory so the generated site can show them offline.
+
+    Every poster is stored under the hash of its URL, next to an index.json holding
+    its ETag and Last-Modified date. Posters checked less than max_age seconds ago
+    are used as they are; older ones are revalidated with a conditional request, so
+    an unchanged poster costs a 304 answer instead of a download. Downloads run in a
+    bounded pool of threads; a poster that cannot be fetched keeps its remote URL.
+    """
+
+    def __init__(self, directory=POSTER_DIR, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT,
+                 max_age=DEFAULT_MAX_AGE, thumbnail_width=None):
+        """
+        Args:
+            directory (str): Directory the posters are stored in
+            workers (int): Number of concurrent downloads
+            timeout (float): Timeout of every request in seconds
+            max_age (float): Seconds after which a cached poster is revalidated, 0 to
+                revalidate all of them on every build
+            thumbnail_width (int, optional): Also store thumbnails at most this wide and
+                use them in the site (needs Pillow)
+
+        Raises:
+            ValueError: If thumbnails are requested but Pillow is not installed
+        """
+        if thumbnail_width and not HAS_PILLOW:
+            raise ValueError("Pillow is not installed. Install it with 'pip install pillow'.")
+        self.directory = directory
+        self.workers = max(1, int(workers))
+        self.timeout = timeout
+        self.max_age = max_age
+        self.thumbnail_width = int(thumbnail_width) if thumbnail_width else None
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        self.entries = self._load_index()
+        self._session = None
+
+    def _load_index(self):
+        """
+        Load the cached posters of previous builds.
+
+        Returns:
+            dict: URL -> {"file", "etag", "last_modified", "checked", "size", "thumbnail"}
+        """
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                return json.load(file).get("posters", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        """Save the index atomically."""
+        write_file(self.index_path, [json.dumps({"posters": self.entries}, indent=4, sort_keys=True)])
+
+    def _path(self, name):
+        """Return the path of a file inside the cache directory."""
+        return os.path.join(self.directory, name)
+
+    def _get_session(self):
+        """
+        Create the HTTP session on first use, with one pooled connection per worker.
+        """
+        if self._session is None:
+            import requests  # The HTTP stack is only loaded when posters are fetched
+            from requests.adapters import HTTPAdapter
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+        return self._session
+
+    def _has_thumbnail(self, entry):
+        """Return whether the thumbnail of a cached poster exists at the current width."""
+        name = entry.get("thumbnail")
+        return bool(name) and name.endswith(f"-{self.thumbnail_width}.jpg") and os.path.exists(self._path(name))
+
+    def _thumbnail(self, entry):
+        """
+        Make the thumbnail of a cached poster unless it already exists.
+
+        Returns:
+            str: Name of the thumbnail inside the cache directory, None if it could not be made
+        """
+        if self._has_thumbnail(entry):
+            return entry["thumbnail"]
+        name = f"{THUMBNAIL_DIR}/{os.path.splitext(entry['file'])[0]}-{self.thumbnail_width}.jpg"
+        os.makedirs(self._path(THUMBNAIL_DIR), exist_ok=True)
+        try:
+            make_thumbnail(self._path(entry["file"]), self._path(name), self.thumbnail_width)
+        except Exception:  # Not an image Pillow can read, or one too large to decode (DecompressionBombError)
+            if os.path.exists(self._path(name) + ".tmp"):
+                os.remove(self._path(name) + ".tmp")
+            return None
+        return name
+
+    def _fetch(self, url, entry):
+        """
+        Download a poster, or revalidate the cached copy with a conditional request.
+        Runs in a worker thread and only touches this URL's files.
+
+        Args:
+            url (str): Poster URL
+            entry (dict): Index entry of the cached copy, None if there is none
+
+        Returns:
+            tuple: (outcome, entry, error) with outcome "downloaded", "revalidated" or "failed"
+        """
+        import requests
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            with self._get_session().get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304 and entry is not None:
+                    entry = dict(entry, checked=time.time())
+                    outcome = "revalidated"
+                else:
+                    response.raise_for_status()
+                    entry = self._store(url, entry, response)
+                    outcome = "downloaded"
+            if self.thumbnail_width:
+                entry["thumbnail"] = self._thumbnail(entry)
+            return outcome, entry, None
+        except (requests.exceptions.RequestException, OSError, ValueError) as e:
+            return "failed", entry, e
+
+    def _store(self, url, entry, response):
+        """
+        Stream a poster response into the cache through a temporary file.
+
+        Returns:
+            dict: The new index entry
+
+        Raises:
+            ValueError: If the poster is larger than MAX_POSTER_BYTES
+        """
+        name = poster_key(url) + _extension(response.headers.get("Content-Type"), url)
+        path = self._path(name)
+        tmp_path = path + ".tmp"
+        size = 0
+        try:
+            with open(tmp_path, "wb") as file:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_POSTER_BYTES:
+                        raise ValueError(f"Poster is larger than {MAX_POSTER_BYTES} bytes")
+                    file.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if entry is not None and entry.get("file") != name and os.path.exists(self._path(entry["file"])):
+            os.remove(self._path(entry["file"]))  # The server now sends another image type
+        return {
+            "file": name,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified") or formatdate(usegmt=True),
+            "checked": time.time(),
+            "size": size,
+            "thumbnail": None
+        }
+
+    def prefetch(self, urls):
+        """
+        Make sure the posters of a build are cached, fetching missing and stale ones concurrently.
+
+        Posters checked within max_age are skipped without a request. Missing ones
+        are downloaded; stale ones are revalidated and only downloaded again if
+        they changed.
+
+        Args:
+            urls (iterable): Poster URLs; missing and non-web URLs such as "N/A" are ignored
+
+        Returns:
+            dict: Counts of posters, downloaded, revalidated, cached and failed ones,
+                the bytes downloaded, the failures as {"url", "error"} and the wall
+                time in "seconds"
+        """
+        start = time.perf_counter()
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        stats = {"posters": 0, "downloaded": 0, "revalidated": 0, "cached": 0, "failed": 0, "bytes": 0,
+                 "failures": []}
+        pending = []
+        thumbnails = []  # Cached posters still missing a thumbnail
+        for url in dict.fromkeys(str(url or "").strip() for url in urls):
+            if not safe_url(url):
+                continue
+            stats["posters"] += 1
+            entry = self.entries.get(url)
+            if entry is not None and not os.path.exists(self._path(entry["file"])):
+                del self.entries[url]  # Removed from the directory by hand
+                entry = None
+            if entry is not None and now - entry.get("checked", 0) < self.max_age:
+                stats["cached"] += 1
+                if self.thumbnail_width and not self._has_thumbnail(entry):
+                    thumbnails.append(entry)
+                continue
+            pending.append((url, entry))
+
+        if pending or thumbnails:
+            from concurrent.futures import ThreadPoolExecutor
+            if pending:
+                self._get_session()  # Created once here, shared by the workers
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                names = executor.map(self._thumbnail, thumbnails)
+                fetched = executor.map(lambda job: self._fetch(*job), pending)
+                for entry, name in zip(thumbnails, names):
+                    entry["thumbnail"] = name
+                for (url, _), (outcome, entry, error) in zip(pending, fetched):
+                    stats[outcome] += 1
+                    if error is not None:
+                        stats["failures"].append({"url": url, "error": str(error)})
+                    if outcome == "downloaded":
+                        stats["bytes"] += entry["size"]
+                    if entry is not None:
+                        self.entries[url] = entry
+        self._save_index()
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+    def local_path(self, url):
+        """
+        Return the cached copy of a poster, the thumbnail if there is one.
+
+        Args:
+            url (str): Poster URL
+
+        Returns:
+            str: Path relative to the cache directory with "/" separators, None if the poster is not cached
+        """
+        entry = self.entries.get(str(url or "").strip())
+        if entry is None:
+            return None
+        if self.thumbnail_width and entry.get("thumbnail"):
+            return entry["thumbnail"]
+        return entry["file"]
+
+    def localize(self, movies, output_dir):
+        """
+        Point the cards of cached posters at the local copies.
+
+        Args:
+            movies (iterable): (title, details) pairs
+            output_dir (str): Directory of the generated pages, which the links are relative to
+
+        Yields:
+            tuple: (title, details), with "local_poster" set in a copy of the details
+                when the poster is cached
+        """
+        prefix = os.path.relpath(self.directory, output_dir).replace(os.sep, "/")
+        for title, details in movies:
+            name = self.local_path(details.get("poster"))
+            yield (title, dict(details, local_poster=f"{prefix}/{name}")) if name else (title, details)
+
+    def close(self):
+        """Close the HTTP session."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+def print_poster_report(stats):
+    """
+    Print the result of a poster prefetch.
+
+    Args:
+        stats (dict): Result of PosterCache.prefetch()
+    """
+    print(f"🖼️ Posters: {stats['posters']} in total, {stats['downloaded']} downloaded "
+          f"({stats['bytes'] / 1024:.0f} KiB), {stats['revalidated']} revalidated, {stats['cached']} cached, "
+          f"{stats['failed']} failed in {stats['seconds']:.2f}s.")
@@ -0,0 +1,137 @@
+import os
+from html import escape
+
+TEMPLATE_PATH = "static/index_template.html"
+OUTPUT_PATH = "data/movies.html"
+PLACEHOLDER = "<!-- MOVIE_CARDS_PLACEHOLDER -->"
+
+
+def load_template(template_path=TEMPLATE_PATH):
+    """
+    Read the HTML template and split it around the movie cards placeholder.
+
+    Args:
+        template_path (str): Path to the HTML template
+
+    Returns:
+        tuple: (head, tail) HTML before and after the placeholder
+
+    Raises:
+        FileNotFoundError: If the template does not exist
+        ValueError: If the template has no placeholder
+    """
+    with open(template_path, "r", encoding="utf-8") as template_file:
+        template = template_file.read()
+    head, placeholder, tail = template.partition(PLACEHOLDER)
+    if not placeholder:
+        raise ValueError(f"Template '{template_path}' has no {PLACEHOLDER} placeholder.")
+    return head, tail
+
+
+def safe_url(url):
+    """
+    Escape a URL for use in an HTML attribute, dropping anything that is not http(s).
+
+    Args:
+        url (str): URL taken from the movie data
+
+    Returns:
+        str: Escaped URL, or "" for missing and non-web URLs such as "N/A" or "javascript:"
+    """
+    url = str(url or "").strip()
+    if not url.lower().startswith(("http://", "https://")):
+        return ""
+    return escape(url, quote=True)
+
+
+def render_card(title, details):
+    """
+    Render the HTML card of one movie with all values escaped.
+
+    Args:
+        title (str): The title of the movie
+        details (dict): The movie's year, rating, poster and link, and optionally
+            local_poster, the path of a cached copy shown instead of the poster URL
+            (see posters.PosterCache.localize)
+
+    Returns:
+        str: HTML of the movie card
+    """
+    safe_title = escape(str(title))
+    local_poster = details.get("local_poster")
+    poster = escape(local_poster, quote=True) if local_poster else safe_url(details.get("poster"))
+    link = safe_url(details.get("link"))
+    poster_html = f'<img src="{poster}" alt="{safe_title} Poster">' if poster else ""
+    link_html = f'<a href="{link}" target="_blank" rel="noopener">🔗 IMDb Link</a>' if link else ""
+    return f"""
+                <div class="movie-card">
+                    <h2>{safe_title}</h2>
+                    <p>📆 {escape(str(details.get('year', '')))}</p>
+                    <p>⭐ {escape(str(details.get('rating', '')))}/10</p>
+                    {poster_html}
+                    <p>{link_html}</p>
+                </div>
+                """
+
+
+def render_site(movies, head, tail):
+    """
+    Generate the page piece by piece: the template head, one card per movie, the tail.
+
+    Args:
+        movies (iterable): (title, details) pairs
+        head (str): HTML before the movie cards
+        tail (str): HTML after the movie cards
+
+    Yields:
+        str: Consecutive chunks of the page
+    """
+    yield head
+    for title, details in movies:
+        yield render_card(title, details)
+    yield tail
+
+
+def write_file(output_path, chunks):
+    """
+    Write text chunks to a file through a temporary file and an atomic rename.
+
+    Args:
+        output_path (str): Path of the file to write
+        chunks (iterable): Strings to write in order
+    """
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        file.writelines(chunks)
+    os.replace(tmp_path, output_path)
+
+
+def write_site(movies, output_path=OUTPUT_PATH, template_path=TEMPLATE_PATH):
+    """
+    Stream the generated page to a file without building it in memory.
+
+    The page is written to a temporary file that replaces the output only once it
+    is complete, so an interrupted build never leaves a half-written page behind.
+
+    Args:
+        movies (iterable): (title, details) pairs
+        output_path (str): Path of the generated HTML page
+        template_path (str): Path to the HTML template
+
+    Returns:
+        int: Number of movie cards written
+    """
+    head, tail = load_template(template_path)
+    count = 0
+
+    def counted(items):
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    write_file(output_path, render_site(counted(movies), head, tail))
+    return count
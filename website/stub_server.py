@@ -0,0 +1,152 @@
+"""
+Local stand-in for a poster CDN, used to test and benchmark the poster prefetch without network access.
+
+Run it and point some posters at it:
+
+    python -m website.stub_server --port 8766
+
+Every path is answered with a small PNG whose colour depends on the path,
+except paths containing "missing", which get a 404. Responses carry an ETag
+and a Last-Modified date and conditional requests are answered with 304.
+Latency and error rate can be simulated with --delay and --error-rate.
+"""
+import argparse
+import hashlib
+import random
+import struct
+import threading
+import time
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+IMAGE_WIDTH = 300
+IMAGE_HEIGHT = 450
+LAST_MODIFIED = 1_700_000_000  # Fixed, so revalidation always finds the images unchanged
+
+
+def fake_poster(path, width=IMAGE_WIDTH, height=IMAGE_HEIGHT):
+    """
+    Build a deterministic single-colour PNG for a path.
+
+    Args:
+        path (str): The requested path
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+
+    Returns:
+        bytes: The PNG file
+    """
+    colour = hashlib.sha1(path.encode("utf-8")).digest()[:3]
+    rows = b"".join(b"\x00" + colour * width for _ in range(height))  # Filter byte, then RGB pixels
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)  # 8-bit RGB
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+class ImageStubHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET requests for poster images, honouring If-None-Match and If-Modified-Since.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    delay = 0.0
+    error_rate = 0.0
+    counts = None  # Shared {"requests", "images", "not_modified"} counters, set by start_stub_server
+
+    def do_GET(self):
+        """Answer one image request."""
+        self._count("requests")
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error_rate and random.random() < self.error_rate:
+            self._send(503, b"Service unavailable", "text/plain")
+            return
+        path = urlparse(self.path).path
+        if "missing" in path:
+            self._send(404, b"Not found", "text/plain")
+            return
+
+        etag = f'"{hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]}"'
+        not_modified = self.headers.get("If-None-Match") == etag
+        if not not_modified and self.headers.get("If-Modified-Since") and not self.headers.get("If-None-Match"):
+            try:
+                not_modified = parsedate_to_datetime(self.headers["If-Modified-Since"]).timestamp() >= LAST_MODIFIED
+            except (TypeError, ValueError):
+                pass
+        headers = {"ETag": etag, "Last-Modified": formatdate(LAST_MODIFIED, usegmt=True)}
+        if not_modified:
+            self._count("not_modified")
+            self._send(304, b"", None, headers)
+            return
+        self._count("images")
+        self._send(200, fake_poster(path), "image/png", headers)
+
+    def _count(self, name):
+        """Increase one of the shared request counters."""
+        if self.counts is not None:
+            with self.counts_lock:
+                self.counts[name] += 1
+
+    def _send(self, status, body, content_type, headers=None):
+        """Send a response."""
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep tests quiet
+
+
+def start_stub_server(port=0, delay=0.0, error_rate=0.0, handler=ImageStubHandler):
+    """
+    Start the image stub server in a background thread.
+
+    Args:
+        port (int): Port to listen on, 0 picks a free one
+        delay (float): Simulated latency per request in seconds
+        error_rate (float): Fraction of requests answered with HTTP 503
+        handler (type): Request handler class
+
+    Returns:
+        tuple: (server, base_url); server.counts holds the number of requests,
+            images sent and 304 answers; call server.shutdown() to stop it
+    """
+    counts = {"requests": 0, "images": 0, "not_modified": 0}
+    handler_class = type("ConfiguredImageStubHandler", (handler,), {
+        "delay": delay, "error_rate": error_rate, "counts": counts, "counts_lock": threading.Lock()
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler_class)
+    server.daemon_threads = True
+    server.counts = counts
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def main():
+    """Run the image stub server in the foreground."""
+    parser = argparse.ArgumentParser(description="Local poster image stub server")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--delay", type=float, default=0.0, help="Simulated latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.port, args.delay, args.error_rate)
+    print(f"🧪 Poster stub server listening on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()